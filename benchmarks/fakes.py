@@ -0,0 +1,203 @@
+import asyncio
+import itertools
+import os
+import random
+import stat
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from stub_awsdac import sample_latency
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+
+with open(os.path.join(SRC_DIR, "diagram_as_code.yaml"), "r") as f:
+    EXAMPLE_YAML = f.read()
+
+
+def architect_reply(revision: int) -> str:
+    # 사이클마다 YAML이 조금씩 달라야 렌더 캐시와 동일 이미지 재사용이 실제처럼 동작합니다.
+    yaml_content = EXAMPLE_YAML.replace(
+        "      Align: center\n",
+        f'      Align: center\n      Title: "revision {revision}"\n',
+        1,
+    )
+    return f"""<DIAGRAM>
+{yaml_content}
+</DIAGRAM>
+
+설명:
+ALB가 두 가용 영역의 퍼블릭 서브넷에 있는 EC2 인스턴스로 트래픽을 분산합니다.
+"""
+
+
+PATCH_REPLY = """<PATCH>
+Resources:
+  modify:
+    ALB:
+      Title: "Application Load Balancer"
+</PATCH>
+"""
+
+
+def validation_reply(score: int) -> str:
+    return f"<검증결과>구성 요소와 연결을 확인했습니다.</검증결과>\n\n<점수>{score}</점수>"
+
+
+class LatencyModel:
+    # 호출 지연 시간 분포. 고정 지연에 지터(jitter)를 주거나 (uniform: 0~1 비율,
+    # lognormal: 로그 표준편차) 지수 분포(exponential, 평균 seconds)로 흉내 냅니다.
+    def __init__(
+        self,
+        seconds: float = 0.0,
+        jitter: float = 0.0,
+        seed: int = 0,
+        distribution: str = "uniform",
+    ):
+        self.seconds = seconds
+        self.jitter = jitter
+        self.distribution = distribution
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            return sample_latency(
+                self.seconds, self.jitter, self.distribution, self._random
+            )
+
+
+# 모델별 인스턴스가 같은 YAML을 내지 않도록 모든 인스턴스가 공유합니다.
+_revisions = itertools.count(1)
+
+
+class FakeChatBedrock:
+    # ChatBedrock 대체: 스크립트된 응답을 정해진 지연과 토큰 수로 돌려줍니다.
+    def __init__(
+        self,
+        model_id: str = "fake",
+        scores=(72, 85, 93),
+        latency: LatencyModel = None,
+        output_tokens: int = 800,
+        chunk_count: int = 20,
+    ):
+        self.model_id = model_id
+        self.latency = latency or LatencyModel()
+        self.output_tokens = output_tokens
+        self.chunk_count = chunk_count
+        self._scores = itertools.cycle(scores)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _reply(self, messages) -> str:
+        content = messages[-1].content
+        with self._lock:
+            self.calls += 1
+            if isinstance(content, list):
+                return validation_reply(next(self._scores))
+            if any("<PATCH>" in str(m.content) for m in messages):
+                return PATCH_REPLY
+            return architect_reply(next(_revisions))
+
+    def _message(self, messages, text: str) -> AIMessage:
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        usage = {
+            "prompt_tokens": input_tokens,
+            "completion_tokens": self.output_tokens,
+            "total_tokens": input_tokens + self.output_tokens,
+        }
+        return AIMessage(
+            content=text,
+            response_metadata={"usage": usage, "model_id": self.model_id},
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": input_tokens + self.output_tokens,
+            },
+        )
+
+    def invoke(self, messages, *args, **kwargs) -> AIMessage:
+        text = self._reply(messages)
+        time.sleep(self.latency.sample())
+        return self._message(messages, text)
+
+    async def ainvoke(self, messages, *args, **kwargs) -> AIMessage:
+        text = self._reply(messages)
+        await asyncio.sleep(self.latency.sample())
+        return self._message(messages, text)
+
+    def stream(self, messages, *args, **kwargs):
+        text = self._reply(messages)
+        size = max(1, len(text) // self.chunk_count)
+        delay = self.latency.sample() / max(1, len(text) // size)
+        for i in range(0, len(text), size):
+            time.sleep(delay)
+            yield AIMessageChunk(content=text[i : i + size])
+
+
+@contextmanager
+def stub_awsdac_on_path(
+    latency: float = 0.0,
+    warnings=(),
+    size: str = "800x600",
+    jitter: float = 0.0,
+    distribution: str = "uniform",
+):
+    # PATH 앞에 가짜 awsdac를 두고, 실행 횟수를 세는 카운터 파일 경로를 돌려줍니다.
+    with tempfile.TemporaryDirectory(prefix="stub-awsdac-") as bin_dir:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_awsdac.py")
+        wrapper = os.path.join(bin_dir, "awsdac")
+        with open(wrapper, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(wrapper, os.stat(wrapper).st_mode | stat.S_IEXEC)
+        counter = os.path.join(bin_dir, "count")
+        open(counter, "w").close()
+
+        overrides = {
+            "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+            "STUB_AWSDAC_COUNTER": counter,
+            "STUB_AWSDAC_LATENCY": str(latency),
+            "STUB_AWSDAC_JITTER": str(jitter),
+            "STUB_AWSDAC_DISTRIBUTION": distribution,
+            "STUB_AWSDAC_WARN": "|".join(warnings),
+            "STUB_AWSDAC_SIZE": size,
+        }
+        saved = {k: os.environ.get(k) for k in overrides}
+        os.environ.update(overrides)
+        try:
+            yield counter
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+
+def count_subprocesses(counter: str) -> int:
+    with open(counter) as f:
+        return sum(1 for _ in f)
+
+
+@contextmanager
+def fake_bedrock(architect_module, **llm_options):
+    # architect.create_llm을 FakeChatBedrock으로 바꿉니다. 모델 ID별로 인스턴스를 재사용합니다.
+    llms = {}
+    lock = threading.Lock()
+
+    def create_llm(model_id: str):
+        with lock:
+            if model_id not in llms:
+                llms[model_id] = FakeChatBedrock(model_id=model_id, **llm_options)
+            return llms[model_id]
+
+    original = architect_module.create_llm
+    architect_module.create_llm = create_llm
+    try:
+        yield llms
+    finally:
+        architect_module.create_llm = original
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+
+# 첫 요청 전까지 불러오지 않아야 하는 모듈
+HEAVY_MODULES = ["langchain", "langchain_core", "langgraph", "boto3", "botocore", "PIL"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"ms": elapsed * 1000, "heavy": heavy}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    # "import time: self [us] | cumulative | imported package" 줄에서 누적 시간을 읽습니다.
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return rows
+
+
+def measure(module: str) -> dict:
+    # 새 인터프리터를 저장소 밖 작업 디렉터리에서 띄워 새 파드의 콜드 스타트를 재현합니다.
+    env = {**os.environ, "PYTHONPATH": SRC_DIR, "PYTHONDONTWRITEBYTECODE": "1"}
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                PROBE.format(module=module, heavy=HEAVY_MODULES),
+            ],
+            cwd=cwd,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["modules"] = parse_importtime(result.stderr)
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="architect 모듈을 새 프로세스에서 import하는 시간을 측정합니다."
+    )
+    parser.add_argument("--module", default="architect")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="출력할 느린 모듈 수")
+    parser.add_argument(
+        "--max-ms", type=float, help="중앙값이 이 값을 넘으면 종료 코드 1을 반환합니다."
+    )
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장합니다.")
+    args = parser.parse_args()
+
+    samples = [measure(args.module) for _ in range(args.repeat)]
+    median_ms = statistics.median(sample["ms"] for sample in samples)
+    heavy = sorted({name for sample in samples for name in sample["heavy"]})
+    slowest = sorted(samples[-1]["modules"], reverse=True)[: args.top]
+    report = {
+        "module": args.module,
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "median_ms": round(median_ms, 1),
+        "min_ms": round(min(sample["ms"] for sample in samples), 1),
+        "max_ms": round(max(sample["ms"] for sample in samples), 1),
+        "heavy_modules": heavy,
+        "slowest_modules": [
+            {"module": name, "cumulative_ms": round(us / 1000, 1)}
+            for us, name in slowest
+        ],
+    }
+
+    print(
+        f"import {args.module}: median {report['median_ms']}ms "
+        f"(min {report['min_ms']}ms, max {report['max_ms']}ms, n={args.repeat})"
+    )
+    for row in report["slowest_modules"]:
+        print(f"  {row['cumulative_ms']:>8.1f}ms  {row['module']}")
+    if heavy:
+        print(f"heavy modules loaded at import: {', '.join(heavy)}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = bool(heavy)
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"median {report['median_ms']}ms exceeds --max-ms {args.max_ms}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
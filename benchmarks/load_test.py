@@ -0,0 +1,353 @@
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from stub_awsdac import DISTRIBUTIONS
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def percentile(values: list, fraction: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def latency_stats(values: list) -> dict:
+    return {
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else None,
+    }
+
+
+def rss_bytes() -> int:
+    # 현재 RSS. /proc이 없으면 (macOS 등) 최대 RSS로 대신합니다.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def child_process_count() -> int:
+    # 지금 실행 중인 자식 프로세스(awsdac) 수. Linux의 /proc에서만 셉니다.
+    try:
+        count = 0
+        for task in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{task}/children") as f:
+                count += len(f.read().split())
+        return count
+    except OSError:
+        return 0
+
+
+def cpu_seconds() -> float:
+    # 레플리카 프로세스와 종료된 자식 프로세스(awsdac)가 사용한 CPU 시간
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+class ResourceSampler(threading.Thread):
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_rss = rss_bytes()
+        self.peak_children = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, rss_bytes())
+            self.peak_children = max(self.peak_children, child_process_count())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_session(architect, question: str, config: dict) -> dict:
+    # Streamlit 세션 하나가 하는 일과 같이 생성기를 끝까지 소비합니다.
+    started = time.perf_counter()
+    first_event = None
+    error = None
+    for status in architect.run_aws_architect_agent(
+        question, config["model_id"], **config["options"]
+    ):
+        # run_id와 metrics는 사용자에게 보이는 진행 상황이 아니므로 첫 이벤트로 세지 않습니다.
+        if first_event is None and not set(status) <= {"run_id", "metrics"}:
+            first_event = time.perf_counter() - started
+        if "error" in status:
+            error = status["error"]
+    return {
+        "first_event": first_event,
+        "finish": time.perf_counter() - started,
+        "error": error,
+    }
+
+
+def replica(config: dict) -> dict:
+    # 새 프로세스 하나를 레플리카 하나로 보고, config["users"]명의 사용자가 동시에
+    # config["sessions_per_user"]번씩 설계를 실행합니다.
+    if config["cpus"] and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(range(min(config["cpus"], os.cpu_count()))))
+    from fakes import (
+        SRC_DIR,
+        LatencyModel,
+        count_subprocesses,
+        fake_bedrock,
+        stub_awsdac_on_path,
+    )
+
+    sys.path.insert(0, SRC_DIR)
+    import architect
+    from samples import sample_requirements
+
+    # 세션마다 나오는 노드 로그는 측정 결과를 가리므로 경고 이상만 남깁니다.
+    logging.disable(logging.INFO)
+
+    questions = itertools.cycle(sample_requirements.values())
+    lock = threading.Lock()
+    sessions = []
+
+    def user(index: int):
+        for _ in range(config["sessions_per_user"]):
+            with lock:
+                question = next(questions)
+            try:
+                result = run_session(architect, question, config)
+            except Exception as e:
+                result = {"first_event": None, "finish": None, "error": str(e)}
+            with lock:
+                sessions.append(result)
+
+    latency = LatencyModel(
+        config["llm_latency"], config["llm_jitter"], distribution=config["llm_distribution"]
+    )
+    with stub_awsdac_on_path(
+        latency=config["awsdac_latency"],
+        jitter=config["awsdac_jitter"],
+        distribution=config["awsdac_distribution"],
+    ) as counter, fake_bedrock(
+        architect,
+        scores=config["scores"],
+        latency=latency,
+        output_tokens=config["output_tokens"],
+    ):
+        # 그래프 컴파일과 import 비용은 레플리카 기동 비용이므로 측정 전에 한 번 실행합니다.
+        run_session(architect, "워밍업", config)
+        baseline_rss = rss_bytes()
+        renders_before = count_subprocesses(counter)
+        cpu_before = cpu_seconds()
+        sampler = ResourceSampler(config["sample_interval"])
+        sampler.start()
+
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=user, args=(i,)) for i in range(config["users"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        sampler.stop()
+        renders = count_subprocesses(counter) - renders_before
+        cpu = cpu_seconds() - cpu_before
+        final_rss = rss_bytes()
+
+    finished = [s for s in sessions if s["error"] is None and s["finish"] is not None]
+    return {
+        "users": config["users"],
+        "sessions": len(sessions),
+        "errors": len(sessions) - len(finished),
+        "elapsed_seconds": elapsed,
+        "sessions_per_minute": len(finished) / elapsed * 60 if elapsed else 0,
+        "time_to_first_event": latency_stats(
+            [s["first_event"] for s in finished if s["first_event"] is not None]
+        ),
+        "time_to_finish": latency_stats([s["finish"] for s in finished]),
+        "baseline_rss_mb": baseline_rss / 2**20,
+        "peak_rss_mb": sampler.peak_rss / 2**20,
+        "rss_growth_mb": (final_rss - baseline_rss) / 2**20,
+        "cpu_cores": cpu / elapsed if elapsed else 0,
+        "awsdac_runs": renders,
+        "awsdac_runs_per_session": renders / len(sessions) if sessions else 0,
+        "peak_awsdac_processes": sampler.peak_children,
+    }
+
+
+def run_replica(config: dict) -> dict:
+    # 동시 사용자 수마다 새 프로세스를 띄워 이전 단계의 메모리가 섞이지 않게 합니다.
+    with tempfile.TemporaryDirectory(prefix="load-test-") as directory:
+        env = {
+            **os.environ,
+            # 레플리카마다 체크포인트 DB를 따로 둡니다.
+            "ARCHITECT_CHECKPOINT_DB": os.path.join(directory, "checkpoints.sqlite"),
+        }
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--replica", json.dumps(config)],
+            env=env,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Replica with {config['users']} user(s) failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def recommend(levels: list, options) -> dict:
+    # SLO(p95 완료 시간)와 자원 제한을 모두 만족하는 가장 큰 동시 사용자 수로
+    # 필요한 레플리카 수와 메모리 요청/제한 값을 제안합니다.
+    def fits(level: dict) -> bool:
+        p95 = level["time_to_finish"]["p95"]
+        return (
+            not level["errors"]
+            and p95 is not None
+            and p95 <= options.slo_seconds
+            and level["peak_rss_mb"] <= options.memory_limit_mb
+            and level["cpu_cores"] <= options.cpu_limit
+        )
+
+    passing = [level for level in levels if fits(level)]
+    if not passing:
+        return {"sessions_per_replica": 0}
+    best = max(passing, key=lambda level: level["users"])
+    return {
+        "sessions_per_replica": best["users"],
+        "replicas": math.ceil(options.target_sessions / best["users"]),
+        # 측정한 최대 RSS에 여유 25%를 둡니다.
+        "memory_request_mb": math.ceil(best["baseline_rss_mb"] * 1.25),
+        "memory_limit_mb": math.ceil(best["peak_rss_mb"] * 1.25),
+        "cpu_request": round(best["cpu_cores"], 2),
+    }
+
+
+def format_seconds(value) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_report(report: dict, options) -> None:
+    header = (
+        f"{'users':>5}{'sess':>6}{'err':>5}{'/min':>8}"
+        f"{'first p50/p95/p99 s':>22}{'finish p50/p95/p99 s':>23}"
+        f"{'RSS MB':>9}{'+MB':>7}{'CPU':>6}{'runs':>6}{'procs':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for level in report["levels"]:
+        first = level["time_to_first_event"]
+        finish = level["time_to_finish"]
+        print(
+            f"{level['users']:>5}{level['sessions']:>6}{level['errors']:>5}"
+            f"{level['sessions_per_minute']:>8.1f}"
+            f"{'/'.join(format_seconds(first[p]) for p in ('p50', 'p95', 'p99')):>22}"
+            f"{'/'.join(format_seconds(finish[p]) for p in ('p50', 'p95', 'p99')):>23}"
+            f"{level['peak_rss_mb']:>9.0f}{level['rss_growth_mb']:>7.1f}"
+            f"{level['cpu_cores']:>6.2f}{level['awsdac_runs']:>6}"
+            f"{level['peak_awsdac_processes']:>6}"
+        )
+
+    recommendation = report["recommendation"]
+    print(
+        f"\nSLO p95 finish <= {options.slo_seconds}s, memory <= "
+        f"{options.memory_limit_mb}MB, CPU <= {options.cpu_limit}"
+    )
+    if not recommendation["sessions_per_replica"]:
+        print("No measured concurrency level met the SLO and resource limits.")
+        return
+    print(
+        f"Sessions per replica: {recommendation['sessions_per_replica']}  "
+        f"replicas for {options.target_sessions} concurrent sessions: "
+        f"{recommendation['replicas']}"
+    )
+    print(
+        f"Suggested resources: requests memory {recommendation['memory_request_mb']}Mi "
+        f"cpu {recommendation['cpu_request']}, limits memory "
+        f"{recommendation['memory_limit_mb']}Mi"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="가짜 Bedrock/awsdac로 레플리카 하나가 감당하는 동시 설계 세션 수를 측정합니다."
+    )
+    parser.add_argument(
+        "--users", type=int, nargs="+", default=[1, 2, 4, 8], help="단계별 동시 사용자 수"
+    )
+    parser.add_argument("--sessions-per-user", type=int, default=2)
+    parser.add_argument("--model-id", default="fake-model")
+    parser.add_argument("--options", default="{}", help="run_aws_architect_agent 옵션 (JSON)")
+    parser.add_argument("--scores", type=int, nargs="+", default=[72, 85, 93])
+    parser.add_argument("--output-tokens", type=int, default=800)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--llm-jitter", type=float, default=0.3)
+    parser.add_argument("--llm-distribution", choices=DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--awsdac-latency", type=float, default=0.5)
+    parser.add_argument("--awsdac-jitter", type=float, default=0.2)
+    parser.add_argument("--awsdac-distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument(
+        "--cpus", type=int, default=0, help="레플리카를 이 수의 CPU에 고정합니다 (Linux)"
+    )
+    parser.add_argument("--sample-interval", type=float, default=0.05)
+    parser.add_argument("--slo-seconds", type=float, default=60.0)
+    parser.add_argument("--memory-limit-mb", type=float, default=512)
+    parser.add_argument("--cpu-limit", type=float, default=1.0)
+    parser.add_argument(
+        "--target-sessions", type=int, default=30, help="서비스 전체의 동시 세션 목표"
+    )
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장합니다.")
+    parser.add_argument("--replica", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.replica:
+        print(json.dumps(replica(json.loads(args.replica))))
+        return 0
+
+    config = {
+        "model_id": args.model_id,
+        # 설계 캐시가 같은 예시 요구사항을 재사용하면 실제 부하보다 가벼워지므로 기본으로 끕니다.
+        "options": {"design_cache": False, **json.loads(args.options)},
+        "sessions_per_user": args.sessions_per_user,
+        "scores": args.scores,
+        "output_tokens": args.output_tokens,
+        "llm_latency": args.llm_latency,
+        "llm_jitter": args.llm_jitter,
+        "llm_distribution": args.llm_distribution,
+        "awsdac_latency": args.awsdac_latency,
+        "awsdac_jitter": args.awsdac_jitter,
+        "awsdac_distribution": args.awsdac_distribution,
+        "cpus": args.cpus,
+        "sample_interval": args.sample_interval,
+    }
+    levels = []
+    for users in args.users:
+        print(f"Running {users} concurrent user(s)...", file=sys.stderr)
+        levels.append(run_replica({**config, "users": users}))
+
+    report = {"config": config, "levels": levels}
+    report["recommendation"] = recommend(levels, args)
+    print_report(report, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
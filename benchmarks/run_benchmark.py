@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+from fakes import (
+    SRC_DIR,
+    LatencyModel,
+    count_subprocesses,
+    fake_bedrock,
+    stub_awsdac_on_path,
+)
+
+sys.path.insert(0, SRC_DIR)
+
+import architect  # noqa: E402
+from model_routing import load_routing  # noqa: E402
+from render_cache import render_cache  # noqa: E402
+from samples import sample_requirements  # noqa: E402
+
+NODE_FUNCTIONS = {
+    "Architect": "architect_node",
+    "Diagram": "diagram_node",
+    "Validate": "validate_node",
+    "supervisor": "supervisor_node",
+}
+
+
+class NodeTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def wrap(self, name: str, func):
+        def timed(state):
+            start = time.perf_counter()
+            try:
+                return func(state)
+            finally:
+                with self._lock:
+                    self.samples[name].append(time.perf_counter() - start)
+
+        return timed
+
+    def reset(self):
+        with self._lock:
+            self.samples = defaultdict(list)
+
+
+@contextmanager
+def timed_nodes(timer: NodeTimer):
+    # 노드 함수를 타이머로 감싼 뒤 그래프를 다시 컴파일하게 합니다.
+    originals = {attr: getattr(architect, attr) for attr in NODE_FUNCTIONS.values()}
+    for name, attr in NODE_FUNCTIONS.items():
+        setattr(architect, attr, timer.wrap(name, originals[attr]))
+    architect._compiled_workflows.clear()
+    try:
+        yield timer
+    finally:
+        for attr, func in originals.items():
+            setattr(architect, attr, func)
+        architect._compiled_workflows.clear()
+
+
+def summarize(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.mean(values) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def run_sample(name: str, question: str, counter: str, timer: NodeTimer, options):
+    timer.reset()
+    before = count_subprocesses(counter)
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    score = None
+    stop_reason = "accepted"
+    error = None
+    nodes = {}
+    totals = {}
+    for status in architect.run_aws_architect_agent(
+        question,
+        options.model_id,
+        stream=options.stream,
+        design_cache=options.design_cache,
+        model_routing=load_routing(options.model_routing),
+    ):
+        if "error" in status:
+            error = status["error"]
+        if "metrics" in status:
+            nodes = status["metrics"]["nodes"]
+            totals = status["metrics"]["totals"]
+        if status.get("validation_result"):
+            score = architect.parse_score(status["validation_result"])
+        if "stop_reason" in status:
+            stop_reason = status["stop_reason"]
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "sample": name,
+        "wall_ms": round(elapsed * 1000, 2),
+        # supervisor 이후 같은 상태가 다시 나올 수 있어 Validate 실행 횟수로 셉니다.
+        "iterations": nodes.get("Validate", {}).get("executions", 0),
+        "final_score": score,
+        "stop_reason": stop_reason,
+        "subprocesses": count_subprocesses(counter) - before,
+        "input_tokens": totals.get("input_tokens", 0),
+        "input_tokens_per_call": {
+            node: values["input_tokens_per_call"]
+            for node, values in nodes.items()
+            if values.get("llm_calls")
+        },
+        "output_tokens": totals.get("output_tokens", 0),
+        "cost_usd": round(totals.get("cost_usd", 0), 4),
+        "peak_traced_kb": peak // 1024,
+        "nodes": {node: summarize(v) for node, v in timer.samples.items()},
+        "error": error,
+    }
+
+
+def run(options) -> dict:
+    timer = NodeTimer()
+    latency = LatencyModel(options.llm_latency, options.llm_jitter)
+    results = []
+
+    with stub_awsdac_on_path(
+        latency=options.awsdac_latency, warnings=options.awsdac_warn
+    ) as counter, fake_bedrock(
+        architect,
+        scores=options.scores,
+        latency=latency,
+        output_tokens=options.output_tokens,
+    ) as llms, timed_nodes(timer):
+        for _ in range(options.repeat):
+            for name, question in sample_requirements.items():
+                if not options.warm_cache:
+                    render_cache.clear()
+                results.append(run_sample(name, question, counter, timer, options))
+
+        llm_calls = {model_id: llm.calls for model_id, llm in llms.items()}
+
+    return {
+        "results": results,
+        "llm_calls": llm_calls,
+        "render_cache": render_cache.stats(),
+        # Linux에서는 KB, macOS에서는 byte 단위입니다.
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def print_table(report: dict) -> None:
+    header = f"{'sample':<32}{'wall ms':>10}{'iter':>6}{'score':>7}{'procs':>7}{'peak KB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in report["results"]:
+        print(
+            f"{r['sample'][:31]:<32}{r['wall_ms']:>10.1f}{r['iterations']:>6}"
+            f"{str(r['final_score']):>7}{r['subprocesses']:>7}{r['peak_traced_kb']:>9}"
+        )
+        for node, s in sorted(r["nodes"].items()):
+            if s["count"]:
+                print(
+                    f"    {node:<12} n={s['count']:<3} mean={s['mean_ms']:.1f}ms "
+                    f"p50={s['p50_ms']:.1f}ms max={s['max_ms']:.1f}ms"
+                )
+        if r["input_tokens_per_call"]:
+            per_call = ", ".join(
+                f"{node}={tokens}"
+                for node, tokens in sorted(r["input_tokens_per_call"].items())
+            )
+            print(f"    input tokens/call: {per_call}")
+        if r["stop_reason"] != "accepted":
+            print(f"    stopped: {r['stop_reason']}")
+        if r["error"]:
+            print(f"    error: {r['error']}")
+    print(f"\nLLM calls: {report['llm_calls']}  max RSS: {report['max_rss']}")
+    print(f"Render cache: {report['render_cache']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="가짜 Bedrock 모델과 stub awsdac로 전체 파이프라인을 오프라인 벤치마크합니다."
+    )
+    parser.add_argument("--model-id", default="fake-model")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--scores", type=int, nargs="+", default=[72, 85, 93])
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--output-tokens", type=int, default=800)
+    parser.add_argument("--awsdac-latency", type=float, default=0.2)
+    parser.add_argument("--awsdac-warn", nargs="*", default=[])
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument(
+        "--warm-cache", action="store_true", help="샘플 사이에 렌더 캐시를 비우지 않습니다."
+    )
+    parser.add_argument(
+        "--design-cache",
+        action="store_true",
+        help="승인된 설계 캐시를 사용합니다. 기본값은 매 샘플 전체 루프를 실행합니다.",
+    )
+    parser.add_argument(
+        "--model-routing",
+        default="",
+        help="노드별 모델 라우팅 프리셋 이름(tiered) 또는 JSON. 기본값은 --model-id만 사용합니다.",
+    )
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장합니다.")
+    options = parser.parse_args()
+
+    report = run(options)
+    print_table(report)
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import hashlib
+import math
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+
+
+DISTRIBUTIONS = ("uniform", "lognormal", "exponential")
+
+
+def sample_latency(
+    seconds: float, jitter: float, distribution: str, rng: random.Random
+) -> float:
+    # uniform: seconds * (1 ± jitter), lognormal: 중앙값 seconds, 로그 표준편차 jitter,
+    # exponential: 평균 seconds (jitter 무시)
+    if distribution == "exponential":
+        return rng.expovariate(1 / seconds) if seconds > 0 else 0.0
+    if not jitter:
+        return seconds
+    if distribution == "lognormal":
+        return seconds * math.exp(rng.gauss(0, jitter))
+    return max(0.0, seconds * (1 + rng.uniform(-jitter, jitter)))
+
+
+def make_png(width: int, height: int, color: bytes = b"\xf0\xf0\xf0") -> bytes:
+    # 외부 라이브러리 없이 단색 RGB PNG를 만듭니다.
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    row = b"\x00" + color * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+def main(argv: list) -> int:
+    # awsdac <input.yaml> [-o output.png] 호출을 흉내 냅니다. 동작은 환경 변수로 설정합니다.
+    args = argv[1:]
+    output = args[args.index("-o") + 1] if "-o" in args else "output.png"
+
+    counter = os.environ.get("STUB_AWSDAC_COUNTER")
+    if counter:
+        with open(counter, "a") as f:
+            f.write(f"{os.getpid()}\n")
+
+    time.sleep(
+        sample_latency(
+            float(os.environ.get("STUB_AWSDAC_LATENCY", "0")),
+            float(os.environ.get("STUB_AWSDAC_JITTER", "0")),
+            os.environ.get("STUB_AWSDAC_DISTRIBUTION", "uniform"),
+            random.Random(),
+        )
+    )
+    for warning in filter(None, os.environ.get("STUB_AWSDAC_WARN", "").split("|")):
+        print(f"WARN {warning}")
+
+    width, height = (
+        int(v) for v in os.environ.get("STUB_AWSDAC_SIZE", "800x600").split("x")
+    )
+    # 입력 YAML이 다르면 다른 이미지가 나오도록 YAML 해시로 색을 정합니다.
+    with open(args[0], "rb") as f:
+        color = hashlib.sha256(f.read()).digest()[:3]
+    with open(output, "wb") as f:
+        f.write(make_png(width, height, color))
+    print(f"Diagram written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -10,6 +10,7 @@ setup(
     name="aws-architect-agent",
     version="0.1.0",
     packages=find_packages(),
+    package_data={"src": ["diagram_as_code.yaml"]},
     install_requires=required,
     entry_points={
         "console_scripts": [
@@ -0,0 +1,235 @@
+import argparse
+import json
+import logging
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from jobs import ARTIFACTS, DEFAULT_MODEL_ID, JobManager, JobQueueFull
+
+logger = logging.getLogger(__name__)
+
+API_PORT = int(os.environ.get("API_PORT", 8000))
+# 이벤트가 없을 때 프록시/로드 밸런서가 SSE 연결을 끊지 않도록 보내는 주석 간격
+SSE_KEEPALIVE_SECONDS = float(os.environ.get("API_SSE_KEEPALIVE_SECONDS", 15))
+MAX_BODY_BYTES = 1024 * 1024
+JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+JOB_PATH = re.compile(r"^/jobs/([^/]+)$")
+EVENTS_PATH = re.compile(r"^/jobs/([^/]+)/events$")
+ARTIFACT_PATH = re.compile(r"^/jobs/([^/]+)/artifacts/([^/]+)$")
+
+
+def job_links(job) -> dict:
+    return {
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+        "artifacts_url": f"/jobs/{job.id}/artifacts/",
+    }
+
+
+def parse_job_request(body: bytes) -> dict:
+    # POST /jobs 본문을 JobManager.submit 인자로 바꿉니다. 잘못된 요청이면 ValueError
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        raise ValueError("요청 본문이 올바른 JSON이 아닙니다.")
+    if not isinstance(payload, dict):
+        raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+    question = payload.get("question")
+    if not isinstance(question, str) or not question.strip():
+        raise ValueError("question은 비어 있지 않은 문자열이어야 합니다.")
+    job_id = payload.get("job_id")
+    if job_id is not None and not (
+        isinstance(job_id, str) and JOB_ID_PATTERN.match(job_id)
+    ):
+        raise ValueError("job_id는 영문, 숫자, -, _ 로 된 64자 이하 문자열이어야 합니다.")
+    options = payload.get("options") or {}
+    if not isinstance(options, dict):
+        raise ValueError("options는 JSON 객체여야 합니다.")
+    return {
+        "question": question,
+        "model_id": payload.get("model_id") or DEFAULT_MODEL_ID,
+        "job_id": job_id,
+        **options,
+    }
+
+
+def sse_message(event: dict, event_id: Optional[int] = None, name: str = "status"):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {name}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False, default=str)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # server.jobs(JobManager)를 사용하는 작업 API
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def jobs(self) -> JobManager:
+        return self.server.jobs
+
+    def send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_not_found(self) -> None:
+        self.send_json(404, {"error": "찾을 수 없습니다."})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/healthz":
+            self.send_json(200, {"status": "ok", **self.jobs.stats()})
+        elif url.path == "/metrics":
+            self.send_metrics()
+        elif url.path == "/jobs":
+            self.send_json(200, {"jobs": [job.summary() for job in self.jobs.list()]})
+        elif JOB_PATH.match(url.path):
+            job = self.jobs.get(JOB_PATH.match(url.path).group(1))
+            if job is None:
+                return self.send_not_found()
+            self.send_json(200, {**job.summary(), **job_links(job)})
+        elif EVENTS_PATH.match(url.path):
+            job = self.jobs.get(EVENTS_PATH.match(url.path).group(1))
+            if job is None:
+                return self.send_not_found()
+            self.stream_events(job, self.first_event_index(url))
+        elif ARTIFACT_PATH.match(url.path):
+            job_id, name = ARTIFACT_PATH.match(url.path).groups()
+            job = self.jobs.get(job_id)
+            if job is None or name not in job.artifacts:
+                return self.send_not_found()
+            self.send_artifact(name, job.artifacts[name])
+        else:
+            self.send_not_found()
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/jobs":
+            return self.send_not_found()
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            return self.send_json(413, {"error": "요청 본문이 너무 큽니다."})
+        try:
+            request = parse_job_request(self.rfile.read(length))
+            job = self.jobs.submit(**request)
+        except (ValueError, TypeError) as e:
+            return self.send_json(400, {"error": str(e)})
+        except JobQueueFull as e:
+            return self.send_json(429, {"error": f"대기 중인 작업이 너무 많습니다: {e}"})
+        self.send_json(202, {**job.summary(), **job_links(job)})
+
+    def do_DELETE(self):
+        match = JOB_PATH.match(urlparse(self.path).path)
+        job = self.jobs.cancel(match.group(1)) if match else None
+        if job is None:
+            return self.send_not_found()
+        self.send_json(202, job.summary())
+
+    def first_event_index(self, url) -> int:
+        # 재연결한 EventSource는 Last-Event-ID를 보내므로 그다음 이벤트부터 이어서 보냅니다.
+        last_event_id = self.headers.get("Last-Event-ID")
+        if last_event_id is not None and last_event_id.isdigit():
+            return int(last_event_id) + 1
+        after = parse_qs(url.query).get("after", ["0"])[0]
+        return int(after) if after.isdigit() else 0
+
+    def stream_events(self, job, index: int) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        partial_version = 0
+        try:
+            while True:
+                events, finished = job.wait_events(
+                    index, SSE_KEEPALIVE_SECONDS, partial_version
+                )
+                for event in events:
+                    self.wfile.write(sse_message(event, index))
+                    index += 1
+                # 진행 중인 partial 상태는 ID 없이 보내 재연결 때 다시 재생하지 않습니다.
+                partial_version, partial = job.latest_partial(partial_version)
+                if partial:
+                    self.wfile.write(sse_message(partial))
+                if finished and not events:
+                    self.wfile.write(sse_message(job.summary(), name="end"))
+                    break
+                if not events and not partial:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"SSE client for job {job.id} disconnected")
+
+    def send_artifact(self, name: str, data: bytes) -> None:
+        self.send_response(200)
+        content_type = ARTIFACTS.get(name, "application/octet-stream")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Disposition", f'attachment; filename="{name}"')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_metrics(self) -> None:
+        from metrics import registry, service_gauges
+
+        gauges = service_gauges()
+        for status, count in self.jobs.stats().items():
+            gauges[f"architect_jobs_{status}"] = count
+        body = registry.render(gauges).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def create_server(jobs: JobManager, host: str = "0.0.0.0", port: int = API_PORT):
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.jobs = jobs
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AWS Architect Agent 작업 API 서버")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    from architect import DEFAULT_RUN_OPTIONS
+
+    options = {"option_names": set(DEFAULT_RUN_OPTIONS)}
+    if args.workers:
+        options["workers"] = args.workers
+    jobs = JobManager(**options)
+    server = create_server(jobs, args.host, args.port)
+    logger.info(
+        f"Serving job API on {args.host}:{args.port} with {jobs.workers} worker(s)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+from typing import Dict, Generator, Optional
+
+logger = logging.getLogger(__name__)
+
+# 설정하면 Streamlit 앱과 CLI가 에이전트를 직접 실행하지 않고 작업 API(src/api.py)에 맡깁니다.
+ARCHITECT_API_URL = os.environ.get("ARCHITECT_API_URL", "").rstrip("/")
+# SSE keepalive 간격보다 길어야 합니다.
+API_TIMEOUT = float(os.environ.get("ARCHITECT_API_TIMEOUT", 60))
+SSE_RECONNECTS = 3
+
+
+def request(api_url: str, method: str, path: str, payload: Optional[dict] = None):
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(
+        api_url + path,
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    return urllib.request.urlopen(req, timeout=API_TIMEOUT)
+
+
+def request_json(api_url: str, method: str, path: str, payload=None) -> dict:
+    try:
+        with request(api_url, method, path, payload) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        # API 오류 응답의 {"error": ...}를 그대로 전달합니다.
+        try:
+            message = json.loads(e.read()).get("error") or str(e)
+        except ValueError:
+            message = str(e)
+        raise RuntimeError(f"{e.code}: {message}") from e
+
+
+def read_sse(response) -> Generator[tuple, None, None]:
+    # (event id, event 이름, data dict)
+    event_id, name, data = None, "message", []
+    for raw in response:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data:
+                yield event_id, name, json.loads("\n".join(data))
+            event_id, name, data = None, "message", []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "id":
+                event_id = int(value)
+            elif field == "event":
+                name = value
+            elif field == "data":
+                data.append(value)
+
+
+def job_events(api_url: str, job_id: str) -> Generator[dict, None, None]:
+    # 연결이 끊기면 마지막으로 받은 이벤트 다음부터 다시 구독합니다.
+    after = 0
+    reconnects = 0
+    while True:
+        try:
+            with request(api_url, "GET", f"/jobs/{job_id}/events?after={after}") as r:
+                for event_id, name, data in read_sse(r):
+                    if name == "end":
+                        return
+                    if event_id is not None:
+                        after = event_id + 1
+                    reconnects = 0
+                    yield data
+            return
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            reconnects += 1
+            if reconnects > SSE_RECONNECTS:
+                raise
+            logger.warning(f"Event stream for job {job_id} dropped, reconnecting: {e}")
+
+
+def run_remote_agent(
+    question: str,
+    model_id: str,
+    run_id: Optional[str] = None,
+    api_url: Optional[str] = None,
+    **options,
+) -> Generator[Dict, None, None]:
+    # run_aws_architect_agent와 같은 상태 dict를 작업 API에서 받아 내보냅니다.
+    # 다이어그램은 아티팩트 URL로 오므로 내려받아 diagram_image에 다시 넣습니다.
+    api_url = (api_url or ARCHITECT_API_URL).rstrip("/")
+    try:
+        job = request_json(
+            api_url,
+            "POST",
+            "/jobs",
+            {
+                "question": question,
+                "model_id": model_id,
+                "job_id": run_id,
+                "options": {k: v for k, v in options.items() if v is not None},
+            },
+        )
+        for status in job_events(api_url, job["job_id"]):
+            if "diagram_generated" in status:
+                status["diagram_image"] = None
+            if "diagram_url" in status:
+                with request(api_url, "GET", status.pop("diagram_url")) as response:
+                    status["diagram_image"] = response.read()
+            yield status
+    except Exception as e:
+        logger.error(f"Remote architect job failed: {str(e)}")
+        yield {"error": str(e)}
@@ -1,8 +1,22 @@
+import hashlib
+
 import streamlit as st
-from architect import run_aws_architect_agent
+from api_client import ARCHITECT_API_URL
+from metrics import start_metrics_server
+from model_routing import MODEL_ROUTING, ROUTING_PRESETS
+from samples import sample_requirements
 
 st.set_page_config(page_title="AWS 아키텍처 설계 도우미", page_icon="🏗️", layout="wide")
 
+# ARCHITECT_API_URL이 있으면 작업 API의 얇은 클라이언트로 동작하고, 없으면 에이전트를 직접 실행합니다.
+if ARCHITECT_API_URL:
+    from api_client import run_remote_agent as run_aws_architect_agent
+else:
+    from architect import run_aws_architect_agent
+
+    # METRICS_PORT가 설정되어 있으면 Prometheus /metrics 엔드포인트를 띄웁니다.
+    start_metrics_server()
+
 st.title("AWS 아키텍처 설계 도우미")
 
 bedrock_models = [
@@ -11,6 +25,15 @@ bedrock_models = [
     "anthropic.claude-3-haiku-20240307-v1:0",
 ]
 
+# 승인 점수에 못 미친 채 실행이 끝난 이유
+STOP_REASONS = {
+    "converged": "검증 점수가 더 이상 오르지 않아 설계를 마쳤습니다.",
+    "max_iterations": "최대 반복 횟수에 도달해 설계를 마쳤습니다.",
+    "time_budget": "실행 시간 한도에 도달해 설계를 마쳤습니다.",
+    "token_budget": "토큰 한도에 도달해 설계를 마쳤습니다.",
+    "error": "노드 실행 중 오류가 발생해 지금까지의 최고 점수 설계로 마쳤습니다.",
+}
+
 if "selected_model" not in st.session_state:
     st.session_state.selected_model = bedrock_models[0]
 
@@ -27,18 +50,13 @@ st.sidebar.title("설정")
 st.session_state.selected_model = st.sidebar.selectbox(
     "Bedrock 모델 선택", bedrock_models
 )
+# 초안과 검증은 Haiku로 하고, 점수가 정체되거나 응답 형식이 틀리면 Sonnet으로 올립니다.
+tiered_routing = st.sidebar.checkbox(
+    "단계별 모델 라우팅 (Haiku → Sonnet)", value=bool(MODEL_ROUTING)
+)
 
 st.write(f"선택된 모델: {st.session_state.selected_model}")
 
-# 예시 요구사항
-sample_requirements = {
-    "웹 애플리케이션": "고가용성 웹 애플리케이션을 위한 AWS 아키텍처를 설계해주세요. 사용자 트래픽은 변동이 심하며, 데이터베이스와 정적 자산 저장소가 필요합니다.",
-    "마이크로서비스": "마이크로서비스 아키텍처를 AWS에서 구현하고 싶습니다. 서비스 간 통신, 로드 밸런싱, 그리고 컨테이너 오케스트레이션을 고려해주세요.",
-    "데이터 처리 파이프라인": "대용량 데이터를 실시간으로 수집, 처리, 분석하는 파이프라인을 AWS에서 구축하고 싶습니다. 확장성과 비용 효율성을 고려해주세요.",
-    "서버리스 백엔드": "모바일 앱을 위한 서버리스 백엔드 아키텍처를 설계해주세요. 사용자 인증, API 요청 처리, 그리고 데이터 저장소를 포함해야 합니다.",
-    "재해 복구": "중요한 비즈니스 애플리케이션을 위한 재해 복구 솔루션을 AWS에서 구현하고 싶습니다. RPO와 RTO를 최소화하는 방안을 제시해주세요.",
-}
-
 # 예시 버튼 생성
 st.markdown(
     """
@@ -69,28 +87,70 @@ user_question = st.text_area(
     key="user_question",
 )
 
+
+def question_hash(question: str) -> str:
+    return hashlib.sha256(question.encode("utf-8")).hexdigest()[:16]
+
+
 if st.button("아키텍처 생성"):
     if user_question:
+        # 같은 요구사항의 실행이 중단되었으면 (세션 재실행, 새로고침, 파드 재배치) 이어서 진행합니다.
+        resume_run_id = None
+        if st.query_params.get("q") == question_hash(user_question):
+            resume_run_id = st.query_params.get("run_id")
         status_text = st.empty()
         yaml_expander = st.expander("YAML 내용", expanded=False)
+        yaml_container = yaml_expander.empty()
         diagram_container = st.empty()
         explanation_container = st.empty()
         validation_container = st.empty()
+        metrics_container = st.expander("실행 지표", expanded=False).empty()
+        partial_yaml = []
+        partial_explanation = []
 
         try:
             with st.spinner("AWS 아키텍처 생성 중..."):
                 for status in run_aws_architect_agent(
-                    user_question, st.session_state.selected_model
+                    user_question,
+                    st.session_state.selected_model,
+                    run_id=resume_run_id,
+                    stream=True,
+                    model_routing=(
+                        (MODEL_ROUTING or ROUTING_PRESETS["tiered"])
+                        if tiered_routing
+                        else {}
+                    ),
                 ):
+                    if "run_id" in status:
+                        st.query_params["run_id"] = status["run_id"]
+                        st.query_params["q"] = question_hash(user_question)
+
                     if "error" in status:
                         st.error(f"오류가 발생했습니다: {status['error']}")
                         if "traceback" in status:
                             st.code(status["traceback"], language="python")
                         break
 
+                    # 스트리밍 중에는 새로 생성된 조각만 오므로 이어 붙여 표시합니다.
+                    # 노드가 끝나 완성된 상태가 오면 다음 응답은 처음부터 다시 이어 붙입니다.
+                    if not any(key.startswith("partial_") for key in status):
+                        partial_yaml.clear()
+                        partial_explanation.clear()
+
+                    if "partial_yaml_delta" in status:
+                        partial_yaml.append(status["partial_yaml_delta"])
+                        status_text.text("AWS 아키텍처 YAML 생성 중...")
+                        yaml_container.code("".join(partial_yaml), language="yaml")
+
+                    if "partial_explanation_delta" in status:
+                        partial_explanation.append(status["partial_explanation_delta"])
+                        explanation_container.markdown(
+                            "### 아키텍처 설명\n\n" + "".join(partial_explanation)
+                        )
+
                     if "yaml_content" in status:
                         status_text.text("AWS 아키텍처 YAML 생성 중...")
-                        yaml_expander.code(status["yaml_content"], language="yaml")
+                        yaml_container.code(status["yaml_content"], language="yaml")
                         status_text.text("AWS 아키텍처 YAML 생성 완료")
 
                     if "architecture_explanation" in status:
@@ -102,7 +162,7 @@ if st.button("아키텍처 생성"):
                     if status.get("diagram_generated"):
                         status_text.text("아키텍처 다이어그램 생성 중...")
                         diagram_container.image(
-                            "output.png", caption="생성된 아키텍처 다이어그램"
+                            status["diagram_image"], caption="생성된 아키텍처 다이어그램"
                         )
                         status_text.text("아키텍처 다이어그램 생성 완료")
 
@@ -112,6 +172,31 @@ if st.button("아키텍처 생성"):
                         validation_container.write(status["validation_result"])
                         status_text.text("아키텍처 설계 검증 완료")
 
+                    if "design_cache" in status:
+                        st.info(
+                            "비슷한 요구사항으로 승인된 설계를 재사용했습니다 "
+                            f"(유사도 {status['design_cache']['similarity']:.2f})"
+                        )
+
+                    if "node_error" in status:
+                        st.warning(
+                            f"설계 단계에서 오류가 발생해 중단했습니다: {status['node_error']}"
+                        )
+
+                    if "stop_reason" in status:
+                        reason = STOP_REASONS.get(
+                            status["stop_reason"], status["stop_reason"]
+                        )
+                        st.info(
+                            f"{reason} 지금까지 가장 높은 점수"
+                            f"({status['best_score']:.0f}점)의 설계를 표시합니다."
+                        )
+
+                    if "metrics" in status:
+                        metrics_container.json(status["metrics"])
+
+                else:
+                    st.query_params.clear()
                 status_text.text("AWS 아키텍처 설계 완료!")
         except Exception as e:
             st.error(f"오류가 발생했습니다: {str(e)}")
@@ -1,17 +1,50 @@
 import os
-import subprocess
+import functools
 import logging
 import re
-import base64
+import asyncio
+import queue
+import threading
+import time
 import traceback
-from typing import Annotated, Generator, TypedDict, Dict
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.schema import SystemMessage
-from langgraph.graph import StateGraph, Graph, START, END
-from diagram_generator import generate_diagram
-import boto3
-from langchain_aws import ChatBedrock
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Annotated,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    Optional,
+    TypedDict,
+)
+from design_cache import design_cache, design_profile
+from dac_validator import format_diagnostics, validate_diagram_yaml
+from image_prep import image_hash, image_preparer
+from llm_client import LLMThrottled, get_llm
+from metrics import MeteredLLM, NodeUsage, record_node, summarize
+from model_routing import MODEL_ROUTING, escalation_model, route_model
+from prompts import build_messages, compact_yaml, minify_example
+from render_service import render_service
+from stopping import (
+    CONVERGENCE_WINDOW,
+    MAX_ITERATIONS,
+    MAX_SECONDS,
+    MAX_TOKENS,
+    MIN_IMPROVEMENT,
+    budget_exhausted,
+    has_converged,
+    restore_best_design,
+    update_best_design,
+)
+from yaml_patch import PATCH_FORMAT, apply_patch, extract_patch
+from streaming import (
+    DiagramStreamParser,
+    chunk_text,
+    emit,
+    register_sink,
+    unregister_sink,
+)
+from workspace import create_workspace, remove_workspace, workspace_file
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -20,7 +53,7 @@ logger = logging.getLogger(__name__)
 
 
 class State(TypedDict):
-    messages: Annotated[list[BaseMessage], "The conversation history"]
+    messages: Annotated[list, "The conversation history"]
     yaml_content: Annotated[str, "The generated YAML content"]
     architecture_explanation: Annotated[str, "Explanation of the architecture"]
     diagram_generated: Annotated[bool, "Whether the diagram has been generated"]
@@ -30,21 +63,48 @@ class State(TypedDict):
     current_node: Annotated[str, "Current node in the workflow"]
     next_node: Annotated[str, "Next node to be executed"]
     context: Annotated[dict, "Additional context information"]
+    diagram_result: Annotated[dict, "awsdac render result for yaml_content"]
+    diagram_feedback: Annotated[dict, "Warnings/errors/suggestions from awsdac"]
+    previous_validation: Annotated[str, "Validation result of the previous cycle"]
+    previous_score: Annotated[float, "Score of the previous cycle"]
+    workspace: Annotated[str, "Per-run artifact directory"]
+    base_yaml: Annotated[str, "Previous cycle's YAML to refine with a patch"]
+    base_explanation: Annotated[str, "Previous cycle's architecture explanation"]
+    schema_diagnostics: Annotated[str, "Schema errors of the last rejected YAML"]
+    metrics: Annotated[dict, "Per-node timing, token and render totals"]
+    seed_yaml: Annotated[str, "Closest cached design used as a starting point"]
+    seed_explanation: Annotated[str, "Explanation of the seed design"]
+    validated_image_hash: Annotated[str, "SHA-256 of the last validated diagram"]
+    score_history: Annotated[list, "Validation score of every cycle"]
+    best_design: Annotated[dict, "Highest-scoring design seen so far"]
+    started_at: Annotated[float, "Epoch seconds when the run started"]
+    stop_reason: Annotated[str, "Why the supervisor finished the run"]
+    node_error: Annotated[str, "Error of the node that ended the run early"]
+    model_escalation: Annotated[str, "Why the architect moved to the escalation model"]
+
 
+def create_llm(model_id: str):
+    # 모델 ID별로 공유되는 인스턴스를 반환합니다 (속도 제한, 스로틀링 재시도 포함).
+    return get_llm(model_id)
 
-bedrock_runtime = boto3.client("bedrock-runtime", region_name="us-west-2")
 
+# 응답 예시 YAML은 모듈과 함께 배포되며, 작업 디렉터리와 관계없이 처음 사용할 때 한 번 읽습니다.
+EXAMPLE_TEMPLATE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "diagram_as_code.yaml"
+)
 
-def create_llm(model_id: str):
-    return ChatBedrock(
-        model_id=model_id,
-        client=bedrock_runtime,
-        model_kwargs={"temperature": 0.7, "max_tokens": 32768},
-    )
 
+@functools.lru_cache(maxsize=None)
+def example_template() -> str:
+    with open(EXAMPLE_TEMPLATE_PATH, "r") as file:
+        return file.read()
 
-with open("diagram_as_code.yaml", "r") as file:
-    diagram_as_code_example = file.read()
+
+def human_message(content):
+    # langchain_core는 import 비용이 커서 모듈 import가 아닌 메시지를 처음 만들 때 불러옵니다.
+    from langchain_core.messages import HumanMessage
+
+    return HumanMessage(content=content)
 
 
 def extract_yaml(content: str) -> str:
@@ -55,195 +115,689 @@ def extract_yaml(content: str) -> str:
     return ""
 
 
-def check_warn_messages(yaml_content: str) -> bool:
-    if not yaml_content:
-        return False
-    with open("temp_architecture.yaml", "w") as f:
-        f.write(yaml_content)
-    result = subprocess.run(
-        ["awsdac", "temp_architecture.yaml"], capture_output=True, text=True
+ARCHITECT_INSTRUCTIONS = """당신은 AWS Solutions Architect입니다. 주어진 요구사항에 대해 최적의 AWS 아키텍처를 설계하고, diagram-as-code YAML 형식으로 답변해야 합니다. YAML DIAGRAM은 Markdown 없이 <DIAGRAM> </DIAGRAM> 태그로 감싸주세요.
+이전 검증 결과와 점수가 주어지면 이를 참고하여 아키텍처를 개선해주세요. 특히 누락된 구성 요소를 추가하고, 연결이 부자연스러운 부분을 수정해주세요.
+
+응답 예시:
+<DIAGRAM>
+{example}
+</DIAGRAM>
+
+설명:
+[여기에 아키텍처 설명 작성]"""
+
+
+def requirement(state: State) -> str:
+    return state["messages"][-1].content
+
+
+def previous_feedback(state: State) -> str:
+    # 첫 사이클에는 검증 결과가 없으므로 빈 항목을 보내지 않습니다.
+    if not state.get("previous_validation"):
+        return ""
+    return f"""
+이전 검증 결과: {state['previous_validation']}
+이전 점수: {state.get('previous_score', 0)}
+"""
+
+
+def build_architect_messages(state: State) -> list:
+    # 지시문과 예시(요구사항에 맞게 줄인 YAML)는 실행 동안 같으므로 앞부분에 두고,
+    # 반복마다 바뀌는 검증 결과만 뒤에 붙입니다.
+    question = requirement(state)
+    static = ARCHITECT_INSTRUCTIONS.format(
+        example=minify_example(example_template(), question)
     )
-    return "WARN" not in result.stdout
+    dynamic = f"""요구사항: {question}
+{previous_feedback(state)}{seed_design(state)}{schema_feedback(state)}"""
+    return build_messages(static, dynamic)
+
+
+def seed_design(state: State) -> str:
+    # 비슷한 요구사항의 승인된 설계가 있으면 첫 사이클의 출발점으로 제시합니다.
+    if not state.get("seed_yaml") or state.get("previous_validation"):
+        return ""
+    return f"""
+비슷한 요구사항에 대해 이전에 승인된 설계입니다. 이 설계를 출발점으로 삼아 요구사항의 차이만 반영해 수정해주세요:
+{compact_yaml(state['seed_yaml'])}
+
+기존 설계 설명:
+{state.get('seed_explanation', '')}
+"""
+
+
+def schema_feedback(state: State) -> str:
+    diagnostics = state.get("schema_diagnostics")
+    if not diagnostics:
+        return ""
+    return f"""
+직전에 생성한 YAML이 diagram-as-code 스키마 검사를 통과하지 못했습니다. 다음 문제를 반드시 수정해주세요:
+{diagnostics}
+"""
+
+
+REFINE_INSTRUCTIONS = f"""당신은 AWS Solutions Architect입니다. 주어진 현재 diagram-as-code YAML을 검증 결과에 따라 개선해야 합니다.
+전체 YAML을 다시 작성하지 말고, 변경할 부분만 <PATCH> 형식으로 답변해주세요.
+누락된 구성 요소를 추가하고, 연결이 부자연스러운 부분을 수정해주세요.
+
+패치 형식 (필요한 섹션만 작성):
+{PATCH_FORMAT}
+
+설명:
+[변경 사항을 반영한 전체 아키텍처 설명, 변경이 없으면 생략]"""
+
+
+def build_refine_messages(state: State) -> list:
+    # 개선 사이클에서는 전체 YAML을 다시 생성하지 않고 변경분(패치)만 요청합니다.
+    dynamic = f"""요구사항: {requirement(state)}
+
+현재 YAML:
+{compact_yaml(state['base_yaml'])}
+{previous_feedback(state)}{schema_feedback(state)}"""
+    return build_messages(REFINE_INSTRUCTIONS, dynamic)
+
+
+def extract_explanation(content: str) -> str:
+    explanation_match = re.search(r"설명:(.*?)$", content, re.DOTALL)
+    return explanation_match.group(1).strip() if explanation_match else ""
+
+
+def wants_refinement(state: State) -> bool:
+    return bool(state["context"].get("refine") and state.get("base_yaml"))
+
+
+def apply_refine_response(state: State, content: str) -> tuple:
+    yaml_content = apply_patch(state["base_yaml"], extract_patch(content))
+    explanation = extract_explanation(content) or state.get("base_explanation", "")
+    return yaml_content, explanation
+
+
+def request_architecture(state: State, llm) -> tuple:
+    # (yaml_content, explanation)을 반환합니다. 패치 적용에 실패하면 전체 생성으로 대체합니다.
+    if wants_refinement(state):
+        response = llm.invoke(build_refine_messages(state))
+        try:
+            return apply_refine_response(state, response.content)
+        except Exception as e:
+            logger.warning(f"Could not apply YAML patch, regenerating: {str(e)}")
+
+    response = llm.invoke(build_architect_messages(state))
+    return extract_yaml(response.content), extract_explanation(response.content)
+
+
+async def arequest_architecture(state: State, llm) -> tuple:
+    # 프롬프트 조립(YAML 파싱, 예시 파일 읽기)과 패치 적용은 스레드에서 실행해
+    # 이벤트 루프를 막지 않습니다.
+    if wants_refinement(state):
+        messages = await asyncio.to_thread(build_refine_messages, state)
+        response = await llm.ainvoke(messages)
+        try:
+            return await asyncio.to_thread(
+                apply_refine_response, state, response.content
+            )
+        except Exception as e:
+            logger.warning(f"Could not apply YAML patch, regenerating: {str(e)}")
+
+    messages = await asyncio.to_thread(build_architect_messages, state)
+    response = await llm.ainvoke(messages)
+    return extract_yaml(response.content), extract_explanation(response.content)
+
+
+def check_yaml(yaml_content: str) -> dict:
+    if not yaml_content:
+        return {
+            "warnings": [],
+            "errors": ["ERROR No <DIAGRAM> block found in the response"],
+            "suggestions": [],
+        }
+    return validate_diagram_yaml(yaml_content)
+
+
+def reject_architecture(state: State, feedback: dict) -> State:
+    # 잘못된 YAML은 실행을 끝내지 않고 진단 결과와 함께 Architect 단계를 다시 수행합니다.
+    diagnostics = format_diagnostics(feedback)
+    logger.warning(f"Architect output rejected by schema check:\n{diagnostics}")
+    state["yaml_content"] = ""
+    state["diagram_result"] = {}
+    state["schema_diagnostics"] = diagnostics
+    state["current_node"] = "Architect"
+    state["next_node"] = "supervisor"
+    return state
+
+
+def apply_architect_result(
+    state: State,
+    explanation: str,
+    yaml_content: str,
+    diagram_result: Optional[dict] = None,
+) -> State:
+    feedback = check_yaml(yaml_content)
+    if feedback["errors"]:
+        return reject_architecture(state, feedback)
+
+    state["yaml_content"] = yaml_content
+    state["architecture_explanation"] = explanation
+    state["diagram_result"] = diagram_result or {}
+    state["schema_diagnostics"] = ""
+    state["current_node"] = "Architect"
+    state["next_node"] = "Diagram"
+
+    logger.info("Architect node execution successful")
+    return state
+
+
+def stream_architect_response(state: State, llm) -> tuple:
+    # 토큰을 받는 대로 UI로 전달하고, </DIAGRAM>이 닫히면 설명을 기다리지 않고 렌더링을 시작합니다.
+    run_id = state["context"].get("run_id")
+    parser = DiagramStreamParser()
+    render_future = None
+    checked = False
+    for chunk in llm.stream(build_architect_messages(state)):
+        for event in parser.feed(chunk_text(chunk)):
+            emit(run_id, event)
+        # YAML 블록은 한 번만 닫히므로 처음 닫혔을 때 한 번만 검사합니다.
+        if parser.yaml_content and not checked:
+            checked = True
+            if not check_yaml(parser.yaml_content)["errors"]:
+                workspace = state.get("workspace")
+                render_future = render_service.submit(
+                    parser.yaml_content, workspace, owner=workspace or ""
+                )
+    return parser.content, parser.yaml_content, render_future
+
+
+def fail_node(state: State, node: str, error: Exception) -> State:
+    # 노드가 예외로 끝나면 오류를 기록하고 최고 점수 설계를 되돌려 실행을 마칩니다.
+    logger.error(f"{node} node execution failed: {str(error)}")
+    state["node_error"] = f"{node}: {str(error)}"
+    return stop_run(state, "error")
+
+
+def metered_llm(state: State, node: str) -> tuple:
+    # 노드별 모델 라우팅 정책(context["model_routing"])에 따라 모델을 고릅니다.
+    model_id, reason = route_model(state, node)
+    if reason and reason != state.get("model_escalation"):
+        logger.info(f"Escalating {node} to {model_id} ({reason})")
+        state["model_escalation"] = reason
+    usage = NodeUsage(model_id)
+    return MeteredLLM(create_llm(model_id), usage, model_id), usage
+
+
+def validator_llm(state: State, usage: NodeUsage) -> MeteredLLM:
+    # best-of-N 후보 검증은 Architect 노드 안에서 하지만 Validate 노드의 모델을 사용합니다.
+    model_id, _ = route_model(state, "Validate")
+    return MeteredLLM(create_llm(model_id), usage, model_id)
+
+
+def escalation_llm(state: State, usage: NodeUsage) -> Optional[MeteredLLM]:
+    model_id = escalation_model(state["context"], usage.model_id)
+    if model_id is None:
+        return None
+    logger.warning(f"Validation score missing, retrying with {model_id}")
+    return MeteredLLM(create_llm(model_id), usage, model_id)
+
+
+def defer_node(state: State, error: Exception) -> State:
+    # 재시도 후에도 Bedrock이 요청을 제한하면 실행을 끝내지 않고 supervisor로 돌아갑니다.
+    # current_node를 바꾸지 않았으므로 supervisor가 같은 단계를 다시 실행합니다.
+    logger.warning(f"Bedrock still throttled, deferring to supervisor: {error}")
+    state["next_node"] = "supervisor"
+    return state
 
 
 def architect_node(state: State) -> State:
     logger.info("Executing architect node")
-    messages = state["messages"]
-    llm = create_llm(state["context"]["model_id"])
+    llm, usage = metered_llm(state, "Architect")
     try:
-        previous_validation = state.get("previous_validation", "")
-        previous_score = state.get("previous_score", 0)
-
-        prompt = f"""당신은 AWS Solutions Architect입니다. 주어진 요구사항에 대해 최적의 AWS 아키텍처를 설계하고, 
-        diagram-as-code YAML 형식으로 답변해야 합니다.
-        
-        요구사항: {messages[-1].content}
-        
-        이전 검증 결과: {previous_validation}
-        이전 점수: {previous_score}
-        
-        위의 검증 결과와 점수를 참고하여 아키텍처를 개선해주세요. 특히 이전 검증 결과가 있다면 누락된 구성 요소를 추가하고, 연결이 부자연스러운 부분을 수정해주세요.
-        
-        응답 예시:
-        <DIAGRAM>
-        {diagram_as_code_example}
-        </DIAGRAM>
-        
-        설명:
-        [여기에 아키텍처 설명 작성]
-        """
-
-        response = llm.invoke([HumanMessage(content=prompt)])
-        content = response.content
-
-        yaml_content = extract_yaml(content)
-        if not check_warn_messages(yaml_content):
-            raise ValueError("Invalid YAML generated")
-
-        explanation_match = re.search(r"설명:(.*?)$", content, re.DOTALL)
-        explanation = explanation_match.group(1).strip() if explanation_match else ""
-
-        state["yaml_content"] = yaml_content
-        state["architecture_explanation"] = explanation
-        state["current_node"] = "Architect"
-        state["next_node"] = "Diagram"
-
-        logger.info("Architect node execution successful")
-        return state
+        if state["context"].get("candidates", 1) > 1:
+            return apply_best_candidate(state, generate_candidates(state, llm))
+
+        if state["context"].get("stream") and not wants_refinement(state):
+            content, yaml_content, render_future = stream_architect_response(
+                state, llm
+            )
+            diagram_result = None
+            if render_future is not None:
+                diagram_result = render_service.wait(render_future)
+                usage.add_render(diagram_result)
+            explanation = extract_explanation(content)
+            return apply_architect_result(
+                state, explanation, yaml_content, diagram_result
+            )
+
+        yaml_content, explanation = request_architecture(state, llm)
+        # 스키마 검사는 프로세스 안에서 하고, awsdac는 Diagram 노드의 렌더링에만 사용합니다.
+        return apply_architect_result(state, explanation, yaml_content)
+    except LLMThrottled as e:
+        return defer_node(state, e)
     except Exception as e:
-        logger.error(f"Architect node execution failed: {str(e)}")
-        state["next_node"] = "FINISH"
-        return state
+        return fail_node(state, "Architect", e)
+    finally:
+        record_node(state, "Architect", usage)
+
+
+def apply_diagram_result(state: State, diagram_result: dict) -> State:
+    if diagram_result["success"]:
+        state["diagram_generated"] = True
+        state["diagram_feedback"] = diagram_result["feedback"]
+        logger.info(f"Diagram node execution successful: {diagram_result['message']}")
+    else:
+        state["diagram_generated"] = False
+        state["diagram_feedback"] = None
+        logger.error(f"Diagram generation failed: {diagram_result['message']}")
+
+    state["diagram_result"] = diagram_result
+    state["current_node"] = "Diagram"
+    state["next_node"] = "Validate"
+    return state
 
 
 def diagram_node(state: State) -> State:
     logger.info("Executing diagram node")
+    usage = NodeUsage(state["context"]["model_id"])
     try:
-        yaml_content = state["yaml_content"]
-        diagram_result = generate_diagram(yaml_content)
-
-        if diagram_result["success"]:
-            state["diagram_generated"] = True
-            state["diagram_feedback"] = diagram_result["feedback"]
-            logger.info(
-                f"Diagram node execution successful: {diagram_result['message']}"
+        diagram_result = state.get("diagram_result")
+        if not diagram_result:
+            diagram_result = render_service.render(
+                state["yaml_content"], state.get("workspace")
             )
-        else:
-            state["diagram_generated"] = False
-            state["diagram_feedback"] = None
-            logger.error(f"Diagram generation failed: {diagram_result['message']}")
-
-        state["current_node"] = "Diagram"
-        state["next_node"] = "Validate"
-        return state
+            usage.add_render(diagram_result)
+        return apply_diagram_result(state, diagram_result)
     except Exception as e:
-        logger.error(f"Diagram node execution failed: {str(e)}")
-        state["next_node"] = "FINISH"
-        return state
+        return fail_node(state, "Diagram", e)
+    finally:
+        record_node(state, "Diagram", usage)
+
+
+def diagram_image(state: State) -> bytes:
+    image_data = (state.get("diagram_result") or {}).get("image")
+    if image_data is None:
+        image_path = workspace_file(state["workspace"], "output.png")
+        with open(image_path, "rb") as image_file:
+            image_data = image_file.read()
+    return image_data
+
+
+VALIDATE_INSTRUCTIONS = """주어진 YAML로 표현된 AWS 아키텍처와 생성된 다이어그램(output.png)을 검증해주세요. 기준점은 설명입니다.
+그림을 보며 선이 연결된 부분이 자연스러운지, 아키텍처가 요구사항을 충족하는지 확인해주세요. 1)부자연스러운 선이 있을때마다 5점씩, 2)설명에는 있으나 그림에는 빠진 요소가 있을때마다 10점씩 감점해야합니다.
+다이어그램 생성 중 발생한 경고/오류/개선 제안이 주어지면 함께 고려하여 아키텍처를 평가하고, 개선이 필요한 부분을 지적해주세요.
+검증 결과와 점수를 작성해주세요.
+
+응답 예시:
+<검증결과>[검증 결과]</검증결과>
+
+<점수>[0-100 사이의 점수]</점수>"""
+
+
+def diagram_feedback_text(state: State) -> str:
+    # 내용이 있는 항목만 보냅니다.
+    diagram_feedback = state.get("diagram_feedback") or {}
+    sections = (
+        ("다이어그램 생성 중 발생한 경고", "warnings"),
+        ("다이어그램 생성 중 발생한 오류", "errors"),
+        ("다이어그램 개선 제안", "suggestions"),
+    )
+    return "".join(
+        f"\n{title}:\n" + "\n".join(diagram_feedback[key]) + "\n"
+        for title, key in sections
+        if diagram_feedback.get(key)
+    )
+
+
+def build_validate_messages(state: State) -> list:
+    # 축소/재인코딩한 이미지를 해시 기준으로 캐시해 같은 다이어그램은 다시 인코딩하지 않습니다.
+    image = image_preparer.prepare(diagram_image(state))
+    prompt = f"""YAML:
+{compact_yaml(state['yaml_content'])}
+
+설명:
+{state['architecture_explanation']}
+{diagram_feedback_text(state)}"""
+    return build_messages(
+        VALIDATE_INSTRUCTIONS,
+        [
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:{image['media_type']};base64,{image['data']}"
+                },
+            },
+        ],
+    )
+
+
+SCORE_PATTERN = re.compile(r"<점수>(\d+)</점수>")
+
+
+def parse_score(validation_result: str) -> float:
+    score_match = SCORE_PATTERN.search(validation_result)
+    return float(score_match.group(1)) if score_match else 0
+
+
+def has_score(validation_result: str) -> bool:
+    return SCORE_PATTERN.search(validation_result) is not None
+
+
+def apply_validation_result(state: State, validation_result: str) -> State:
+    state["validation_result"] = validation_result
+    state["architecture_score"] = parse_score(validation_result)
+    state["current_node"] = "Validate"
+    state["next_node"] = "supervisor"
+    logger.info(
+        f"Validate node execution successful (score {state['architecture_score']})"
+    )
+    logger.debug(f"Validation result: {validation_result}")
+    return state
+
+
+def reuse_validation(state: State) -> Optional[str]:
+    # best-of-N 모드에서는 Architect 노드가 후보를 고르면서 이미 검증했고,
+    # 다이어그램이 직전 사이클과 바이트 단위로 같으면 이전 검증 결과를 그대로 사용합니다.
+    if state.get("validation_result"):
+        return state["validation_result"]
+    if image_hash(diagram_image(state)) == state.get(
+        "validated_image_hash"
+    ) and state.get("previous_validation"):
+        logger.info("Diagram unchanged since the previous cycle, reusing validation")
+        return state["previous_validation"]
+    return None
+
+
+def record_validated_image(state: State) -> None:
+    # 검증에 성공한 뒤에만 기록해, 실패 후 재시도할 때 이전 결과를 잘못 재사용하지 않도록 합니다.
+    state["validated_image_hash"] = image_hash(diagram_image(state))
 
 
 def validate_node(state: State) -> State:
     logger.info("Executing validate node")
+    llm, usage = metered_llm(state, "Validate")
     try:
-        llm = create_llm(state["context"]["model_id"])
-        with open("output.png", "rb") as image_file:
-            image_data = image_file.read()
-            image_base64 = base64.b64encode(image_data).decode("utf-8")
-
-        diagram_feedback = state.get("diagram_feedback", {})
-        warnings = "\n".join(diagram_feedback.get("warnings", []))
-        errors = "\n".join(diagram_feedback.get("errors", []))
-        suggestions = "\n".join(diagram_feedback.get("suggestions", []))
-
-        prompt = f"""다음 YAML로 표현된 AWS 아키텍처와 생성된 다이어그램(output.png)을 검증해주세요. 기준점은 설명입니다.
-        그림을 보며 선이 연결된 부분이 자연스러운지, 아키텍처가 요구사항을 충족하는지 확인해주세요. 1)부자연스러운 선이 있을때마다 5점씩, 2)설명에는 있으나 그림에는 빠진 요소가 있을때마다 10점씩 감점해야합니다.
-        
-        YAML:
-        {state['yaml_content']}
-        
-        설명:
-        {state['architecture_explanation']}
-
-        다이어그램 생성 중 발생한 경고:
-        {warnings}
-
-        다이어그램 생성 중 발생한 오류:
-        {errors}
-
-        다이어그램 개선 제안:
-        {suggestions}
-
-        위의 정보를 고려하여 아키텍처를 평가하고, 개선이 필요한 부분을 지적해주세요.
-        검증 결과와 점수를 작성해주세요. 
-        
-        응답 예시:
-        <검증결과>[검증 결과]</검증결과>
-
-        <점수>[0-100 사이의 점수]</점수>
-        """
-        response = llm.invoke(
-            [
-                HumanMessage(
-                    content=[
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{image_base64}"
-                            },
-                        },
-                    ]
+        validation_result = reuse_validation(state)
+        if validation_result is not None:
+            return apply_validation_result(state, validation_result)
+        messages = build_validate_messages(state)
+        response = llm.invoke(messages)
+        fallback = None if has_score(response.content) else escalation_llm(state, usage)
+        if fallback is not None:
+            response = fallback.invoke(messages)
+        record_validated_image(state)
+        return apply_validation_result(state, response.content)
+    except LLMThrottled as e:
+        return defer_node(state, e)
+    except Exception as e:
+        return fail_node(state, "Validate", e)
+    finally:
+        record_node(state, "Validate", usage)
+
+
+def candidate_workspace(state: State, index: int) -> Optional[str]:
+    # 후보마다 별도 디렉터리에서 렌더링해 output.png가 섞이지 않도록 합니다.
+    if not state.get("workspace"):
+        return None
+    path = workspace_file(state["workspace"], f"candidate-{index}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def candidate_state(
+    state: State, explanation: str, yaml_content: str, diagram_result: dict
+) -> dict:
+    return {
+        **state,
+        "yaml_content": yaml_content,
+        "architecture_explanation": explanation,
+        "diagram_result": diagram_result,
+        "diagram_feedback": diagram_result["feedback"],
+    }
+
+
+def generate_candidate(state: State, llm, validator, index: int) -> Optional[dict]:
+    try:
+        yaml_content, explanation = request_architecture(state, llm)
+        if check_yaml(yaml_content)["errors"]:
+            return None
+        workspace = candidate_workspace(state, index)
+        # 실행을 취소하면 render_service.cancel(workspace)가 후보 렌더도 함께 멈춥니다.
+        diagram_result = render_service.render(
+            yaml_content, workspace, owner=state.get("workspace") or ""
+        )
+        llm.usage.add_render(diagram_result)
+        if not diagram_result["success"]:
+            return None
+        candidate = candidate_state(state, explanation, yaml_content, diagram_result)
+        validation = validator.invoke(build_validate_messages(candidate))
+        candidate["validation_result"] = validation.content
+        candidate["architecture_score"] = parse_score(validation.content)
+        return candidate
+    except LLMThrottled:
+        # 한도에 걸리면 후보 하나만 버리지 않고 노드 전체를 defer_node로 미룹니다.
+        raise
+    except Exception as e:
+        logger.warning(f"Architect candidate {index} failed: {str(e)}")
+        return None
+
+
+def generate_candidates(state: State, llm) -> list:
+    count = state["context"]["candidates"]
+    concurrency = state["context"].get("candidate_concurrency") or count
+    logger.info(f"Generating {count} architecture candidates (concurrency {concurrency})")
+    validator = validator_llm(state, llm.usage)
+    with ThreadPoolExecutor(max_workers=min(count, concurrency)) as executor:
+        return list(
+            executor.map(
+                lambda i: generate_candidate(state, llm, validator, i), range(count)
+            )
+        )
+
+
+def apply_best_candidate(state: State, candidates: list) -> State:
+    candidates = [c for c in candidates if c is not None]
+    if not candidates:
+        return reject_architecture(
+            state,
+            {
+                "warnings": [],
+                "errors": ["ERROR No candidate passed the schema check and render"],
+                "suggestions": [],
+            },
+        )
+    best = max(candidates, key=lambda c: c["architecture_score"])
+    logger.info(
+        f"Selected candidate with score {best['architecture_score']} "
+        f"out of {len(candidates)} valid candidate(s)"
+    )
+    state = apply_architect_result(
+        state,
+        best["architecture_explanation"],
+        best["yaml_content"],
+        best["diagram_result"],
+    )
+    state["validation_result"] = best["validation_result"]
+    state["architecture_score"] = best["architecture_score"]
+    return state
+
+
+async def agenerate_candidate(
+    state: State, llm, validator, index: int, semaphore: asyncio.Semaphore
+) -> Optional[dict]:
+    async with semaphore:
+        try:
+            yaml_content, explanation = await arequest_architecture(state, llm)
+            if (await asyncio.to_thread(check_yaml, yaml_content))["errors"]:
+                return None
+            workspace = await asyncio.to_thread(candidate_workspace, state, index)
+            diagram_result = await render_service.arender(
+                yaml_content, workspace, owner=state.get("workspace") or ""
+            )
+            llm.usage.add_render(diagram_result)
+            if not diagram_result["success"]:
+                return None
+            candidate = candidate_state(
+                state, explanation, yaml_content, diagram_result
+            )
+            messages = await asyncio.to_thread(build_validate_messages, candidate)
+            validation = await validator.ainvoke(messages)
+            candidate["validation_result"] = validation.content
+            candidate["architecture_score"] = parse_score(validation.content)
+            return candidate
+        except LLMThrottled:
+            raise
+        except Exception as e:
+            logger.warning(f"Architect candidate {index} failed: {str(e)}")
+            return None
+
+
+async def aarchitect_node(state: State) -> State:
+    logger.info("Executing architect node (async)")
+    llm, usage = metered_llm(state, "Architect")
+    try:
+        count = state["context"].get("candidates", 1)
+        if count > 1:
+            semaphore = asyncio.Semaphore(
+                state["context"].get("candidate_concurrency") or count
+            )
+            validator = validator_llm(state, usage)
+            tasks = [
+                asyncio.ensure_future(
+                    agenerate_candidate(state, llm, validator, i, semaphore)
                 )
+                for i in range(count)
             ]
+            try:
+                candidates = await asyncio.gather(*tasks)
+            except BaseException:
+                # 한 후보가 한도에 걸리면 남은 후보는 더 호출하지 않도록 취소합니다.
+                for task in tasks:
+                    task.cancel()
+                raise
+            return await asyncio.to_thread(apply_best_candidate, state, candidates)
+
+        yaml_content, explanation = await arequest_architecture(state, llm)
+        return await asyncio.to_thread(
+            apply_architect_result, state, explanation, yaml_content
         )
-        validation_result = response.content
+    except LLMThrottled as e:
+        return defer_node(state, e)
+    except Exception as e:
+        return fail_node(state, "Architect", e)
+    finally:
+        record_node(state, "Architect", usage)
 
-        score_match = re.search(r"<점수>(\d+)</점수>", validation_result)
-        score = float(score_match.group(1)) if score_match else 0
 
-        state["validation_result"] = validation_result
-        state["architecture_score"] = score
-        state["current_node"] = "Validate"
-        state["next_node"] = "supervisor"
-        logger.info(f"Validate node execution successful: {validation_result}")
-        return state
+async def adiagram_node(state: State) -> State:
+    logger.info("Executing diagram node (async)")
+    usage = NodeUsage(state["context"]["model_id"])
+    try:
+        diagram_result = state.get("diagram_result")
+        if not diagram_result:
+            diagram_result = await render_service.arender(
+                state["yaml_content"], state.get("workspace")
+            )
+            usage.add_render(diagram_result)
+        return apply_diagram_result(state, diagram_result)
     except Exception as e:
-        logger.error(f"Validate node execution failed: {str(e)}")
-        state["next_node"] = "FINISH"
-        return state
+        return fail_node(state, "Diagram", e)
+    finally:
+        record_node(state, "Diagram", usage)
+
+
+async def avalidate_node(state: State) -> State:
+    logger.info("Executing validate node (async)")
+    llm, usage = metered_llm(state, "Validate")
+    try:
+        # 이미지 읽기/해시와 이미지 전처리(Pillow)는 스레드에서 실행합니다.
+        validation_result = await asyncio.to_thread(reuse_validation, state)
+        if validation_result is not None:
+            return apply_validation_result(state, validation_result)
+        messages = await asyncio.to_thread(build_validate_messages, state)
+        response = await llm.ainvoke(messages)
+        fallback = None if has_score(response.content) else escalation_llm(state, usage)
+        if fallback is not None:
+            response = await fallback.ainvoke(messages)
+        await asyncio.to_thread(record_validated_image, state)
+        return apply_validation_result(state, response.content)
+    except LLMThrottled as e:
+        return defer_node(state, e)
+    except Exception as e:
+        return fail_node(state, "Validate", e)
+    finally:
+        record_node(state, "Validate", usage)
+
+
+ACCEPT_SCORE = 90
+
+
+def stop_run(state: State, reason: str) -> State:
+    # 승인되지 않은 채 멈추면 마지막 설계 대신 최고 점수 설계를 결과로 남깁니다.
+    state["stop_reason"] = reason
+    if reason != "accepted":
+        restore_best_design(state)
+    state["next_node"] = "FINISH"
+    return state
 
 
 def supervisor_node(state: State) -> State:
     logger.info(f"Executing supervisor node. Current state: {state['current_node']}")
     try:
+        context = state["context"]
         state["iteration_count"] = state.get("iteration_count", 0) + 1
         logger.info(f"Iteration count: {state['iteration_count']}")
 
-        if state["iteration_count"] >= 25:
+        validated = state["current_node"] == "Validate" and state["validation_result"]
+        if validated:
+            state["score_history"] = state.get("score_history", []) + [
+                state["architecture_score"]
+            ]
+            state["best_design"] = update_best_design(state.get("best_design"), state)
+            logger.info(f"Score history: {state['score_history']}")
+        budget = budget_exhausted(
+            context,
+            state.get("started_at", time.time()),
+            summarize(state.get("metrics")),
+        )
+
+        if validated and state["architecture_score"] >= ACCEPT_SCORE:
+            logger.info("Architecture is satisfactory and validated. Finishing.")
+            stop_run(state, "accepted")
+        elif state["iteration_count"] >= context["max_iterations"]:
             logger.warning("Reached maximum iteration count. Finishing.")
-            state["next_node"] = "FINISH"
+            stop_run(state, "max_iterations")
+        elif budget:
+            logger.warning(f"Run exceeded its {budget}. Finishing with best design.")
+            stop_run(state, budget)
+        elif validated and has_converged(
+            state["score_history"],
+            context["convergence_window"],
+            context["min_improvement"],
+        ):
+            logger.info("Validation score has converged. Finishing with best design.")
+            stop_run(state, "converged")
         elif state["current_node"] == "supervisor" and not state["yaml_content"]:
             logger.info("Initial state or no YAML content. Moving to Architect node.")
             state["next_node"] = "Architect"
         elif state["current_node"] == "Architect" and state["yaml_content"]:
             logger.info("YAML content generated. Moving to Diagram node.")
             state["next_node"] = "Diagram"
+        elif state["current_node"] == "Architect" and state["schema_diagnostics"]:
+            logger.info("YAML rejected by schema check. Retrying Architect node.")
+            state["next_node"] = "Architect"
         elif state["current_node"] == "Diagram" and state["diagram_generated"]:
             logger.info("Diagram generated. Moving to Validate node.")
             state["next_node"] = "Validate"
-        elif state["current_node"] == "Validate" and state["validation_result"]:
-            if state["architecture_score"] >= 90:
-                logger.info("Architecture is satisfactory and validated. Finishing.")
-                state["next_node"] = "FINISH"
-            else:
-                logger.info("Starting new architecture design cycle.")
-                state["previous_validation"] = state["validation_result"]
-                state["previous_score"] = state["architecture_score"]
-                state["yaml_content"] = ""
-                state["diagram_generated"] = False
-                state["validation_result"] = ""
-                state["architecture_score"] = 0
-                state["next_node"] = "Architect"
+        elif validated:
+            logger.info("Starting new architecture design cycle.")
+            state["previous_validation"] = state["validation_result"]
+            state["previous_score"] = state["architecture_score"]
+            if context.get("refine"):
+                state["base_yaml"] = state["yaml_content"]
+                state["base_explanation"] = state["architecture_explanation"]
+            state["yaml_content"] = ""
+            state["diagram_result"] = {}
+            state["diagram_generated"] = False
+            state["validation_result"] = ""
+            state["architecture_score"] = 0
+            state["next_node"] = "Architect"
         else:
             logger.warning(
                 f"Unexpected state: {state['current_node']}. Moving to Architect node."
@@ -253,17 +807,24 @@ def supervisor_node(state: State) -> State:
         logger.info(f"Supervisor decision: Next node is {state['next_node']}")
         return state
     except Exception as e:
-        logger.error(f"Supervisor node execution failed: {str(e)}")
-        state["next_node"] = "FINISH"
-        return state
+        return fail_node(state, "Supervisor", e)
+
 
+def create_workflow(async_nodes: bool = False):
+    # langgraph와 체크포인트 저장소는 그래프를 처음 컴파일할 때 불러옵니다.
+    from checkpoints import get_checkpoint_store
+    from langgraph.graph import END, StateGraph
 
-def create_workflow(model_id: str):
     workflow = StateGraph(State)
 
-    workflow.add_node("Architect", architect_node)
-    workflow.add_node("Diagram", diagram_node)
-    workflow.add_node("Validate", validate_node)
+    if async_nodes:
+        workflow.add_node("Architect", aarchitect_node)
+        workflow.add_node("Diagram", adiagram_node)
+        workflow.add_node("Validate", avalidate_node)
+    else:
+        workflow.add_node("Architect", architect_node)
+        workflow.add_node("Diagram", diagram_node)
+        workflow.add_node("Validate", validate_node)
     workflow.add_node("supervisor", supervisor_node)
 
     members = ["Architect", "Diagram", "Validate"]
@@ -279,74 +840,516 @@ def create_workflow(model_id: str):
 
     workflow.set_entry_point("supervisor")
 
-    graph = workflow.compile()
+    # 노드 경계마다 State를 체크포인트로 저장해 같은 run_id로 실행을 이어갈 수 있게 합니다.
+    return workflow.compile(checkpointer=get_checkpoint_store())
 
-    os.makedirs("assets", exist_ok=True)
-    png_data = graph.get_graph(xray=True).draw_mermaid_png()
-    with open("assets/graph.png", "wb") as f:
-        f.write(png_data)
 
+# 컴파일된 그래프는 프로세스 전체에서 공유합니다. 모델 ID는 state["context"]에서 읽으므로
+# 그래프 구조를 바꾸는 옵션만 키로 사용합니다.
+_compiled_workflows: Dict[tuple, object] = {}
+_compiled_workflows_lock = threading.Lock()
+
+
+def get_workflow(**options):
+    key = tuple(sorted(options.items()))
+    with _compiled_workflows_lock:
+        graph = _compiled_workflows.get(key)
+        if graph is None:
+            logger.info(f"Compiling workflow graph with options: {options}")
+            graph = create_workflow(**options)
+            _compiled_workflows[key] = graph
     return graph
 
 
-def run_aws_architect_agent(
-    question: str, model_id: str
-) -> Generator[Dict, None, None]:
-    logger.info(f"Running AWS Architect Agent with question: {question}")
+def export_graph_image(path: str = "assets/graph.png") -> str:
+    # mermaid 렌더링은 네트워크를 사용하므로 요청 경로가 아닌 빌드 단계에서만 호출합니다.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    png_data = get_workflow().get_graph(xray=True).draw_mermaid_png()
+    with open(path, "wb") as f:
+        f.write(png_data)
+    return path
+
+
+# 실행 옵션 기본값. run_aws_architect_agent(..., **options)로 실행마다 덮어쓰며
+# state["context"]에 저장되어 노드에서 읽습니다.
+DEFAULT_RUN_OPTIONS = {
+    "stream": False,
+    "candidates": int(os.environ.get("ARCHITECT_CANDIDATES", 1)),
+    "candidate_concurrency": (
+        int(os.environ.get("ARCHITECT_CANDIDATE_CONCURRENCY", 0)) or None
+    ),
+    "refine": os.environ.get("ARCHITECT_REFINE", "false").lower() == "true",
+    "design_cache": (
+        os.environ.get("ARCHITECT_DESIGN_CACHE", "true").lower() == "true"
+    ),
+    "max_iterations": MAX_ITERATIONS,
+    "max_seconds": MAX_SECONDS,
+    "max_tokens": MAX_TOKENS,
+    "convergence_window": CONVERGENCE_WINDOW,
+    "min_improvement": MIN_IMPROVEMENT,
+    "model_routing": MODEL_ROUTING,
+}
+
+
+def create_initial_state(
+    question: str,
+    model_id: str,
+    workspace: str,
+    run_id: Optional[str] = None,
+    **options,
+) -> State:
+    unknown = set(options) - set(DEFAULT_RUN_OPTIONS)
+    if unknown:
+        raise TypeError(f"Unknown run options: {sorted(unknown)}")
+    context = {"model_id": model_id, "run_id": run_id or uuid.uuid4().hex}
+    context.update(DEFAULT_RUN_OPTIONS)
+    context.update({k: v for k, v in options.items() if v is not None})
+
+    from langchain_core.messages import SystemMessage
 
-    graph = create_workflow(model_id)
-    initial_state = State(
+    return State(
         messages=[
             SystemMessage(
                 content=f"당신은 AWS Solutions Architect입니다. 고객의 질문에 대해 최적의 AWS 아키텍처를 설계하고, diagram-as-code YAML 형식으로 답변해야 합니다. YAML DIAGRAM은 Markdown 없이 <DIAGRAM> </DIAGRAM> 태그로 감싸주세요."
             ),
-            HumanMessage(content=question),
+            human_message(question),
         ],
         yaml_content="",
         bedrock_response="",
-        context={"model_id": model_id},
+        context=context,
         current_node="supervisor",
         next_node="supervisor",
         architecture_explanation="",
         diagram_generated=False,
+        diagram_result={},
+        diagram_feedback={},
+        previous_validation="",
+        previous_score=0,
         validation_result="",
         iteration_count=0,
         architecture_score=0,
+        workspace=workspace,
+        base_yaml="",
+        base_explanation="",
+        schema_diagnostics="",
+        metrics={},
+        seed_yaml="",
+        seed_explanation="",
+        validated_image_hash="",
+        score_history=[],
+        best_design={},
+        started_at=time.time(),
+        stop_reason="",
+        node_error="",
+        model_escalation="",
+    )
+
+
+def graph_config(state: State) -> dict:
+    from checkpoints import run_config
+
+    # supervisor와 작업 노드가 번갈아 실행되므로 반복 한 번에 그래프 단계가 두 번 필요합니다.
+    config = run_config(state["context"]["run_id"])
+    config["recursion_limit"] = 2 * state["context"]["max_iterations"] + 5
+    return config
+
+
+# 설계 결과에 영향을 주는 실행 옵션. 모델 ID와 함께 설계 캐시의 프로필이 됩니다.
+DESIGN_PROFILE_OPTIONS = ("candidates", "refine", "model_routing")
+
+
+def cache_profile(context: dict) -> str:
+    return design_profile(
+        context["model_id"], {k: context.get(k) for k in DESIGN_PROFILE_OPTIONS}
+    )
+
+
+def find_cached_design(question: str, state: State) -> Optional[dict]:
+    # 거의 같은 요구사항이면 저장된 설계를 그대로 반환하고, 비슷하면 state에 출발점으로 넣습니다.
+    # 다른 모델이나 실행 옵션으로 만든 설계는 재사용하지 않습니다.
+    if not state["context"].get("design_cache"):
+        return None
+    similarity, design = design_cache.lookup(question, cache_profile(state["context"]))
+    if design is None:
+        return None
+    if similarity >= design_cache.reuse_threshold:
+        logger.info(f"Reusing cached design (similarity {similarity:.3f})")
+        design["similarity"] = similarity
+        return design
+
+    logger.info(f"Seeding architect with cached design (similarity {similarity:.3f})")
+    state["seed_yaml"] = design["yaml_content"]
+    state["seed_explanation"] = design["architecture_explanation"]
+    if state["context"].get("refine"):
+        # 패치 모드에서는 첫 사이클부터 기존 설계에 대한 패치를 요청합니다.
+        state["base_yaml"] = design["yaml_content"]
+        state["base_explanation"] = design["architecture_explanation"]
+    return None
+
+
+def cached_design_statuses(design: dict) -> list:
+    return [
+        {
+            "yaml_content": design["yaml_content"],
+            "architecture_explanation": design["architecture_explanation"],
+        },
+        {"diagram_generated": bool(design["image"]), "diagram_image": design["image"]},
+        {
+            "validation_result": design["validation_result"],
+            "architecture_score": design["architecture_score"],
+        },
+        {
+            "design_cache": {
+                "similarity": design["similarity"],
+                "question": design["question"],
+            }
+        },
+    ]
+
+
+def remember_design(question: str, state: State) -> None:
+    # 승인 점수를 넘긴 설계만 저장해 이후 비슷한 요청에서 재사용합니다.
+    if (
+        not state["context"].get("design_cache")
+        or not state.get("yaml_content")
+        or state.get("architecture_score", 0) < ACCEPT_SCORE
+    ):
+        return
+    design_cache.put(
+        question,
+        state["yaml_content"],
+        state["architecture_explanation"],
+        state["validation_result"],
+        state["architecture_score"],
+        (state.get("diagram_result") or {}).get("image"),
+        cache_profile(state["context"]),
+    )
+
+
+def best_design_statuses(state: State) -> list:
+    # 승인되지 않은 채 멈췄으면 마지막으로 내보낸 설계 대신 최고 점수 설계를 다시 내보냅니다.
+    # 노드가 실패해 끝났으면 그 오류도 함께 내보냅니다.
+    statuses = []
+    if state.get("node_error"):
+        statuses.append({"node_error": state["node_error"]})
+    reason = state.get("stop_reason")
+    if not reason or reason == "accepted":
+        return statuses
+    if state.get("best_design"):
+        diagram_result = state.get("diagram_result") or {}
+        statuses += [
+            {
+                "yaml_content": state["yaml_content"],
+                "architecture_explanation": state["architecture_explanation"],
+            },
+            {
+                "diagram_generated": state["diagram_generated"],
+                "diagram_image": diagram_result.get("image"),
+            },
+            {
+                "validation_result": state["validation_result"],
+                "architecture_score": state["architecture_score"],
+            },
+        ]
+    statuses.append(
+        {"stop_reason": reason, "best_score": state.get("architecture_score", 0)}
+    )
+    return statuses
+
+
+def status_from_output(output) -> tuple:
+    # graph.stream 출력 하나를 (state, UI에 전달할 상태 dict 또는 None)으로 변환합니다.
+    logger.debug(f"Graph output: {output}")
+
+    if isinstance(output, dict) and len(output) == 1:
+        node_name, state = next(iter(output.items()))
+    else:
+        raise ValueError(f"Unexpected output format: {output}")
+
+    current_node = state.get("current_node")
+    if current_node is None:
+        raise ValueError(f"current_node not found in state: {state}")
+
+    logger.info(f"Current node: {current_node}")
+
+    status = None
+    if node_name != current_node:
+        # supervisor와 스로틀링으로 미뤄진 노드는 current_node를 바꾸지 않으므로
+        # 직전 노드의 상태를 다시 내보내지 않습니다.
+        if node_name == "supervisor":
+            logger.info(f"Supervisor decision: Next node is {state['next_node']}")
+    elif current_node == "Architect":
+        status = {
+            "yaml_content": state["yaml_content"],
+            "architecture_explanation": state["architecture_explanation"],
+        }
+    elif current_node == "Diagram":
+        diagram_result = state.get("diagram_result") or {}
+        status = {
+            "diagram_generated": state["diagram_generated"],
+            "diagram_image": diagram_result.get("image"),
+        }
+    elif current_node == "Validate":
+        status = {
+            "validation_result": state["validation_result"],
+            "architecture_score": state["architecture_score"],
+        }
+    elif current_node == "supervisor":
+        next_node = state["next_node"]
+        logger.info(f"Supervisor decision: Next node is {next_node}")
+
+    return state, status
+
+
+def metrics_event(state: State) -> dict:
+    # 노드 실행이 끝날 때마다 누적 지표를 {"metrics": ...} 이벤트로 내보냅니다.
+    metrics = state.get("metrics") or {}
+    return {
+        "metrics": {
+            "node": state["current_node"],
+            "model_escalation": state.get("model_escalation", ""),
+            "nodes": metrics,
+            "totals": summarize(metrics),
+        }
+    }
+
+
+def resume_update(snapshot, saved, initial_state: State) -> tuple:
+    # graph.update_state에 넘길 (values, as_node).
+    # 노드 결과를 내보낸 직후 중단되면 체크포인트에는 그 노드의 쓰기만 남아 있습니다.
+    # 이를 그 노드의 결과로 적용해, 이어서 실행할 때 같은 노드(LLM 호출)를 다시 실행하지 않습니다.
+    # 이전 작업 디렉터리는 삭제되었거나 다른 파드에 있으므로 현재 실행의 것으로 바꿉니다.
+    run_id = initial_state["context"]["run_id"]
+    values = {"workspace": initial_state["workspace"], "context": initial_state["context"]}
+    writes = {
+        channel: value
+        for _, channel, value in (saved.pending_writes if saved else None) or []
+        if channel in State.__annotations__
+    }
+    if len(snapshot.next) == 1 and writes:
+        node = snapshot.next[0]
+        logger.info(f"Resuming run {run_id} with the saved output of {node}")
+        return {**writes, **values}, node
+    logger.info(f"Resuming run {run_id} before {snapshot.next}")
+    return values, None
+
+
+def checkpoint_statuses(state: State) -> list:
+    # 이어서 실행할 때 체크포인트의 설계를 먼저 내보내 UI가 YAML, 다이어그램, 검증 결과를
+    # 처음부터 다시 그리게 합니다.
+    statuses = []
+    if state.get("yaml_content"):
+        statuses.append(
+            {
+                "yaml_content": state["yaml_content"],
+                "architecture_explanation": state["architecture_explanation"],
+            }
+        )
+    if state.get("diagram_generated"):
+        statuses.append(
+            {
+                "diagram_generated": True,
+                "diagram_image": (state.get("diagram_result") or {}).get("image"),
+            }
+        )
+    if state.get("validation_result"):
+        statuses.append(
+            {
+                "validation_result": state["validation_result"],
+                "architecture_score": state["architecture_score"],
+            }
+        )
+    return statuses
+
+
+def resume_input(graph, initial_state: State) -> tuple:
+    # (그래프 입력, 먼저 내보낼 상태 목록). 같은 run_id의 체크포인트가 남아 있으면
+    # 입력은 None(마지막 체크포인트부터 이어서 실행)이고, 없으면 초기 상태입니다.
+    if graph.checkpointer is None:
+        return initial_state, []
+    config = graph_config(initial_state)
+    snapshot = graph.get_state(config)
+    if not snapshot.next:
+        return initial_state, []
+    saved = graph.checkpointer.get_tuple(config)
+    graph.update_state(config, *resume_update(snapshot, saved, initial_state))
+    return None, checkpoint_statuses(graph.get_state(config).values)
+
+
+async def aresume_input(graph, initial_state: State) -> tuple:
+    if graph.checkpointer is None:
+        return initial_state, []
+    config = graph_config(initial_state)
+    snapshot = await graph.aget_state(config)
+    if not snapshot.next:
+        return initial_state, []
+    saved = await graph.checkpointer.aget_tuple(config)
+    await graph.aupdate_state(config, *resume_update(snapshot, saved, initial_state))
+    return None, checkpoint_statuses((await graph.aget_state(config)).values)
+
+
+def finish_run(graph, run_id: str) -> None:
+    if graph.checkpointer is not None:
+        graph.checkpointer.delete_run(run_id)
+
+
+def stream_graph_with_events(graph, graph_input: Optional[State], config: dict):
+    # 그래프를 별도 스레드에서 실행하고, 노드 출력과 노드 중간 이벤트를 하나의 큐로 합칩니다.
+    run_id = config["configurable"]["thread_id"]
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def run_graph():
+        try:
+            for output in graph.stream(graph_input, config):
+                events.put(("output", output))
+                if stop.is_set():
+                    break
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            events.put(("done", None))
+
+    register_sink(run_id, lambda event: events.put(("event", event)))
+    worker = threading.Thread(target=run_graph, name=f"graph-{run_id}", daemon=True)
+    worker.start()
+    try:
+        while True:
+            kind, payload = events.get()
+            if kind == "done":
+                break
+            if kind == "error":
+                raise payload
+            yield kind, payload
+    finally:
+        stop.set()
+        unregister_sink(run_id)
+
+
+def run_aws_architect_agent(
+    question: str,
+    model_id: str,
+    workspace: Optional[str] = None,
+    run_id: Optional[str] = None,
+    **options,
+) -> Generator[Dict, None, None]:
+    logger.info(f"Running AWS Architect Agent with question: {question}")
+
+    # workspace를 넘기지 않으면 실행 전용 임시 디렉터리를 만들고 종료 시 삭제합니다.
+    owns_workspace = workspace is None
+    if owns_workspace:
+        workspace = create_workspace()
+
+    graph = get_workflow()
+    initial_state = create_initial_state(
+        question, model_id, workspace, run_id, **options
     )
+    run_id = initial_state["context"]["run_id"]
+    config = graph_config(initial_state)
+    outputs = None
 
     try:
-        for output in graph.stream(initial_state):
-            logger.debug(f"Graph output: {output}")
-
-            if isinstance(output, dict) and len(output) == 1:
-                node_name, state = next(iter(output.items()))
-            else:
-                raise ValueError(f"Unexpected output format: {output}")
-
-            current_node = state.get("current_node")
-            if current_node is None:
-                raise ValueError(f"current_node not found in state: {state}")
-
-            logger.info(f"Current node: {current_node}")
-
-            if current_node == "Architect":
-                yield {
-                    "yaml_content": state["yaml_content"],
-                    "architecture_explanation": state["architecture_explanation"],
-                }
-            elif current_node == "Diagram":
-                yield {"diagram_generated": state["diagram_generated"]}
-            elif current_node == "Validate":
-                yield {"validation_result": state["validation_result"]}
-            elif current_node == "supervisor":
-                next_node = state["next_node"]
-                logger.info(f"Supervisor decision: Next node is {next_node}")
+        # run_id를 저장해 두면 세션이 끊겨도 같은 run_id로 다시 호출해 이어서 실행할 수 있습니다.
+        yield {"run_id": run_id}
+        graph_input, resumed = resume_input(graph, initial_state)
+        yield from resumed
+        if graph_input is not None:
+            design = find_cached_design(question, initial_state)
+            if design is not None:
+                yield from cached_design_statuses(design)
+                return
+
+        if initial_state["context"]["stream"]:
+            outputs = stream_graph_with_events(graph, graph_input, config)
+        else:
+            outputs = (
+                ("output", output) for output in graph.stream(graph_input, config)
+            )
+
+        for kind, payload in outputs:
+            if kind == "event":
+                yield payload
+                continue
+
+            state, status = status_from_output(payload)
+            if status is not None:
+                yield status
+                yield metrics_event(state)
 
             if state["next_node"] == "FINISH":
                 logger.info("Workflow completed")
+                yield from best_design_statuses(state)
+                remember_design(question, state)
+                finish_run(graph, run_id)
                 break
 
     except Exception as e:
         logger.error(f"Error occurred in run_aws_architect_agent: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         yield {"error": str(e), "traceback": traceback.format_exc()}
+    finally:
+        if outputs is not None:
+            outputs.close()
+        render_service.cancel(workspace)
+        if owns_workspace:
+            remove_workspace(workspace)
+
+
+async def arun_aws_architect_agent(
+    question: str,
+    model_id: str,
+    workspace: Optional[str] = None,
+    run_id: Optional[str] = None,
+    **options,
+) -> AsyncGenerator[Dict, None]:
+    # run_aws_architect_agent와 같은 상태 dict를 내보내는 asyncio 버전
+    logger.info(f"Running AWS Architect Agent (async) with question: {question}")
+
+    owns_workspace = workspace is None
+    if owns_workspace:
+        workspace = await asyncio.to_thread(create_workspace)
+
+    graph = get_workflow(async_nodes=True)
+    initial_state = create_initial_state(
+        question, model_id, workspace, run_id, **options
+    )
+    run_id = initial_state["context"]["run_id"]
+
+    try:
+        yield {"run_id": run_id}
+        graph_input, resumed = await aresume_input(graph, initial_state)
+        for status in resumed:
+            yield status
+        if graph_input is not None:
+            design = await asyncio.to_thread(
+                find_cached_design, question, initial_state
+            )
+            if design is not None:
+                for status in cached_design_statuses(design):
+                    yield status
+                return
+
+        async for output in graph.astream(graph_input, graph_config(initial_state)):
+            state, status = status_from_output(output)
+            if status is not None:
+                yield status
+                yield metrics_event(state)
+
+            if state["next_node"] == "FINISH":
+                logger.info("Workflow completed")
+                for status in best_design_statuses(state):
+                    yield status
+                await asyncio.to_thread(remember_design, question, state)
+                await asyncio.to_thread(finish_run, graph, run_id)
+                break
+
+    except Exception as e:
+        logger.error(f"Error occurred in arun_aws_architect_agent: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        yield {"error": str(e), "traceback": traceback.format_exc()}
+    finally:
+        render_service.cancel(workspace)
+        if owns_workspace:
+            await asyncio.to_thread(remove_workspace, workspace)
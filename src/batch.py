@@ -0,0 +1,307 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Optional
+
+from jobs import DEFAULT_MODEL_ID
+
+logger = logging.getLogger(__name__)
+
+RESULT_POLL_SECONDS = 1.0
+
+
+def requirement_id(question: str) -> str:
+    # ID가 없는 요구사항은 내용 해시를 ID로 사용해 다시 실행해도 같은 ID가 나오게 합니다.
+    return hashlib.sha256(question.encode("utf-8")).hexdigest()[:16]
+
+
+def read_requirements(path: str) -> list:
+    # JSONL({"id", "question", "model_id", "options"}) 또는
+    # CSV(id, question, model_id, options 열. options는 JSON 객체 문자열)
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    requirements = []
+    seen = set()
+    for line_number, row in enumerate(rows, 1):
+        question = (row.get("question") or "").strip()
+        if not question:
+            raise ValueError(f"{path}:{line_number}: question is empty")
+        options = row.get("options") or {}
+        if isinstance(options, str):
+            try:
+                options = json.loads(options)
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: options is not valid JSON")
+        if not isinstance(options, dict):
+            raise ValueError(f"{path}:{line_number}: options must be a JSON object")
+        item = {
+            "id": str(row.get("id") or requirement_id(question)),
+            "question": question,
+            "model_id": row.get("model_id") or None,
+            "options": options,
+        }
+        if item["id"] in seen:
+            raise ValueError(f"{path}:{line_number}: duplicate id {item['id']}")
+        seen.add(item["id"])
+        requirements.append(item)
+    return requirements
+
+
+def completed_ids(output_path: str) -> set:
+    # 이전 실행의 결과 파일에서 성공한 ID. 실패한 요구사항은 다시 실행합니다.
+    if not os.path.exists(output_path):
+        return set()
+    completed = set()
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 중단된 실행이 마지막 줄을 쓰다 말았을 수 있습니다.
+                continue
+            if record.get("status") == "succeeded":
+                completed.add(record["id"])
+    return completed
+
+
+def artifact_name(requirement_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", requirement_id) + ".png"
+
+
+def run_requirement(item: dict, model_id: str, options: dict, output_dir: str) -> dict:
+    # 요구사항 하나를 끝까지 실행하고 결과 레코드를 만듭니다. 다이어그램은 PNG 파일로 저장합니다.
+    from architect import ACCEPT_SCORE, run_aws_architect_agent
+
+    started = time.perf_counter()
+    final = {}
+    for status in run_aws_architect_agent(
+        item["question"],
+        item["model_id"] or model_id,
+        **{**options, **item["options"]},
+    ):
+        final.update(status)
+
+    # 승인되면 stop_reason 이벤트가 없으므로 점수로 판단하고, 오류나 노드 실패로
+    # 끝난 실행은 승인으로 기록하지 않습니다.
+    if "error" in final or "node_error" in final:
+        stop_reason = "error"
+    elif final.get("stop_reason"):
+        stop_reason = final["stop_reason"]
+    elif (final.get("architecture_score") or 0) >= ACCEPT_SCORE:
+        stop_reason = "accepted"
+    else:
+        stop_reason = None
+    # 설계 없이 끝났거나 노드가 실패한 실행은 실패로 기록해 이어서 실행할 때 다시 시도합니다.
+    error = final.get("error") or final.get("node_error")
+    if error is None and (not final.get("yaml_content") or stop_reason is None):
+        error = "run finished without an accepted or stopped design"
+
+    diagram = None
+    if final.get("diagram_image"):
+        diagram = artifact_name(item["id"])
+        with open(os.path.join(output_dir, diagram), "wb") as f:
+            f.write(final["diagram_image"])
+    return {
+        "id": item["id"],
+        "question": item["question"],
+        "status": "failed" if error else "succeeded",
+        "error": error,
+        "yaml_content": final.get("yaml_content"),
+        "architecture_explanation": final.get("architecture_explanation"),
+        "validation_result": final.get("validation_result"),
+        "architecture_score": final.get("architecture_score"),
+        "stop_reason": stop_reason,
+        "diagram": diagram,
+        "metrics": (final.get("metrics") or {}).get("totals", {}),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def worker_thread(tasks, results, model_id: str, options: dict, output_dir: str):
+    while True:
+        item = tasks.get()
+        if item is None:
+            return
+        try:
+            record = run_requirement(item, model_id, options, output_dir)
+        except Exception as e:
+            logger.exception(f"Requirement {item['id']} failed")
+            record = {
+                "id": item["id"],
+                "question": item["question"],
+                "status": "failed",
+                "error": str(e),
+            }
+        results.put(record)
+
+
+def worker_process(tasks, results, concurrency: int, model_id, options, output_dir):
+    # 프로세스마다 awsdac 렌더링과 캐시를 따로 두고, 프로세스 안에서는 스레드로
+    # 여러 요구사항의 Bedrock 호출을 동시에 진행합니다.
+    # 여러 프로세스가 같은 SQLite 체크포인트에 쓰지 않도록 따로 지정하지 않았으면 끈 채로 둡니다.
+    # 배치의 이어하기는 결과 파일 기준으로 합니다.
+    os.environ.setdefault("ARCHITECT_CHECKPOINT_DB", "")
+    threads = [
+        threading.Thread(
+            target=worker_thread,
+            args=(tasks, results, model_id, options, output_dir),
+            daemon=True,
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize_batch(records: list, pending: int, skipped: int, elapsed: float) -> dict:
+    seconds = [r["seconds"] for r in records if "seconds" in r]
+    metrics = [r.get("metrics") or {} for r in records]
+    succeeded = sum(1 for r in records if r["status"] == "succeeded")
+    summary = {
+        "processed": len(records),
+        "succeeded": succeeded,
+        "failed": len(records) - succeeded,
+        "skipped": skipped,
+        # 워커 프로세스가 비정상 종료해 결과가 없는 요구사항. 다시 실행하면 이어서 처리합니다.
+        "unfinished": pending - len(records),
+        "elapsed_seconds": round(elapsed, 1),
+        "designs_per_hour": round(len(records) / elapsed * 3600, 1) if elapsed else 0,
+        "input_tokens": sum(m.get("input_tokens", 0) for m in metrics),
+        "output_tokens": sum(m.get("output_tokens", 0) for m in metrics),
+        "cost_usd": round(sum(m.get("cost_usd", 0) for m in metrics), 4),
+    }
+    if seconds:
+        summary.update(
+            {
+                "mean_seconds": round(sum(seconds) / len(seconds), 1),
+                "p50_seconds": round(percentile(seconds, 0.5), 1),
+                "p95_seconds": round(percentile(seconds, 0.95), 1),
+            }
+        )
+    return summary
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    processes: int = 2,
+    concurrency: int = 2,
+    model_id: str = DEFAULT_MODEL_ID,
+    options: Optional[dict] = None,
+) -> dict:
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    requirements = read_requirements(input_path)
+    done = completed_ids(output_path)
+    pending = [item for item in requirements if item["id"] not in done]
+    skipped = len(requirements) - len(pending)
+    logger.info(
+        f"Batch: {len(pending)} pending, {skipped} already completed, "
+        f"{processes} process(es) x {concurrency} thread(s)"
+    )
+
+    started = time.perf_counter()
+    records = []
+    if pending:
+        tasks = multiprocessing.Queue()
+        results = multiprocessing.Queue()
+        for item in pending:
+            tasks.put(item)
+        for _ in range(processes * concurrency):
+            tasks.put(None)
+        workers = [
+            multiprocessing.Process(
+                target=worker_process,
+                args=(tasks, results, concurrency, model_id, options or {}, output_dir),
+                daemon=True,
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        # 결과가 나오는 대로 한 줄씩 기록해 중간에 멈춰도 완료한 요구사항은 남깁니다.
+        with open(output_path, "a", encoding="utf-8") as out:
+            while len(records) < len(pending):
+                try:
+                    record = results.get(timeout=RESULT_POLL_SECONDS)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        logger.error("All batch workers exited before finishing")
+                        break
+                    continue
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                records.append(record)
+                logger.info(
+                    f"[{len(records)}/{len(pending)}] {record['id']} "
+                    f"{record['status']} ({record.get('seconds', 0)}s)"
+                )
+
+        for worker in workers:
+            worker.join(timeout=5)
+
+    return summarize_batch(
+        records, len(pending), skipped, time.perf_counter() - started
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="JSONL/CSV 요구사항 파일의 아키텍처를 일괄 설계합니다."
+    )
+    parser.add_argument("input", help="요구사항 파일 (.jsonl 또는 .csv)")
+    parser.add_argument(
+        "--output",
+        default="batch-output/results.jsonl",
+        help="결과 JSONL 경로. 다이어그램 PNG는 같은 디렉터리에 저장합니다.",
+    )
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument(
+        "--concurrency", type=int, default=2, help="프로세스당 동시 실행 수"
+    )
+    parser.add_argument("--model-id", default=DEFAULT_MODEL_ID)
+    parser.add_argument(
+        "--options", default="{}", help="모든 요구사항에 적용할 실행 옵션 (JSON)"
+    )
+    args = parser.parse_args()
+
+    summary = run_batch(
+        args.input,
+        args.output,
+        processes=args.processes,
+        concurrency=args.concurrency,
+        model_id=args.model_id,
+        options=json.loads(args.options),
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary["failed"] or summary["unfinished"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.serde.jsonplus import JsonPlusSerializer
+
+logger = logging.getLogger(__name__)
+
+# 실행 이어하기를 켜려면 DB 경로를 지정합니다. 여러 파드가 실행을 이어받으려면 공유 볼륨의
+# 경로를 지정합니다. 지정하지 않으면(빈 문자열) 체크포인트를 저장하지 않습니다.
+CHECKPOINT_DB = os.environ.get("ARCHITECT_CHECKPOINT_DB", "")
+# 끝나지 않은 채 버려진 실행(닫힌 세션 등)의 체크포인트를 보관하는 시간
+CHECKPOINT_TTL_HOURS = float(os.environ.get("ARCHITECT_CHECKPOINT_TTL_HOURS", 24))
+
+# JSON에서 다시 만들 수 있는 객체. langchain 메시지는 langchain_core의 Reviver가 처리합니다.
+ALLOWED_CONSTRUCTORS = {
+    ("base64", "b64decode"),
+    ("builtins", "set"),
+    ("builtins", "frozenset"),
+    ("datetime", "datetime"),
+    ("datetime", "timezone"),
+    ("datetime", "timedelta"),
+    ("uuid", "UUID"),
+    ("langgraph", "constants", "Send"),
+}
+
+
+class CheckpointSerializer(JsonPlusSerializer):
+    # 공유 볼륨의 DB를 읽으므로 pickle 대신 JSON으로 저장하고, 허용한 타입만 다시 만듭니다.
+    # 다이어그램 PNG(bytes)는 base64 문자열로 저장합니다.
+    def _default(self, obj):
+        if isinstance(obj, bytes):
+            return self._encode_constructor_args(
+                base64.b64decode, args=[base64.b64encode(obj).decode("ascii")]
+            )
+        return super()._default(obj)
+
+    def _reviver(self, value: dict):
+        if value.get("lc") == 2 and value.get("type") == "constructor":
+            if tuple(value.get("id") or ()) not in ALLOWED_CONSTRUCTORS:
+                raise ValueError(f"Refusing to load checkpoint object {value.get('id')}")
+        return super()._reviver(value)
+
+
+class CheckpointStore(SqliteSaver):
+    # SqliteSaver는 동기 메서드만 지원하므로 비동기 메서드는 스레드에서 실행합니다.
+    # 버려진 실행을 정리할 수 있도록 실행별 마지막 저장 시각을 runs 테이블에 기록합니다.
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs "
+            "(thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def put(self, config, checkpoint, metadata, *args):
+        saved = super().put(config, checkpoint, metadata, *args)
+        with self.lock, self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO runs (thread_id, updated_at) VALUES (?, ?)",
+                (config["configurable"]["thread_id"], time.time()),
+            )
+        return saved
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, **kwargs):
+        items = await asyncio.to_thread(lambda: list(self.list(config, **kwargs)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, *args):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, *args)
+
+    async def aput_writes(self, config, writes, task_id):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id)
+
+    def delete_run(self, run_id: str) -> None:
+        # 완료된 실행의 체크포인트는 다시 이어받을 일이 없으므로 삭제해 DB 크기를 유지합니다.
+        with self.lock, self.cursor() as cur:
+            cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (run_id,))
+            cur.execute("DELETE FROM writes WHERE thread_id = ?", (run_id,))
+            cur.execute("DELETE FROM runs WHERE thread_id = ?", (run_id,))
+        # 실행이 끝날 때마다 오래된 실행도 함께 정리해 오래 떠 있는 파드에서도 DB가 커지지 않게 합니다.
+        self.prune()
+
+    def prune(self, max_age_hours: float = CHECKPOINT_TTL_HOURS) -> int:
+        # 마지막 체크포인트가 max_age_hours보다 오래된 실행을 지웁니다.
+        if max_age_hours <= 0:
+            return 0
+        cutoff = time.time() - max_age_hours * 3600
+        with self.lock, self.cursor() as cur:
+            cur.execute("SELECT thread_id FROM runs WHERE updated_at < ?", (cutoff,))
+            run_ids = [(row[0],) for row in cur.fetchall()]
+            for table in ("checkpoints", "writes", "runs"):
+                cur.executemany(f"DELETE FROM {table} WHERE thread_id = ?", run_ids)
+        if run_ids:
+            logger.info(f"Pruned checkpoints of {len(run_ids)} abandoned run(s)")
+        return len(run_ids)
+
+
+def open_checkpoint_store(path: str) -> CheckpointStore:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    store = CheckpointStore(conn, serde=CheckpointSerializer())
+    store.prune()
+    return store
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    global _store
+    if not CHECKPOINT_DB:
+        return None
+    with _store_lock:
+        if _store is None:
+            logger.info(f"Using checkpoint store at {CHECKPOINT_DB}")
+            _store = open_checkpoint_store(CHECKPOINT_DB)
+        return _store
+
+
+def run_config(run_id: str) -> dict:
+    return {"configurable": {"thread_id": run_id}}
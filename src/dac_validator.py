@@ -0,0 +1,203 @@
+import re
+
+import yaml
+
+from definitions import DEFAULT_DEFINITION_URL, local_definition_path
+
+DIAGRAM_TYPES = {
+    "AWS::Diagram::Canvas",
+    "AWS::Diagram::Cloud",
+    "AWS::Diagram::Group",
+    "AWS::Diagram::HorizontalStack",
+    "AWS::Diagram::VerticalStack",
+    "AWS::Diagram::Resource",
+}
+# libyaml이 있으면 C 로더를 사용해 파싱 시간을 줄입니다.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+TYPE_PATTERN = re.compile(r"^AWS::[A-Za-z0-9]+::[A-Za-z0-9]+$")
+DIRECTIONS = {"vertical", "horizontal"}
+POSITIONS = {
+    "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+    "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW",
+}  # fmt: skip
+
+
+# 정의 파일을 읽은 결과. 파일이 아직 없으면 저장하지 않아 나중에 받은 파일을 읽습니다.
+_known_definitions = None
+
+
+def known_definitions() -> tuple:
+    # 로컬 정의 파일 캐시가 있으면 (리소스 타입, 프리셋) 목록을 읽고, 없으면 빈 집합을 반환합니다.
+    global _known_definitions
+    if _known_definitions is not None:
+        return _known_definitions
+    path = local_definition_path(DEFAULT_DEFINITION_URL)
+    if not path:
+        return frozenset(), frozenset()
+    with open(path, "r", encoding="utf-8") as f:
+        definitions = (yaml.load(f, Loader=SafeLoader) or {}).get("Definitions") or {}
+    types = frozenset(k for k in definitions if k.startswith("AWS::"))
+    presets = frozenset(
+        k
+        for k, v in definitions.items()
+        if isinstance(v, dict) and v.get("Type") == "Preset"
+    )
+    _known_definitions = types, presets
+    return _known_definitions
+
+
+def _find_cycle(children_of: dict) -> list:
+    visiting, visited = set(), set()
+
+    def visit(name, path):
+        if name in visiting:
+            return path[path.index(name) :] + [name]
+        if name in visited or name not in children_of:
+            return []
+        visiting.add(name)
+        for child in children_of[name]:
+            cycle = visit(child, path + [name])
+            if cycle:
+                return cycle
+        visiting.discard(name)
+        visited.add(name)
+        return []
+
+    for name in children_of:
+        cycle = visit(name, [])
+        if cycle:
+            return cycle
+    return []
+
+
+def validate_diagram_yaml(yaml_content: str) -> dict:
+    # awsdac 없이 diagram-as-code 스키마를 검사합니다. 반환 형식은 analyze_diagram_output과 같습니다.
+    feedback = {"warnings": [], "errors": [], "suggestions": []}
+    errors, warnings = feedback["errors"], feedback["warnings"]
+
+    try:
+        document = yaml.load(yaml_content, Loader=SafeLoader)
+    except yaml.YAMLError as e:
+        errors.append(f"ERROR YAML parse error: {e}")
+        return feedback
+    diagram = document.get("Diagram") if isinstance(document, dict) else None
+    if not isinstance(diagram, dict):
+        errors.append("ERROR Top-level 'Diagram' mapping is missing")
+        return feedback
+    resources = diagram.get("Resources")
+    if not isinstance(resources, dict) or not resources:
+        errors.append("ERROR 'Diagram.Resources' must be a non-empty mapping")
+        return feedback
+    if not diagram.get("DefinitionFiles"):
+        errors.append("ERROR 'Diagram.DefinitionFiles' is missing")
+
+    known_types, known_presets = known_definitions()
+    parents = {}
+    # 모델 출력에는 목록/매핑 값이 들어올 수 있어, 이름으로 찾기 전에 문자열인지 확인합니다.
+    children_of = {}
+    for name, resource in resources.items():
+        if not isinstance(resource, dict):
+            errors.append(f"ERROR Resource '{name}' must be a mapping")
+            continue
+        resource_type = resource.get("Type")
+        if not isinstance(resource_type, str) or not TYPE_PATTERN.match(resource_type):
+            errors.append(f"ERROR Resource '{name}' has invalid Type '{resource_type}'")
+        elif (
+            known_types
+            and resource_type not in known_types
+            and resource_type not in DIAGRAM_TYPES
+        ):
+            errors.append(f"ERROR Resource '{name}' has unknown Type '{resource_type}'")
+        direction = resource.get("Direction")
+        if "Direction" in resource and (
+            not isinstance(direction, str) or direction not in DIRECTIONS
+        ):
+            errors.append(
+                f"ERROR Resource '{name}' has invalid Direction "
+                f"'{resource['Direction']}' (vertical or horizontal)"
+            )
+        if "Preset" in resource:
+            preset = resource["Preset"]
+            if not isinstance(preset, str) or not preset:
+                errors.append(f"ERROR Resource '{name}' has invalid Preset '{preset}'")
+            elif known_presets and preset not in known_presets:
+                warnings.append(f"WARN Resource '{name}' has unknown Preset '{preset}'")
+
+        children = resource.get("Children") or []
+        if not isinstance(children, list):
+            errors.append(f"ERROR Resource '{name}' Children must be a list")
+            continue
+        children_of[name] = []
+        for child in children:
+            if not isinstance(child, str):
+                errors.append(
+                    f"ERROR Resource '{name}' has invalid child '{child}' "
+                    "(must be a resource name)"
+                )
+            elif child not in resources:
+                errors.append(
+                    f"ERROR Resource '{name}' has undefined child '{child}'"
+                )
+            elif child in parents:
+                warnings.append(
+                    f"WARN Resource '{child}' has multiple parents "
+                    f"('{parents[child]}', '{name}')"
+                )
+            else:
+                parents[child] = name
+            if isinstance(child, str):
+                children_of[name].append(child)
+
+    cycle = _find_cycle(children_of)
+    if cycle:
+        errors.append(f"ERROR Children cycle detected: {' -> '.join(cycle)}")
+
+    roots = [
+        name
+        for name, resource in resources.items()
+        if isinstance(resource, dict) and resource.get("Type") == "AWS::Diagram::Canvas"
+    ]
+    if not roots:
+        errors.append("ERROR No AWS::Diagram::Canvas resource defined")
+    elif not cycle:
+        reachable, stack = set(), list(roots)
+        while stack:
+            name = stack.pop()
+            if name in reachable:
+                continue
+            reachable.add(name)
+            stack.extend(children_of.get(name, []))
+        for name in resources:
+            if name not in reachable:
+                errors.append(
+                    f"ERROR Resource '{name}' is orphaned (not reachable from Canvas)"
+                )
+
+    links = diagram.get("Links") or []
+    if not isinstance(links, list):
+        errors.append("ERROR 'Diagram.Links' must be a list")
+        links = []
+    for i, link in enumerate(links):
+        if not isinstance(link, dict):
+            errors.append(f"ERROR Link #{i} must be a mapping")
+            continue
+        for end in ("Source", "Target"):
+            if not isinstance(link.get(end), str) or link.get(end) not in resources:
+                errors.append(
+                    f"ERROR Link #{i} {end} '{link.get(end)}' is not a defined resource"
+                )
+            position = link.get(f"{end}Position")
+            if position is not None and (
+                not isinstance(position, str) or position not in POSITIONS
+            ):
+                errors.append(
+                    f"ERROR Link #{i} has invalid {end}Position '{position}'"
+                )
+        if link.get("Source") is not None and link.get("Source") == link.get("Target"):
+            warnings.append(f"WARN Link #{i} connects '{link['Source']}' to itself")
+
+    return feedback
+
+
+def format_diagnostics(feedback: dict) -> str:
+    return "\n".join(feedback["errors"] + feedback["warnings"])
@@ -0,0 +1,196 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import urllib.request
+from typing import Dict, Optional
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEFINITION_URL = "https://raw.githubusercontent.com/awslabs/diagram-as-code/main/definitions/definition-for-aws-icons-light.yaml"
+DEFINITIONS_DIR = os.environ.get("AWSDAC_DEFINITIONS_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "definitions"
+)
+MANIFEST_FILE = "manifest.json"
+
+_verified: Dict[str, str] = {}
+_verified_lock = threading.Lock()
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _local_name(url: str) -> str:
+    basename = os.path.basename(url.split("?", 1)[0]) or "definition"
+    return f"{hashlib.sha256(url.encode()).hexdigest()[:12]}-{basename}"
+
+
+def _download(url: str, path: str, timeout: float) -> None:
+    tmp_path = f"{path}.tmp"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        with open(tmp_path, "wb") as f:
+            for chunk in iter(lambda: response.read(1024 * 1024), b""):
+                f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def _download_asset(url: str, manifest: dict, directory: str, timeout: float) -> str:
+    name = _local_name(url)
+    path = os.path.join(directory, name)
+    logger.info(f"Downloading awsdac asset {url}")
+    _download(url, path, timeout)
+    manifest[url] = {"file": name, "sha256": _sha256(path)}
+    return path
+
+
+def _localize_urls(node, manifest: dict, directory: str, timeout: float):
+    # 정의 파일 안에서 참조하는 파일도 내려받아 로컬 경로로 바꿉니다.
+    # - 정의 파일 참조: {Type: URL, Url: ...} -> {Type: LocalFile, LocalFile: ...}
+    # - 아이콘 패키지: {Type: Zip, ZipFile: {SourceType: url, Url: ...}}
+    #   -> ZipFile: {SourceType: local, Path: ...}
+    if isinstance(node, dict):
+        url = node.get("Url")
+        if node.get("Type") == "URL" and isinstance(url, str):
+            path = _download_asset(url, manifest, directory, timeout)
+            return {"Type": "LocalFile", "LocalFile": path}
+        if str(node.get("SourceType", "")).lower() == "url" and isinstance(url, str):
+            path = _download_asset(url, manifest, directory, timeout)
+            rest = {k: v for k, v in node.items() if k not in ("SourceType", "Url")}
+            return {"SourceType": "local", "Path": path, **rest}
+        return {
+            k: _localize_urls(v, manifest, directory, timeout) for k, v in node.items()
+        }
+    if isinstance(node, list):
+        return [_localize_urls(v, manifest, directory, timeout) for v in node]
+    return node
+
+
+def refresh_definitions(
+    urls=(DEFAULT_DEFINITION_URL,),
+    directory: str = DEFINITIONS_DIR,
+    timeout: float = 60,
+) -> dict:
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    for url in urls:
+        raw_path = os.path.join(directory, f"{_local_name(url)}.orig")
+        logger.info(f"Downloading awsdac definition file {url}")
+        _download(url, raw_path, timeout)
+        with open(raw_path, "r", encoding="utf-8") as f:
+            definition = yaml.safe_load(f)
+        definition = _localize_urls(definition, manifest, directory, timeout)
+        name = _local_name(url)
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(definition, f, sort_keys=False, allow_unicode=True)
+        os.unlink(raw_path)
+        manifest[url] = {"file": name, "sha256": _sha256(path)}
+
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    with _verified_lock:
+        _verified.clear()
+    return manifest
+
+
+def verify_definitions(directory: str = DEFINITIONS_DIR) -> Dict[str, bool]:
+    results = {}
+    for url, entry in _load_manifest(directory).items():
+        path = os.path.join(directory, entry["file"])
+        results[url] = os.path.exists(path) and _sha256(path) == entry["sha256"]
+    return results
+
+
+def local_definition_path(
+    url: str, directory: str = DEFINITIONS_DIR
+) -> Optional[str]:
+    # 검증에 성공한 경로만 프로세스 동안 기억합니다. 캐시가 없거나 체크섬이 맞지 않으면
+    # 나중에 refresh로 채워질 수 있으므로 다음 호출에서 다시 확인합니다.
+    cache_key = f"{directory}\n{url}"
+    with _verified_lock:
+        if cache_key in _verified:
+            return _verified[cache_key]
+
+    path = None
+    if url in _load_manifest(directory):
+        # 아이콘 패키지까지 모두 검증되어야 로컬 정의 파일을 사용할 수 있습니다.
+        mismatched = [u for u, ok in verify_definitions(directory).items() if not ok]
+        if mismatched:
+            logger.warning(f"Checksum mismatch for cached awsdac files: {mismatched}")
+        else:
+            path = os.path.join(directory, _load_manifest(directory)[url]["file"])
+
+    if path is not None:
+        with _verified_lock:
+            _verified[cache_key] = path
+    return path
+
+
+def localize_definition_files(
+    yaml_content: str, directory: str = DEFINITIONS_DIR
+) -> str:
+    # 렌더링 전에 DefinitionFiles의 URL을 로컬 캐시 경로로 바꿔 GitHub 다운로드를 피합니다.
+    try:
+        document = yaml.safe_load(yaml_content)
+    except yaml.YAMLError:
+        return yaml_content
+    if not isinstance(document, dict) or not isinstance(document.get("Diagram"), dict):
+        return yaml_content
+    definition_files = document["Diagram"].get("DefinitionFiles")
+    if not isinstance(definition_files, list):
+        return yaml_content
+
+    changed = False
+    for i, entry in enumerate(definition_files):
+        if not isinstance(entry, dict) or entry.get("Type") != "URL":
+            continue
+        path = local_definition_path(entry.get("Url", ""), directory)
+        if path:
+            definition_files[i] = {"Type": "LocalFile", "LocalFile": path}
+            changed = True
+
+    if not changed:
+        return yaml_content
+    return yaml.safe_dump(document, sort_keys=False, allow_unicode=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="awsdac definition file cache")
+    parser.add_argument("command", choices=["refresh", "verify"])
+    parser.add_argument("--url", action="append", help="definition file URL")
+    parser.add_argument("--dir", default=DEFINITIONS_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "refresh":
+        urls = args.url or [DEFAULT_DEFINITION_URL]
+        manifest = refresh_definitions(urls, args.dir)
+        for url, entry in manifest.items():
+            print(f"{entry['sha256']}  {entry['file']}  {url}")
+    else:
+        results = verify_definitions(args.dir)
+        for url, ok in results.items():
+            print(f"{'OK' if ok else 'MISMATCH'}  {url}")
+        if not results or not all(results.values()):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZES = (2, 3, 4)
+
+
+def normalize_text(text: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def char_ngrams(text: str) -> Counter:
+    # 한국어 요구사항은 조사/어미 변화가 많아 단어 대신 문자 n-gram을 사용합니다.
+    text = f" {normalize_text(text)} "
+    return Counter(
+        text[i : i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)
+    )
+
+
+def _tfidf(counts: Counter, idf: dict, unseen_idf: float = 0.0) -> dict:
+    # 색인에 없는 n-gram(질의에만 있는 표현)은 가장 드문 n-gram으로 취급합니다.
+    vector = {
+        gram: count * idf.get(gram, unseen_idf) for gram, count in counts.items()
+    }
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return {}
+    return {gram: v / norm for gram, v in vector.items()}
+
+
+def _cosine(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(gram, 0.0) for gram, v in a.items())
+
+
+def design_profile(model_id: str, options: dict) -> str:
+    # 설계 결과에 영향을 주는 모델과 실행 옵션. 같은 프로필의 설계끼리만 재사용합니다.
+    profile = json.dumps(
+        {"model_id": model_id, **options}, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(profile.encode("utf-8")).hexdigest()[:16]
+
+
+def design_key(question: str, profile: str = "") -> str:
+    text = normalize_text(question)
+    if profile:
+        text = f"{profile}\n{text}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DesignCache:
+    # 승인된 설계(요구사항, YAML, 설명, 검증 결과, 점수, PNG)를 저장하고
+    # 문자 n-gram TF-IDF 코사인 유사도로 가장 가까운 설계를 찾습니다.
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        reuse_threshold: float = 0.95,
+        seed_threshold: float = 0.8,
+        max_entries: int = 1000,
+    ):
+        self.directory = directory
+        self.reuse_threshold = reuse_threshold
+        self.seed_threshold = seed_threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.seeds = 0
+        self.misses = 0
+        self._entries = {}
+        self._counts = {}
+        self._vectors = None
+        self._idf = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _load(self) -> None:
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            key = name[: -len(".json")]
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    entry = json.load(f)
+                with open(os.path.join(self.directory, f"{key}.png"), "rb") as f:
+                    entry["image"] = f.read()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable design cache entry {key}: {e}")
+                continue
+            self._entries[key] = entry
+            self._counts[key] = char_ngrams(entry["question"])
+
+    def _index(self) -> dict:
+        # 항목이 바뀐 뒤 처음 조회할 때만 IDF와 벡터를 다시 계산합니다.
+        if self._vectors is None:
+            document_frequency = Counter()
+            for counts in self._counts.values():
+                document_frequency.update(counts.keys())
+            total = len(self._counts)
+            self._idf = {
+                gram: math.log((1 + total) / (1 + df)) + 1
+                for gram, df in document_frequency.items()
+            }
+            self._vectors = {
+                key: _tfidf(counts, self._idf) for key, counts in self._counts.items()
+            }
+        return self._vectors
+
+    def lookup(self, question: str, profile: str = "") -> tuple:
+        # 같은 프로필로 저장된 항목 중 (유사도, 항목)을 반환합니다.
+        # seed_threshold 미만이면 항목은 None입니다.
+        with self._lock:
+            vectors = self._index()
+            query = _tfidf(
+                char_ngrams(question),
+                self._idf,
+                math.log(1 + len(self._counts)) + 1,
+            )
+            best_key, best_score = None, 0.0
+            for key, vector in vectors.items():
+                if self._entries[key].get("profile", "") != profile:
+                    continue
+                score = _cosine(query, vector)
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None or best_score < self.seed_threshold:
+                self.misses += 1
+                return best_score, None
+            if best_score >= self.reuse_threshold:
+                self.hits += 1
+            else:
+                self.seeds += 1
+            return best_score, dict(self._entries[best_key])
+
+    def put(
+        self,
+        question: str,
+        yaml_content: str,
+        explanation: str,
+        validation_result: str,
+        score: float,
+        image: Optional[bytes],
+        profile: str = "",
+    ) -> str:
+        key = design_key(question, profile)
+        entry = {
+            "question": question,
+            "profile": profile,
+            "yaml_content": yaml_content,
+            "architecture_explanation": explanation,
+            "validation_result": validation_result,
+            "architecture_score": score,
+            "created_at": time.time(),
+            "image": image or b"",
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._counts[key] = char_ngrams(question)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                oldest = min(
+                    self._entries, key=lambda k: self._entries[k]["created_at"]
+                )
+                del self._entries[oldest]
+                del self._counts[oldest]
+                evicted.append(oldest)
+            self._vectors = None
+        self._write_disk(key, entry)
+        for oldest in evicted:
+            self._remove_disk(oldest)
+        return key
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "seeds": self.seeds,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counts.clear()
+            self._vectors = None
+
+    def _write_disk(self, key: str, entry: dict) -> None:
+        if not self.directory:
+            return
+        meta = {k: v for k, v in entry.items() if k != "image"}
+        files = (
+            (f"{key}.png", entry["image"]),
+            (f"{key}.json", json.dumps(meta, ensure_ascii=False).encode("utf-8")),
+        )
+        # 메타데이터를 마지막에 교체해, json이 있으면 png도 항상 존재하도록 합니다.
+        for name, data in files:
+            path = os.path.join(self.directory, name)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def _remove_disk(self, key: str) -> None:
+        if not self.directory:
+            return
+        for name in (f"{key}.json", f"{key}.png"):
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+design_cache = DesignCache(
+    directory=os.environ.get("DESIGN_CACHE_DIR") or None,
+    reuse_threshold=float(os.environ.get("DESIGN_CACHE_REUSE_THRESHOLD", 0.95)),
+    seed_threshold=float(os.environ.get("DESIGN_CACHE_SEED_THRESHOLD", 0.8)),
+    max_entries=int(os.environ.get("DESIGN_CACHE_MAX_ENTRIES", 1000)),
+)
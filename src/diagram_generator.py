@@ -1,49 +1,220 @@
+import asyncio
 import subprocess
 import os
-import tempfile
+import threading
+import time
+from typing import Optional
+from definitions import localize_definition_files
+from render_cache import render_cache, cache_key
+from workspace import create_workspace, remove_workspace, workspace_file
 
 
-def generate_diagram(yaml_content: str) -> dict:
-    # 임시 파일 생성
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".yaml", delete=False
-    ) as temp_file:
-        temp_file.write(yaml_content)
-        temp_file_path = temp_file.name
+class RenderCancelled(Exception):
+    pass
+
+
+def run_awsdac(
+    args: list,
+    cwd: str,
+    timeout: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> subprocess.CompletedProcess:
+    # subprocess.run과 같지만 타임아웃/취소 시 awsdac 프로세스를 종료합니다.
+    deadline = time.monotonic() + timeout if timeout else None
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd
+    )
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=0.1)
+            break
+        except subprocess.TimeoutExpired:
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            expired = deadline is not None and time.monotonic() >= deadline
+            if cancelled or expired:
+                process.kill()
+                process.communicate()
+                if cancelled:
+                    raise RenderCancelled("awsdac 실행이 취소되었습니다.")
+                raise subprocess.TimeoutExpired(args, timeout)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+def _failure(message: str, feedback: Optional[dict] = None) -> dict:
+    return {
+        "success": False,
+        "message": message,
+        "feedback": feedback,
+        "image": None,
+        "image_path": None,
+        "cached": False,
+        "duration": 0.0,
+    }
+
+
+def _prepare_render(yaml_content: str, workspace: str, owns_workspace: bool):
+    # 캐시 적중 시 결과 dict를, 아니면 awsdac 실행에 필요한 경로를 반환합니다.
+    output_file = workspace_file(workspace, "output.png")
+
+    # 동일한 YAML은 awsdac를 다시 실행하지 않고 캐시된 이미지를 사용
+    key = cache_key(yaml_content)
+    cached = render_cache.get(key)
+    if cached is not None:
+        with open(output_file, "wb") as f:
+            f.write(cached["image"])
+        return key, output_file, None, {
+            "success": True,
+            "message": f"캐시된 다이어그램을 사용했습니다. {cached['message']}",
+            "feedback": cached["feedback"],
+            "image": cached["image"],
+            "image_path": None if owns_workspace else output_file,
+            "cached": True,
+            "duration": 0.0,
+        }
+
+    # 이전 렌더링 결과가 남아 있으면 새 이미지로 오인하지 않도록 삭제
+    if os.path.exists(output_file):
+        os.unlink(output_file)
+    yaml_file = workspace_file(workspace, "architecture.yaml")
+    with open(yaml_file, "w") as f:
+        f.write(localize_definition_files(yaml_content))
+    return key, output_file, yaml_file, None
+
+
+def _finish_render(
+    key: str,
+    output_file: str,
+    result: subprocess.CompletedProcess,
+    owns_workspace: bool,
+    duration: float,
+) -> dict:
+    feedback = analyze_diagram_output(result.stdout + "\n" + result.stderr)
+
+    # 파일이 실제로 생성되었는지 확인
+    if not os.path.exists(output_file):
+        return _failure(
+            f"다이어그램 파일이 생성되지 않았습니다. stdout: {result.stdout}, stderr: {result.stderr}",
+            feedback,
+        )
+
+    message = f"다이어그램이 성공적으로 생성되었습니다 stdout: {result.stdout}, stderr: {result.stderr}"
+    with open(output_file, "rb") as f:
+        image = f.read()
+    render_cache.put(key, image, feedback, message)
+    return {
+        "success": True,
+        "message": message,
+        "feedback": feedback,
+        "image": image,
+        "image_path": None if owns_workspace else output_file,
+        "cached": False,
+        "duration": duration,
+    }
+
+
+def generate_diagram(
+    yaml_content: str,
+    workspace: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> dict:
+    # YAML 검사와 렌더링을 awsdac 한 번으로 처리하고, 이미지와 피드백을 함께 반환합니다.
+    # workspace가 없으면 호출 단위의 임시 디렉터리를 사용하고 끝나면 삭제합니다.
+    owns_workspace = workspace is None
+    if owns_workspace:
+        workspace = create_workspace(prefix="awsdac-")
 
     try:
+        key, output_file, yaml_file, cached = _prepare_render(
+            yaml_content, workspace, owns_workspace
+        )
+        if cached is not None:
+            return cached
+
         # awsdac 명령어 실행
-        result = subprocess.run(
-            ["awsdac", temp_file_path], capture_output=True, text=True, check=True
+        started = time.monotonic()
+        result = run_awsdac(
+            ["awsdac", yaml_file, "-o", output_file],
+            cwd=workspace,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
+        return _finish_render(
+            key, output_file, result, owns_workspace, time.monotonic() - started
+        )
+
+    except subprocess.CalledProcessError as e:
+        return _failure(f"다이어그램 생성 중 오류 발생: {e.stderr}")
+    except (subprocess.TimeoutExpired, RenderCancelled) as e:
+        return _failure(f"다이어그램 생성이 중단되었습니다: {e}")
+    finally:
+        # 호출 단위 임시 디렉터리 삭제
+        if owns_workspace:
+            remove_workspace(workspace)
+
+
+async def arun_awsdac(
+    args: list, cwd: str, timeout: Optional[float] = None
+) -> subprocess.CompletedProcess:
+    # run_awsdac의 asyncio 버전. 작업이 취소되면 awsdac 프로세스도 종료합니다.
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        process.kill()
+        await process.wait()
+        if isinstance(e, asyncio.TimeoutError):
+            raise subprocess.TimeoutExpired(args, timeout)
+        raise
+    stdout = stdout.decode(errors="replace")
+    stderr = stderr.decode(errors="replace")
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+async def agenerate_diagram(
+    yaml_content: str,
+    workspace: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> dict:
+    # 캐시 조회, 정의 파일 체크섬, 파일 읽기/쓰기는 이벤트 루프를 막지 않도록
+    # 스레드에서 실행합니다.
+    owns_workspace = workspace is None
+    if owns_workspace:
+        workspace = await asyncio.to_thread(create_workspace, prefix="awsdac-")
+
+    try:
+        key, output_file, yaml_file, cached = await asyncio.to_thread(
+            _prepare_render, yaml_content, workspace, owns_workspace
         )
+        if cached is not None:
+            return cached
 
-        # 출력 파일 이름 확인 (기본값은 output.png)
-        output_file = "output.png"
-        feedback = analyze_diagram_output(result.stderr)
-
-        # 파일이 실제로 생성되었는지 확인
-        if os.path.exists(output_file):
-            return {
-                "success": True,
-                "message": f"다이어그램이 성공적으로 생성되었습니다 stdout: {result.stdout}, stderr: {result.stderr}",
-                "feedback": feedback,
-            }
-        else:
-            return {
-                "success": False,
-                "message": f"다이어그램 파일이 생성되지 않았습니다. stdout: {result.stdout}, stderr: {result.stderr}",
-                "feedback": feedback,
-            }
+        started = time.monotonic()
+        result = await arun_awsdac(
+            ["awsdac", yaml_file, "-o", output_file], cwd=workspace, timeout=timeout
+        )
+        return await asyncio.to_thread(
+            _finish_render,
+            key,
+            output_file,
+            result,
+            owns_workspace,
+            time.monotonic() - started,
+        )
 
     except subprocess.CalledProcessError as e:
-        return {
-            "success": False,
-            "message": f"다이어그램 생성 중 오류 발생: {e.stderr}",
-            "feedback": None,
-        }
+        return _failure(f"다이어그램 생성 중 오류 발생: {e.stderr}")
+    except subprocess.TimeoutExpired as e:
+        return _failure(f"다이어그램 생성이 중단되었습니다: {e}")
     finally:
-        # 임시 파일 삭제
-        os.unlink(temp_file_path)
+        if owns_workspace:
+            await asyncio.to_thread(remove_workspace, workspace)
 
 
 def analyze_diagram_output(output: str) -> dict:
@@ -0,0 +1,6 @@
+import sys
+from architect import export_graph_image
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "assets/graph.png"
+    print(f"Workflow graph written to {export_graph_image(path)}")
@@ -0,0 +1,112 @@
+import base64
+import functools
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Claude 비전 입력은 긴 변 1568px를 넘으면 서버에서 다시 축소하므로 미리 줄여 보냅니다.
+IMAGE_MAX_EDGE = int(os.environ.get("VALIDATE_IMAGE_MAX_EDGE", 1568))
+IMAGE_CACHE_ENTRIES = int(os.environ.get("VALIDATE_IMAGE_CACHE_ENTRIES", 64))
+
+
+@functools.lru_cache(maxsize=None)
+def pillow():
+    # Pillow는 이미지를 처음 줄일 때 불러옵니다. 없으면 None이고 원본 PNG를 그대로 보냅니다.
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def image_hash(image: bytes) -> str:
+    return hashlib.sha256(image).hexdigest()
+
+
+def _shrink(image: bytes, max_edge: int) -> tuple:
+    # 긴 변을 max_edge 이하로 줄이고, 색이 단순한 다이어그램은 팔레트 PNG로 다시 인코딩합니다.
+    Image = pillow()
+    with Image.open(io.BytesIO(image)) as source:
+        source.load()
+        picture = source
+        if max(picture.size) > max_edge:
+            scale = max_edge / max(picture.size)
+            size = (
+                max(1, round(picture.width * scale)),
+                max(1, round(picture.height * scale)),
+            )
+            picture = picture.convert("RGB").resize(size, Image.LANCZOS)
+        if picture.mode != "P":
+            picture = picture.convert("RGB").quantize(colors=256)
+        buffer = io.BytesIO()
+        picture.save(buffer, format="PNG", optimize=True)
+        encoded = buffer.getvalue()
+        size = picture.size
+    # 다시 인코딩한 결과가 더 크면 원본을 사용합니다.
+    if len(encoded) >= len(image) and max(size) <= max_edge:
+        return image, size
+    return encoded, size
+
+
+class ImagePreparer:
+    # 검증 모델에 보낼 base64 payload를 이미지 해시 기준으로 캐시합니다.
+    def __init__(
+        self, max_edge: int = IMAGE_MAX_EDGE, max_entries: int = IMAGE_CACHE_ENTRIES
+    ):
+        self.max_edge = max_edge
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prepare(self, image: bytes) -> dict:
+        key = image_hash(image)
+        with self._lock:
+            prepared = self._entries.get(key)
+            if prepared is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return prepared
+            self.misses += 1
+
+        data, size = image, None
+        if pillow() is not None:
+            try:
+                data, size = _shrink(image, self.max_edge)
+            except Exception as e:
+                logger.warning(f"Could not downscale diagram image, sending as is: {e}")
+        prepared = {
+            "hash": key,
+            "media_type": "image/png",
+            "data": base64.b64encode(data).decode("utf-8"),
+            "size": size,
+            "original_bytes": len(image),
+            "encoded_bytes": len(data),
+        }
+        logger.info(
+            f"Prepared validation image: {len(image)} -> {len(data)} bytes"
+            + (f" ({size[0]}x{size[1]})" if size else "")
+        )
+
+        with self._lock:
+            self._entries[key] = prepared
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return prepared
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+
+image_preparer = ImagePreparer()
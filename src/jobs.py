@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 동시에 실행할 설계 작업 수와 대기열 길이. 워커 수는 Bedrock 요청 제한과 awsdac 동시성에 맞춥니다.
+API_WORKERS = int(os.environ.get("API_WORKERS", 4))
+API_MAX_QUEUED = int(os.environ.get("API_MAX_QUEUED", 100))
+# 메모리에 보관할 끝난 작업 수. 넘으면 오래된 작업부터 지웁니다.
+API_JOB_RETENTION = int(os.environ.get("API_JOB_RETENTION", 200))
+
+# 요청에 model_id가 없을 때 사용할 Bedrock 모델
+DEFAULT_MODEL_ID = os.environ.get(
+    "ARCHITECT_MODEL_ID", "anthropic.claude-3-sonnet-20240229-v1:0"
+)
+
+FINISHED = ("succeeded", "failed", "cancelled")
+ARTIFACTS = {
+    "diagram.png": "image/png",
+    "architecture.yaml": "application/yaml; charset=utf-8",
+    "result.json": "application/json; charset=utf-8",
+}
+# 스트리밍 조각 이벤트와, SSE로 보낼 때 이어 붙인 전체 내용을 담는 partial 키
+PARTIAL_DELTAS = {
+    "partial_yaml_delta": "partial_yaml_content",
+    "partial_explanation_delta": "partial_architecture_explanation",
+}
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def default_runner(question: str, model_id: str, run_id: str, **options):
+    from architect import run_aws_architect_agent
+
+    return run_aws_architect_agent(question, model_id, run_id=run_id, **options)
+
+
+class Job:
+    # 설계 작업 하나. 상태 dict를 순서대로 쌓아 두고 SSE 구독자는 인덱스로 이어 읽습니다.
+    def __init__(self, job_id: str, question: str, model_id: str, options: dict):
+        self.id = job_id
+        self.question = question
+        self.model_id = model_id
+        self.options = options
+        self.status = "queued"
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        # 스트리밍 중인 partial_* 상태는 events에 쌓지 않고 최신 값만 둡니다.
+        self.partial = {}
+        self.partial_version = 0
+        self.artifacts = {}
+        self.result = {}
+        self.future = None
+        self.cancel_requested = threading.Event()
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def add_event(self, status: dict) -> None:
+        # 응답 생성 중에는 청크마다 새로 생성된 YAML/설명 조각이 오므로 이어 붙여
+        # 지금까지의 전체 내용만 남깁니다. 완성된 상태가 오면 partial은 더 이상 필요 없습니다.
+        if status and all(key.startswith("partial_") for key in status):
+            with self._condition:
+                for key, value in status.items():
+                    if key in PARTIAL_DELTAS:
+                        key = PARTIAL_DELTAS[key]
+                        value = self.partial.get(key, "") + value
+                    self.partial[key] = value
+                self.partial_version += 1
+                self._condition.notify_all()
+            return
+        event = self._public_event(status)
+        with self._condition:
+            self.events.append(event)
+            self.partial = {}
+            self._condition.notify_all()
+
+    def latest_partial(self, seen_version: int) -> tuple:
+        # (현재 partial 버전, seen_version 이후 바뀐 partial 상태 또는 None)
+        with self._condition:
+            if self.partial_version == seen_version or not self.partial:
+                return self.partial_version, None
+            return self.partial_version, dict(self.partial)
+
+    def _public_event(self, status: dict) -> dict:
+        # 다이어그램 PNG는 이벤트 대신 아티팩트로 제공하고, 결과 요약을 갱신합니다.
+        event = dict(status)
+        if "diagram_image" in event:
+            image = event.pop("diagram_image")
+            if image:
+                self.artifacts["diagram.png"] = image
+                event["diagram_url"] = f"/jobs/{self.id}/artifacts/diagram.png"
+        if event.get("yaml_content"):
+            self.artifacts["architecture.yaml"] = event["yaml_content"].encode("utf-8")
+            self.result["yaml_content"] = event["yaml_content"]
+        if "architecture_explanation" in event:
+            self.result["architecture_explanation"] = event["architecture_explanation"]
+        if event.get("validation_result"):
+            self.result["validation_result"] = event["validation_result"]
+            self.result["architecture_score"] = event.get("architecture_score")
+        if "stop_reason" in event:
+            self.result["stop_reason"] = event["stop_reason"]
+        if "node_error" in event:
+            self.result["node_error"] = event["node_error"]
+        if "metrics" in event:
+            self.result["metrics"] = event["metrics"]["totals"]
+        return event
+
+    def set_status(self, status: str, error: Optional[str] = None) -> None:
+        with self._condition:
+            self.status = status
+            if error:
+                self.error = error
+            if status == "running":
+                self.started_at = time.time()
+            if status in FINISHED:
+                self.finished_at = time.time()
+                self.partial = {}
+                self.artifacts["result.json"] = json.dumps(
+                    self.summary(), ensure_ascii=False
+                ).encode("utf-8")
+            self._condition.notify_all()
+
+    def wait_events(
+        self, after: int, timeout: float, partial_version: Optional[int] = None
+    ) -> tuple:
+        # (after 이후의 이벤트 목록, 작업 종료 여부). 새 이벤트가 없으면 timeout까지 기다립니다.
+        # partial_version을 주면 partial 상태가 그 버전에서 바뀌어도 깨어납니다.
+        with self._condition:
+            if (
+                len(self.events) <= after
+                and not self.finished
+                and partial_version in (None, self.partial_version)
+            ):
+                self._condition.wait(timeout)
+            return self.events[after:], self.finished
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "question": self.question,
+            "model_id": self.model_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": len(self.events),
+            "artifacts": sorted(self.artifacts),
+            "result": self.result,
+        }
+
+
+class JobManager:
+    # 제한된 워커 풀에서 설계 작업을 실행합니다. runner는 run_aws_architect_agent와
+    # 같은 상태 dict를 내보내는 제너레이터를 반환해야 합니다.
+    def __init__(
+        self,
+        workers: int = API_WORKERS,
+        max_queued: int = API_MAX_QUEUED,
+        retention: int = API_JOB_RETENTION,
+        runner: Callable = default_runner,
+        option_names: Optional[set] = None,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self.runner = runner
+        self.option_names = option_names
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="architect-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+
+    def submit(
+        self,
+        question: str,
+        model_id: str,
+        job_id: Optional[str] = None,
+        **options,
+    ) -> Job:
+        # job_id는 실행의 run_id로도 쓰이므로, 중단된 작업을 같은 ID로 다시 제출하면 이어서 실행합니다.
+        if self.option_names is not None:
+            unknown = set(options) - self.option_names
+            if unknown:
+                raise TypeError(f"Unknown run options: {sorted(unknown)}")
+        with self._lock:
+            existing = self._jobs.get(job_id)
+            if existing is not None and not existing.finished:
+                return existing
+            queued = sum(1 for job in self._jobs.values() if job.status == "queued")
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs are already queued")
+            job = Job(job_id or uuid.uuid4().hex, question, model_id, options)
+            self._jobs[job.id] = job
+            self._jobs.move_to_end(job.id)
+            self._evict()
+            job.future = self._executor.submit(self._run, job)
+        logger.info(f"Queued job {job.id}")
+        return job
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.retention)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job) -> None:
+        if job.cancel_requested.is_set():
+            job.set_status("cancelled")
+            return
+        job.set_status("running")
+        statuses = None
+        try:
+            statuses = self.runner(
+                job.question, job.model_id, run_id=job.id, **job.options
+            )
+            for status in statuses:
+                job.add_event(status)
+                if "error" in status:
+                    job.set_status("failed", status["error"])
+                    return
+                if job.cancel_requested.is_set():
+                    job.set_status("cancelled")
+                    return
+            job.set_status("succeeded")
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            job.add_event({"error": str(e)})
+            job.set_status("failed", str(e))
+        finally:
+            # 취소나 실패로 중간에 멈추면 제너레이터를 닫아 작업 디렉터리와 렌더 작업을 정리합니다.
+            if statuses is not None and hasattr(statuses, "close"):
+                statuses.close()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            job.set_status("cancelled")
+        return job
+
+    def stats(self) -> dict:
+        jobs = self.list()
+        counts = {status: 0 for status in ("queued", "running", *FINISHED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return {"workers": self.workers, **counts}
+
+    def shutdown(self, wait: bool = True) -> None:
+        for job in self.list():
+            self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# k8s 매니페스트와 ECS 태스크가 설정하는 AWS_REGION을 따릅니다.
+BEDROCK_REGION = os.environ.get(
+    "AWS_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-west-2")
+)
+# 동시에 실행되는 세션/후보 수에 맞춰 HTTP 커넥션 풀 크기를 정합니다.
+BEDROCK_MAX_CONNECTIONS = int(os.environ.get("BEDROCK_MAX_CONNECTIONS", 50))
+# 모델별 분당 요청 수 제한 (0이면 제한 없음)과 순간 허용량
+BEDROCK_REQUESTS_PER_MINUTE = float(
+    os.environ.get("BEDROCK_REQUESTS_PER_MINUTE", 60)
+)
+BEDROCK_BURST = int(os.environ.get("BEDROCK_BURST", 5))
+BEDROCK_MAX_RETRIES = int(os.environ.get("BEDROCK_MAX_RETRIES", 6))
+BEDROCK_BACKOFF_BASE = float(os.environ.get("BEDROCK_BACKOFF_BASE", 1.0))
+BEDROCK_BACKOFF_MAX = float(os.environ.get("BEDROCK_BACKOFF_MAX", 30.0))
+RETRYABLE_ERRORS = (
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+)
+
+
+class LLMThrottled(Exception):
+    pass
+
+
+def is_retryable(error: BaseException) -> bool:
+    # langchain_aws는 botocore ClientError를 ValueError로 감싸므로 원인 체인과 메시지를 모두 확인합니다.
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        code = (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+        if code in RETRYABLE_ERRORS or any(
+            name in str(error) for name in RETRYABLE_ERRORS
+        ):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def estimate_tokens(text: str) -> int:
+    # 근사치: 영문/YAML은 약 4자, 한글은 약 1.5자당 토큰 하나
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def backoff_delay(attempt: int, rng: random.Random = random) -> float:
+    # full jitter: 0 ~ min(상한, base * 2^attempt) 사이에서 무작위로 기다립니다.
+    return rng.uniform(0, min(BEDROCK_BACKOFF_MAX, BEDROCK_BACKOFF_BASE * 2**attempt))
+
+
+class TokenBucket:
+    # 모델별 요청 속도 제한. rate는 초당 토큰 수, capacity는 순간 허용량입니다.
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        # 토큰 하나를 예약하고, 사용 가능해질 때까지 기다려야 하는 시간을 반환합니다.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class ManagedLLM:
+    # 모델 인스턴스 하나를 공유하며 호출마다 속도 제한과 스로틀링 재시도를 적용합니다.
+    # 대기/재시도 시간은 응답의 response_metadata["queue_seconds"], ["retries"]로 전달합니다.
+    def __init__(
+        self,
+        llm,
+        limiter: TokenBucket,
+        max_retries: int = BEDROCK_MAX_RETRIES,
+    ):
+        self.llm = llm
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    @staticmethod
+    def _annotate(message, queue_seconds: float, retries: int):
+        metadata = getattr(message, "response_metadata", None)
+        if isinstance(metadata, dict):
+            metadata["queue_seconds"] = queue_seconds
+            metadata["retries"] = retries
+        return message
+
+    def _retry_or_raise(self, error: Exception, attempt: int) -> float:
+        retryable = is_retryable(error)
+        if retryable and attempt >= self.max_retries:
+            message = f"Bedrock 요청이 계속 제한되었습니다: {error}"
+            raise LLMThrottled(message) from error
+        if not retryable:
+            raise error
+        delay = backoff_delay(attempt)
+        logger.warning(
+            f"Bedrock throttled (attempt {attempt + 1}/{self.max_retries}), "
+            f"retrying in {delay:.1f}s: {error}"
+        )
+        return delay
+
+    def invoke(self, messages, *args, **kwargs):
+        queue_seconds = 0.0
+        for attempt in range(self.max_retries + 1):
+            queue_seconds += self.limiter.acquire()
+            try:
+                response = self.llm.invoke(messages, *args, **kwargs)
+                return self._annotate(response, queue_seconds, attempt)
+            except Exception as e:
+                delay = self._retry_or_raise(e, attempt)
+            time.sleep(delay)
+            queue_seconds += delay
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        queue_seconds = 0.0
+        for attempt in range(self.max_retries + 1):
+            queue_seconds += await self.limiter.aacquire()
+            try:
+                response = await self.llm.ainvoke(messages, *args, **kwargs)
+                return self._annotate(response, queue_seconds, attempt)
+            except Exception as e:
+                delay = self._retry_or_raise(e, attempt)
+            await asyncio.sleep(delay)
+            queue_seconds += delay
+
+    def stream(self, messages, *args, **kwargs):
+        # 첫 청크를 받기 전에 실패한 경우에만 재시도합니다. 이미 내보낸 토큰은 되돌릴 수 없습니다.
+        queue_seconds = 0.0
+        for attempt in range(self.max_retries + 1):
+            queue_seconds += self.limiter.acquire()
+            started = False
+            try:
+                for chunk in self.llm.stream(messages, *args, **kwargs):
+                    if not started:
+                        started = True
+                        chunk = self._annotate(chunk, queue_seconds, attempt)
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                delay = self._retry_or_raise(e, attempt)
+            time.sleep(delay)
+            queue_seconds += delay
+
+
+_client = None
+_llms: Dict[str, ManagedLLM] = {}
+_llms_lock = threading.Lock()
+
+
+def bedrock_client():
+    # boto3/botocore는 처음 모델을 사용할 때 import 합니다.
+    import boto3
+    from botocore.config import Config
+
+    global _client
+    with _llms_lock:
+        if _client is None:
+            # 재시도는 ManagedLLM에서 처리하므로 SDK 재시도는 끕니다.
+            _client = boto3.client(
+                "bedrock-runtime",
+                region_name=BEDROCK_REGION,
+                config=Config(
+                    max_pool_connections=BEDROCK_MAX_CONNECTIONS,
+                    retries={"total_max_attempts": 1, "mode": "standard"},
+                ),
+            )
+        return _client
+
+
+def get_llm(model_id: str, requests_per_minute: Optional[float] = None) -> ManagedLLM:
+    # 모델 ID별로 ChatBedrock과 속도 제한기를 하나씩만 만들어 모든 세션이 공유합니다.
+    from langchain_aws import ChatBedrock
+
+    client = bedrock_client()
+    with _llms_lock:
+        llm = _llms.get(model_id)
+        if llm is None:
+            if requests_per_minute is None:
+                requests_per_minute = BEDROCK_REQUESTS_PER_MINUTE
+            rate = requests_per_minute / 60
+            llm = ManagedLLM(
+                ChatBedrock(
+                    model_id=model_id,
+                    client=client,
+                    model_kwargs={"temperature": 0.7, "max_tokens": 32768},
+                ),
+                TokenBucket(rate, BEDROCK_BURST),
+            )
+            _llms[model_id] = llm
+        return llm
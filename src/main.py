@@ -1,12 +1,69 @@
+import argparse
+import json
 import os
-from architect import run_aws_architect_agent
+import sys
+
+from api_client import ARCHITECT_API_URL
+from jobs import DEFAULT_MODEL_ID
+
+EXAMPLE_QUESTION = "S3에서 Athena SQL을 통해 데이터를 가져와 Bedrock Titan 임베딩을 적용하는 과정에서 시간이 오래 걸리고 타임아웃 에러가 발생하는데, 이를 해결할 수 있는 최적의 아키텍처를 가이드해주세요."
+
+
+def printable(status: dict) -> dict:
+    # PNG 바이트는 JSON으로 출력하지 않고 크기만 표시합니다.
+    if status.get("diagram_image"):
+        return {**status, "diagram_image": f"<{len(status['diagram_image'])} bytes>"}
+    return status
+
+
+def save_artifacts(output_dir: str, result: dict) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+    if result.get("diagram_image"):
+        with open(os.path.join(output_dir, "diagram.png"), "wb") as f:
+            f.write(result["diagram_image"])
+    if result.get("yaml_content"):
+        with open(os.path.join(output_dir, "architecture.yaml"), "w") as f:
+            f.write(result["yaml_content"])
+    with open(os.path.join(output_dir, "result.json"), "w") as f:
+        json.dump(printable(result), f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="AWS 아키텍처를 설계하고 상태를 JSON Lines로 출력합니다."
+    )
+    parser.add_argument("question", nargs="?", default=EXAMPLE_QUESTION)
+    parser.add_argument("--model-id", default=DEFAULT_MODEL_ID)
+    parser.add_argument("--run-id", help="중단된 실행을 이어서 진행할 run_id")
+    parser.add_argument(
+        "--api-url",
+        default=ARCHITECT_API_URL,
+        help="작업 API 주소. 없으면 이 프로세스에서 에이전트를 실행합니다.",
+    )
+    parser.add_argument("--output-dir", help="다이어그램, YAML, 결과 JSON을 저장할 디렉터리")
+    args = parser.parse_args()
+
+    if args.api_url:
+        from api_client import run_remote_agent
+
+        statuses = run_remote_agent(
+            args.question, args.model_id, run_id=args.run_id, api_url=args.api_url
+        )
+    else:
+        from architect import run_aws_architect_agent
+
+        statuses = run_aws_architect_agent(
+            args.question, args.model_id, run_id=args.run_id
+        )
+
+    result = {}
+    for status in statuses:
+        print(json.dumps(printable(status), ensure_ascii=False, default=str))
+        result.update(status)
+    if args.output_dir:
+        save_artifacts(args.output_dir, result)
+    return 1 if "error" in result else 0
 
-# OpenAI API 키 설정 (실제 환경에서는 환경 변수로 관리해야 합니다)
-os.environ["OPENAI_API_KEY"] = "your-api-key-here"
 
 if __name__ == "__main__":
-    question = "S3에서 Athena SQL을 통해 데이터를 가져와 Bedrock Titan 임베딩을 적용하는 과정에서 시간이 오래 걸리고 타임아웃 에러가 발생하는데, 이를 해결할 수 있는 최적의 아키텍처를 가이드해주세요."
-    messages = run_aws_architect_agent(question)
-    for message in messages:
-        print(f"{message.type}: {message.content}\n")
-    
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,308 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 1K 토큰당 USD 단가 (입력, 출력). 모델 ID에 키 문자열이 포함되면 적용합니다.
+MODEL_PRICES = {
+    "claude-3-opus": (0.015, 0.075),
+    "claude-3-5-sonnet": (0.003, 0.015),
+    "claude-3.5-sonnet": (0.003, 0.015),
+    "claude-3-sonnet": (0.003, 0.015),
+    "claude-3-haiku": (0.00025, 0.00125),
+}
+MODEL_PRICES.update(json.loads(os.environ.get("ARCHITECT_MODEL_PRICES", "{}")))
+
+NODE_SECONDS_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+USAGE_FIELDS = (
+    "llm_calls",
+    "llm_seconds",
+    "queue_seconds",
+    "throttle_retries",
+    "input_tokens",
+    "output_tokens",
+    "renders",
+    "awsdac_seconds",
+    "cache_hits",
+    "image_bytes",
+    "cost_usd",
+)
+
+
+def model_price(model_id: str) -> tuple:
+    for name, price in MODEL_PRICES.items():
+        if name in model_id:
+            return tuple(price)
+    return 0.0, 0.0
+
+
+def queue_usage(message) -> tuple:
+    # llm_client.ManagedLLM이 기록한 (속도 제한/재시도 대기 시간, 재시도 횟수)
+    metadata = getattr(message, "response_metadata", None) or {}
+    return metadata.get("queue_seconds", 0.0), metadata.get("retries", 0)
+
+
+def token_usage(message) -> tuple:
+    # (input_tokens, output_tokens). langchain usage_metadata를 우선 사용하고,
+    # 없으면 Bedrock 응답 메타데이터의 usage를 읽습니다.
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (getattr(message, "response_metadata", None) or {}).get("usage") or {}
+    return (
+        usage.get("prompt_tokens", usage.get("input_tokens", 0)),
+        usage.get("completion_tokens", usage.get("output_tokens", 0)),
+    )
+
+
+class NodeUsage:
+    # 노드 한 번 실행 동안의 LLM 호출/렌더링 사용량. 후보 생성 스레드에서 함께 기록합니다.
+    def __init__(self, model_id: str = ""):
+        self.model_id = model_id
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._values = dict.fromkeys(USAGE_FIELDS, 0)
+        self._models = {}
+
+    def add_llm(self, message, seconds: float, model_id: Optional[str] = None) -> None:
+        # 모델 라우팅으로 한 노드에서 여러 모델을 쓸 수 있어 호출한 모델 단가로 계산합니다.
+        model_id = model_id or self.model_id
+        input_tokens, output_tokens = token_usage(message)
+        queue_seconds, retries = queue_usage(message)
+        input_price, output_price = model_price(model_id)
+        with self._lock:
+            self._models[model_id] = self._models.get(model_id, 0) + 1
+            self._values["llm_calls"] += 1
+            self._values["llm_seconds"] += seconds
+            self._values["queue_seconds"] += queue_seconds
+            self._values["throttle_retries"] += retries
+            self._values["input_tokens"] += input_tokens
+            self._values["output_tokens"] += output_tokens
+            self._values["cost_usd"] += (
+                input_tokens * input_price + output_tokens * output_price
+            ) / 1000
+
+    def add_render(self, diagram_result: Optional[dict]) -> None:
+        if not diagram_result:
+            return
+        with self._lock:
+            self._values["renders"] += 1
+            self._values["awsdac_seconds"] += diagram_result.get("duration", 0.0)
+            self._values["cache_hits"] += int(bool(diagram_result.get("cached")))
+            self._values["image_bytes"] += len(diagram_result.get("image") or b"")
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "seconds": time.perf_counter() - self.started,
+                **self._values,
+                "models": dict(self._models),
+            }
+
+
+class MeteredLLM:
+    # ChatBedrock을 감싸 호출마다 지연 시간과 토큰 사용량을 NodeUsage에 기록합니다.
+    def __init__(self, llm, usage: NodeUsage, model_id: Optional[str] = None):
+        self.llm = llm
+        self.usage = usage
+        self.model_id = model_id
+
+    def invoke(self, messages, *args, **kwargs):
+        started = time.perf_counter()
+        response = self.llm.invoke(messages, *args, **kwargs)
+        self.usage.add_llm(response, time.perf_counter() - started, self.model_id)
+        return response
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        started = time.perf_counter()
+        response = await self.llm.ainvoke(messages, *args, **kwargs)
+        self.usage.add_llm(response, time.perf_counter() - started, self.model_id)
+        return response
+
+    def stream(self, messages, *args, **kwargs):
+        # 토큰 사용량은 보통 마지막 청크에만 실려 오므로 모든 청크를 합산합니다.
+        started = time.perf_counter()
+        total = _Usage()
+        for chunk in self.llm.stream(messages, *args, **kwargs):
+            total.add(chunk)
+            yield chunk
+        self.usage.add_llm(total, time.perf_counter() - started, self.model_id)
+
+
+class _Usage:
+    def __init__(self):
+        self.usage_metadata = {"input_tokens": 0, "output_tokens": 0}
+        self.response_metadata = {"queue_seconds": 0.0, "retries": 0}
+
+    def add(self, chunk) -> None:
+        input_tokens, output_tokens = token_usage(chunk)
+        queue_seconds, retries = queue_usage(chunk)
+        self.usage_metadata["input_tokens"] += input_tokens
+        self.usage_metadata["output_tokens"] += output_tokens
+        self.response_metadata["queue_seconds"] += queue_seconds
+        self.response_metadata["retries"] += retries
+
+
+def input_tokens_per_call(totals: dict) -> int:
+    # 호출당 프롬프트 크기
+    calls = totals.get("llm_calls", 0)
+    return totals.get("input_tokens", 0) // calls if calls else 0
+
+
+def record_node(state: dict, node: str, usage: NodeUsage) -> dict:
+    # state["metrics"]에 노드별 누적값을 더하고 프로세스 전역 레지스트리에도 반영합니다.
+    record = usage.as_dict()
+    metrics = dict(state.get("metrics") or {})
+    totals = dict(metrics.get(node) or {})
+    totals["executions"] = totals.get("executions", 0) + 1
+    for field, value in record.items():
+        if field != "models":
+            totals[field] = totals.get(field, 0) + value
+    # 노드별로 어떤 모델을 몇 번 호출했는지 (모델 라우팅 결과)
+    models = dict(totals.get("models") or {})
+    for model_id, calls in record["models"].items():
+        models[model_id] = models.get(model_id, 0) + calls
+    totals["models"] = models
+    totals["input_tokens_per_call"] = input_tokens_per_call(totals)
+    metrics[node] = totals
+    state["metrics"] = metrics
+    registry.observe(node, usage.model_id, record)
+    logger.info(
+        f"{node} node took {record['seconds']:.2f}s "
+        f"(tokens in/out {record['input_tokens']}/{record['output_tokens']}, "
+        f"input/call {input_tokens_per_call(record)}, "
+        f"renders {record['renders']}, cache hits {record['cache_hits']})"
+    )
+    return record
+
+
+def summarize(metrics: dict) -> dict:
+    totals = {"executions": 0, "seconds": 0.0, **dict.fromkeys(USAGE_FIELDS, 0)}
+    for node_totals in (metrics or {}).values():
+        for field in totals:
+            totals[field] += node_totals.get(field, 0)
+    totals["input_tokens_per_call"] = input_tokens_per_call(totals)
+    return totals
+
+
+class MetricsRegistry:
+    # Prometheus 텍스트 형식으로 내보낼 프로세스 전역 누적값
+    def __init__(self, buckets: tuple = NODE_SECONDS_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._histograms = {}
+
+    def observe(self, node: str, model_id: str, record: dict) -> None:
+        labels = (node, model_id)
+        with self._lock:
+            totals = self._totals.setdefault(labels, dict.fromkeys(USAGE_FIELDS, 0))
+            for field in USAGE_FIELDS:
+                totals[field] += record[field]
+            histogram = self._histograms.setdefault(
+                labels, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            )
+            for i, bound in enumerate(self.buckets):
+                if record["seconds"] <= bound:
+                    histogram["counts"][i] += 1
+            histogram["sum"] += record["seconds"]
+            histogram["count"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._histograms.clear()
+
+    def render(self, extra_gauges: Optional[dict] = None) -> str:
+        lines = [
+            "# HELP architect_node_seconds Wall time of a graph node execution",
+            "# TYPE architect_node_seconds histogram",
+        ]
+        with self._lock:
+            histograms = {k: dict(v) for k, v in self._histograms.items()}
+            totals = {k: dict(v) for k, v in self._totals.items()}
+
+        for (node, model_id), histogram in sorted(histograms.items()):
+            labels = f'node="{node}",model="{model_id}"'
+            for bound, count in zip(self.buckets, histogram["counts"]):
+                lines.append(
+                    f'architect_node_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'architect_node_seconds_bucket{{{labels},le="+Inf"}} '
+                f"{histogram['count']}"
+            )
+            lines.append(f"architect_node_seconds_sum{{{labels}}} {histogram['sum']}")
+            lines.append(
+                f"architect_node_seconds_count{{{labels}}} {histogram['count']}"
+            )
+
+        for field in USAGE_FIELDS:
+            name = f"architect_{field}_total"
+            lines.append(f"# TYPE {name} counter")
+            for (node, model_id), values in sorted(totals.items()):
+                lines.append(
+                    f'{name}{{node="{node}",model="{model_id}"}} {values[field]}'
+                )
+
+        for name, value in sorted((extra_gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def service_gauges() -> dict:
+    # 렌더 큐와 렌더 캐시 상태를 게이지로 함께 내보냅니다.
+    from render_cache import render_cache
+    from render_service import render_service
+
+    gauges = {}
+    for name, value in render_service.stats().items():
+        if value is not None:
+            gauges[f"architect_render_{name}"] = value
+    for name, value in render_cache.stats().items():
+        gauges[f"architect_render_cache_{name}"] = value
+    return gauges
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render(service_gauges()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = "0.0.0.0"):
+    # /metrics 엔드포인트를 별도 포트의 데몬 스레드로 띄웁니다. 여러 번 호출해도 한 번만 시작합니다.
+    global _server
+    if port is None:
+        port = int(os.environ.get("METRICS_PORT", 0))
+        if not port:
+            return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+            logger.info(f"Serving Prometheus metrics on {host}:{port}/metrics")
+    return _server
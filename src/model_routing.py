@@ -0,0 +1,57 @@
+import json
+import os
+
+from stopping import has_converged
+
+HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
+SONNET = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+
+# 노드 이름별 모델 ID. 지정하지 않은 노드는 사이드바에서 고른 모델을 사용하고,
+# "escalation" 모델은 점수가 정체되거나 응답 파싱에 실패했을 때 사용합니다.
+ROUTING_PRESETS = {
+    "tiered": {"Architect": HAIKU, "Validate": HAIKU, "escalation": SONNET},
+}
+
+
+def load_routing(value: str) -> dict:
+    # 프리셋 이름 또는 JSON 객체
+    value = value.strip()
+    if not value:
+        return {}
+    if value in ROUTING_PRESETS:
+        return dict(ROUTING_PRESETS[value])
+    return json.loads(value)
+
+
+MODEL_ROUTING = load_routing(os.environ.get("ARCHITECT_MODEL_ROUTING", ""))
+
+
+def escalation_reason(state: dict) -> str:
+    # Architect 노드를 상위 모델로 올려야 하는 이유. 한 번 올리면 실행이 끝날 때까지 유지합니다.
+    if state.get("model_escalation"):
+        return state["model_escalation"]
+    if state.get("schema_diagnostics"):
+        return "parse_failure"
+    min_improvement = state["context"].get("min_improvement", 0)
+    if has_converged(state.get("score_history") or [], 1, min_improvement):
+        return "stalled"
+    return ""
+
+
+def route_model(state: dict, node: str) -> tuple:
+    # (모델 ID, 승격 이유). 승격하지 않으면 이유는 빈 문자열입니다.
+    context = state["context"]
+    routing = context.get("model_routing") or {}
+    if node == "Architect" and routing.get("escalation"):
+        reason = escalation_reason(state)
+        if reason:
+            return routing["escalation"], reason
+    return routing.get(node) or context["model_id"], ""
+
+
+def escalation_model(context: dict, current_model: str):
+    # 같은 노드 안에서 응답 파싱에 실패했을 때 다시 시도할 모델. 없거나 같은 모델이면 None
+    model_id = (context.get("model_routing") or {}).get("escalation")
+    if not model_id or model_id == current_model:
+        return None
+    return model_id
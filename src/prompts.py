@@ -0,0 +1,144 @@
+import functools
+import logging
+
+import yaml
+
+from dac_validator import DIAGRAM_TYPES, SafeLoader
+from llm_client import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 예시 YAML의 서비스 리소스 타입별로, 요구사항에 나오면 관련 있다고 보는 단어.
+# 표에 없는 타입은 서비스/리소스 이름(예: ec2, instance)으로 판단합니다.
+EXAMPLE_TYPE_KEYWORDS = {
+    "AWS::EC2::Instance": ("인스턴스", "가상 머신", "웹 서버", "web server", "웹", "web"),
+    "AWS::ElasticLoadBalancingV2::LoadBalancer": (
+        "alb",
+        "elb",
+        "load balanc",
+        "로드 밸런",
+        "로드밸런",
+        "부하 분산",
+        "고가용성",
+        "웹",
+        "web",
+    ),
+    "AWS::EC2::InternetGateway": ("internet", "인터넷", "퍼블릭", "사용자", "웹", "web"),
+}
+
+
+def dump_yaml(document) -> str:
+    # 리프 목록/매핑은 한 줄(flow)로 써서 들여쓰기와 줄바꿈 토큰을 줄입니다.
+    return yaml.dump(
+        document,
+        default_flow_style=None,
+        sort_keys=False,
+        allow_unicode=True,
+        width=1000,
+    ).strip()
+
+
+def compact_yaml(yaml_content: str) -> str:
+    # 프롬프트에 다시 보내는 YAML에서 주석과 DefinitionFiles(아이콘 정의 URL)를 뺍니다.
+    # 파싱할 수 없으면 원문을 그대로 사용합니다.
+    try:
+        document = yaml.load(yaml_content, Loader=SafeLoader)
+    except yaml.YAMLError:
+        return yaml_content
+    diagram = document.get("Diagram") if isinstance(document, dict) else None
+    if not isinstance(diagram, dict):
+        return yaml_content
+    diagram = {k: v for k, v in diagram.items() if k != "DefinitionFiles"}
+    return dump_yaml({**document, "Diagram": diagram})
+
+
+def _is_relevant(resource_type: str, question: str) -> bool:
+    keywords = EXAMPLE_TYPE_KEYWORDS.get(resource_type, ())
+    keywords += tuple(part.lower() for part in resource_type.split("::")[1:])
+    return any(keyword in question for keyword in keywords)
+
+
+def _signature(resources: dict, name: str) -> tuple:
+    resource = resources.get(name) or {}
+    return (
+        resource.get("Type"),
+        resource.get("Preset"),
+        resource.get("Direction"),
+        tuple(_signature(resources, child) for child in resource.get("Children", [])),
+    )
+
+
+def _descendants(resources: dict, name: str) -> set:
+    names = {name}
+    for child in (resources.get(name) or {}).get("Children", []):
+        names |= _descendants(resources, child)
+    return names
+
+
+def _without(diagram: dict, removed: set) -> dict:
+    resources = {}
+    for name, resource in diagram["Resources"].items():
+        if name in removed:
+            continue
+        if resource.get("Children"):
+            resource = dict(resource)
+            children = [c for c in resource.pop("Children") if c not in removed]
+            if children:
+                resource["Children"] = children
+        resources[name] = resource
+    links = [
+        link
+        for link in diagram.get("Links") or []
+        if link.get("Source") not in removed and link.get("Target") not in removed
+    ]
+    return {**diagram, "Resources": resources, "Links": links}
+
+
+@functools.lru_cache(maxsize=256)
+def minify_example(template: str, question: str) -> str:
+    # 응답 예시는 형식을 보여주는 용도이므로
+    # 1) 같은 구조가 반복되는 형제 리소스(예: 두 번째 서브넷)는 하나만 남기고
+    # 2) 요구사항과 관련 없는 서비스 리소스(자식이 없는 리소스)는 뺍니다.
+    # 연결(Links) 예시가 모두 사라지면 2)는 적용하지 않습니다.
+    document = yaml.load(template, Loader=SafeLoader)
+    diagram = document["Diagram"]
+    resources = diagram["Resources"]
+
+    duplicates = set()
+    for resource in resources.values():
+        seen = set()
+        for child in resource.get("Children", []):
+            signature = _signature(resources, child)
+            if signature in seen:
+                duplicates |= _descendants(resources, child)
+            seen.add(signature)
+    diagram = _without(diagram, duplicates)
+
+    question = question.lower()
+    irrelevant = {
+        name
+        for name, resource in diagram["Resources"].items()
+        if not resource.get("Children")
+        and resource.get("Type") not in DIAGRAM_TYPES
+        and not _is_relevant(resource.get("Type", ""), question)
+    }
+    pruned = _without(diagram, irrelevant)
+    if pruned["Links"]:
+        diagram = pruned
+    return dump_yaml({**document, "Diagram": diagram})
+
+
+def build_messages(static: str, dynamic) -> list:
+    # 실행 동안 바뀌지 않는 지시문/예시는 시스템 메시지(프롬프트 앞부분)에, 반복마다 바뀌는
+    # 요구사항/검증 결과/YAML은 사용자 메시지에 둡니다.
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    if logger.isEnabledFor(logging.DEBUG):
+        text = dynamic if isinstance(dynamic, str) else " ".join(
+            block.get("text", "") for block in dynamic
+        )
+        logger.debug(
+            f"Prompt: static ~{estimate_tokens(static)} tokens, "
+            f"dynamic ~{estimate_tokens(text)} tokens"
+        )
+    return [SystemMessage(content=static), HumanMessage(content=dynamic)]
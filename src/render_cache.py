@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import yaml
+
+
+def normalize_yaml(yaml_content: str) -> str:
+    # 공백/주석/키 순서 차이는 같은 다이어그램으로 취급합니다.
+    # 날짜 스칼라는 문자열로 바꾸고, 정수/문자열 키가 섞여 정렬할 수 없으면
+    # 정규화하지 않은 원문을 씁니다.
+    try:
+        return json.dumps(yaml.safe_load(yaml_content), sort_keys=True, default=str)
+    except (yaml.YAMLError, TypeError):
+        lines = (line.rstrip() for line in yaml_content.strip().splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+def cache_key(yaml_content: str) -> str:
+    return hashlib.sha256(normalize_yaml(yaml_content).encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    def __init__(
+        self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None
+    ):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, entry)
+        return entry
+
+    def put(self, key: str, image: bytes, feedback: dict, message: str = "") -> None:
+        entry = {"image": image, "feedback": feedback, "message": message}
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _store(self, key: str, entry: dict) -> None:
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key)["image"])
+        if len(entry["image"]) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._size += len(entry["image"])
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted["image"])
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        if not self.disk_dir:
+            return None
+        image_path = os.path.join(self.disk_dir, f"{key}.png")
+        meta_path = os.path.join(self.disk_dir, f"{key}.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(image_path, "rb") as f:
+                image = f.read()
+        except (OSError, ValueError):
+            return None
+        return {
+            "image": image,
+            "feedback": meta["feedback"],
+            "message": meta["message"],
+        }
+
+    def _write_disk(self, key: str, entry: dict) -> None:
+        if not self.disk_dir:
+            return
+        image_path = os.path.join(self.disk_dir, f"{key}.png")
+        meta_path = os.path.join(self.disk_dir, f"{key}.json")
+        meta = json.dumps({"feedback": entry["feedback"], "message": entry["message"]})
+        # 다른 프로세스가 읽는 중일 수 있으므로 임시 파일에 쓴 뒤 교체합니다.
+        for path, data in ((image_path, entry["image"]), (meta_path, meta.encode())):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+
+render_cache = RenderCache(
+    max_bytes=int(os.environ.get("RENDER_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    disk_dir=os.environ.get("RENDER_CACHE_DIR") or None,
+)
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from diagram_generator import agenerate_diagram, generate_diagram
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+async def _acquire_async(semaphore: threading.Semaphore, timeout: float) -> bool:
+    # 스레드 세마포어를 이벤트 루프를 막지 않고 획득합니다 (여러 루프가 공유하므로).
+    deadline = time.monotonic() + timeout
+    while not semaphore.acquire(blocking=False):
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RenderService:
+    # awsdac 실행 수를 워커 수로 제한하고, 대기열이 가득 차면 일정 시간 후 거절합니다.
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: float = 30.0,
+        render_timeout: float = 120.0,
+    ):
+        self.max_workers = max_workers or _available_cpus()
+        self.max_queue = max_queue if max_queue is not None else 4 * self.max_workers
+        self.queue_timeout = queue_timeout
+        self.render_timeout = render_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="awsdac"
+        )
+        # _slots는 대기+실행 중인 작업 수, _running_slots는 동시에 실행되는 awsdac 수를 제한
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._running_slots = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[object, Callable[[], None]]] = {}
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._wait_times = deque(maxlen=1000)
+        self._render_times = deque(maxlen=1000)
+
+    def _reject(self):
+        with self._lock:
+            self._rejected += 1
+        raise RenderQueueFull(
+            f"렌더링 대기열이 가득 찼습니다 (workers={self.max_workers}, "
+            f"queue={self.max_queue})"
+        )
+
+    def _start(self, submitted_at: float) -> float:
+        started_at = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_times.append(started_at - submitted_at)
+        return started_at
+
+    def _finish(self, started_at: float) -> None:
+        with self._lock:
+            self._running -= 1
+            self._render_times.append(time.monotonic() - started_at)
+
+    def _register(self, owner: str, handle, cancel: Callable[[], None]) -> None:
+        with self._lock:
+            self._jobs.setdefault(owner, {})[handle] = cancel
+
+    def _unregister(self, owner: str, handle, cancelled: bool) -> None:
+        with self._lock:
+            if cancelled:
+                self._cancelled += 1
+            else:
+                self._completed += 1
+            jobs = self._jobs.get(owner)
+            if jobs is not None:
+                jobs.pop(handle, None)
+                if not jobs:
+                    del self._jobs[owner]
+
+    def submit(
+        self, yaml_content: str, workspace: Optional[str] = None, owner: str = ""
+    ) -> Future:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._reject()
+
+        cancel_event = threading.Event()
+        submitted_at = time.monotonic()
+
+        def run():
+            with self._running_slots:
+                started_at = self._start(submitted_at)
+                try:
+                    return generate_diagram(
+                        yaml_content,
+                        workspace,
+                        timeout=self.render_timeout,
+                        cancel_event=cancel_event,
+                    )
+                finally:
+                    self._finish(started_at)
+
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(run)
+
+        def cancel():
+            cancel_event.set()
+            future.cancel()
+
+        self._register(owner, future, cancel)
+
+        def done(f: Future):
+            self._slots.release()
+            if f.cancelled():
+                with self._lock:
+                    self._queued -= 1
+            self._unregister(owner, f, f.cancelled())
+
+        future.add_done_callback(done)
+        return future
+
+    def render(
+        self, yaml_content: str, workspace: Optional[str] = None, owner: str = ""
+    ) -> dict:
+        future = self.submit(yaml_content, workspace, owner or workspace or "")
+        return self.wait(future)
+
+    def wait(self, future: Future) -> dict:
+        return future.result(timeout=self.queue_timeout + self.render_timeout)
+
+    async def arender(
+        self, yaml_content: str, workspace: Optional[str] = None, owner: str = ""
+    ) -> dict:
+        # asyncio 경로: 같은 대기열/동시성 제한을 공유하고 awsdac는 비동기 subprocess로 실행
+        owner = owner or workspace or ""
+        if not await _acquire_async(self._slots, self.queue_timeout):
+            self._reject()
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        self._register(owner, task, lambda: loop.call_soon_threadsafe(task.cancel))
+        submitted_at = time.monotonic()
+        with self._lock:
+            self._queued += 1
+        started = False
+        cancelled = False
+        try:
+            if not await _acquire_async(self._running_slots, self.queue_timeout):
+                self._reject()
+            started = True
+            started_at = self._start(submitted_at)
+            try:
+                return await agenerate_diagram(
+                    yaml_content, workspace, timeout=self.render_timeout
+                )
+            finally:
+                self._running_slots.release()
+                self._finish(started_at)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if not started:
+                with self._lock:
+                    self._queued -= 1
+            self._slots.release()
+            self._unregister(owner, task, cancelled)
+
+    def cancel(self, owner: str) -> int:
+        # 세션이 끝나면 대기 중인 작업은 취소하고 실행 중인 awsdac는 종료합니다.
+        with self._lock:
+            jobs = list(self._jobs.get(owner, {}).values())
+        for cancel in jobs:
+            cancel()
+        if jobs:
+            logger.info(f"Cancelled {len(jobs)} render job(s) for {owner}")
+        return len(jobs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            wait_times = list(self._wait_times)
+            render_times = list(self._render_times)
+            return {
+                "workers": self.max_workers,
+                "queue_capacity": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "cancelled": self._cancelled,
+                "wait_p50": _percentile(wait_times, 0.5),
+                "wait_p95": _percentile(wait_times, 0.95),
+                "render_p50": _percentile(render_times, 0.5),
+                "render_p95": _percentile(render_times, 0.95),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+render_service = RenderService(
+    max_workers=int(os.environ.get("RENDER_WORKERS", 0)) or None,
+    max_queue=(
+        int(os.environ["RENDER_QUEUE_SIZE"])
+        if os.environ.get("RENDER_QUEUE_SIZE")
+        else None
+    ),
+    queue_timeout=float(os.environ.get("RENDER_QUEUE_TIMEOUT", 30)),
+    render_timeout=float(os.environ.get("RENDER_TIMEOUT", 120)),
+)
@@ -0,0 +1,8 @@
+# 예시 요구사항
+sample_requirements = {
+    "웹 애플리케이션": "고가용성 웹 애플리케이션을 위한 AWS 아키텍처를 설계해주세요. 사용자 트래픽은 변동이 심하며, 데이터베이스와 정적 자산 저장소가 필요합니다.",
+    "마이크로서비스": "마이크로서비스 아키텍처를 AWS에서 구현하고 싶습니다. 서비스 간 통신, 로드 밸런싱, 그리고 컨테이너 오케스트레이션을 고려해주세요.",
+    "데이터 처리 파이프라인": "대용량 데이터를 실시간으로 수집, 처리, 분석하는 파이프라인을 AWS에서 구축하고 싶습니다. 확장성과 비용 효율성을 고려해주세요.",
+    "서버리스 백엔드": "모바일 앱을 위한 서버리스 백엔드 아키텍처를 설계해주세요. 사용자 인증, API 요청 처리, 그리고 데이터 저장소를 포함해야 합니다.",
+    "재해 복구": "중요한 비즈니스 애플리케이션을 위한 재해 복구 솔루션을 AWS에서 구현하고 싶습니다. RPO와 RTO를 최소화하는 방안을 제시해주세요.",
+}
@@ -0,0 +1,61 @@
+import os
+import time
+from typing import Optional
+
+# 실행 하나의 상한. 시간/토큰 예산은 0이면 제한하지 않습니다.
+MAX_ITERATIONS = int(os.environ.get("ARCHITECT_MAX_ITERATIONS", 25))
+MAX_SECONDS = float(os.environ.get("ARCHITECT_MAX_SECONDS", 0))
+MAX_TOKENS = int(os.environ.get("ARCHITECT_MAX_TOKENS", 0))
+
+# 최근 CONVERGENCE_WINDOW번의 검증에서 최고 점수가 그 이전 최고 점수보다
+# MIN_IMPROVEMENT 미만으로 올랐으면 수렴한 것으로 보고 멈춥니다. window가 0이면 사용 안 함.
+CONVERGENCE_WINDOW = int(os.environ.get("ARCHITECT_CONVERGENCE_WINDOW", 3))
+MIN_IMPROVEMENT = float(os.environ.get("ARCHITECT_MIN_IMPROVEMENT", 3))
+
+DESIGN_FIELDS = (
+    "yaml_content",
+    "architecture_explanation",
+    "validation_result",
+    "architecture_score",
+    "diagram_result",
+)
+
+
+def has_converged(scores: list, window: int, min_improvement: float) -> bool:
+    if window <= 0 or len(scores) <= window:
+        return False
+    recent_best = max(scores[-window:])
+    earlier_best = max(scores[:-window])
+    return recent_best - earlier_best < min_improvement
+
+
+def budget_exhausted(
+    context: dict, started_at: float, totals: dict, now: Optional[float] = None
+) -> Optional[str]:
+    # 초과한 예산 이름("time_budget"/"token_budget") 또는 None
+    max_seconds = context.get("max_seconds") or 0
+    if max_seconds and (now or time.time()) - started_at >= max_seconds:
+        return "time_budget"
+    max_tokens = context.get("max_tokens") or 0
+    tokens = totals.get("input_tokens", 0) + totals.get("output_tokens", 0)
+    if max_tokens and tokens >= max_tokens:
+        return "token_budget"
+    return None
+
+
+def update_best_design(best: dict, state: dict) -> dict:
+    # 지금까지 가장 높은 점수를 받은 설계. 동점이면 먼저 나온 설계를 유지합니다.
+    if best and best["architecture_score"] >= state["architecture_score"]:
+        return best
+    return {field: state[field] for field in DESIGN_FIELDS}
+
+
+def restore_best_design(state: dict) -> dict:
+    # 마지막 설계 대신 최고 점수 설계를 결과로 되돌립니다.
+    best = state.get("best_design")
+    if not best:
+        return state
+    for field in DESIGN_FIELDS:
+        state[field] = best[field]
+    state["diagram_generated"] = bool((best["diagram_result"] or {}).get("image"))
+    return state
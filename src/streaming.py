@@ -0,0 +1,110 @@
+import threading
+from typing import Callable, Dict, List, Optional
+
+DIAGRAM_START = "<DIAGRAM>"
+DIAGRAM_END = "</DIAGRAM>"
+EXPLANATION_MARKER = "설명:"
+
+# run_id별로 노드 실행 중간 이벤트(토큰, 부분 YAML)를 받을 콜백을 등록합니다.
+_sinks: Dict[str, Callable[[dict], None]] = {}
+_sinks_lock = threading.Lock()
+
+
+def register_sink(run_id: str, sink: Callable[[dict], None]) -> None:
+    with _sinks_lock:
+        _sinks[run_id] = sink
+
+
+def unregister_sink(run_id: str) -> None:
+    with _sinks_lock:
+        _sinks.pop(run_id, None)
+
+
+def emit(run_id: Optional[str], event: dict) -> None:
+    with _sinks_lock:
+        sink = _sinks.get(run_id)
+    if sink is not None:
+        sink(event)
+
+
+def _strip_partial_tag(text: str, tag: str) -> str:
+    # 스트림 끝에 걸친 "</DIA" 같은 태그 조각은 아직 내보내지 않습니다.
+    for i in range(len(tag) - 1, 0, -1):
+        if text.endswith(tag[:i]):
+            return text[:-i]
+    return text
+
+
+def chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return ""
+
+
+class DiagramStreamParser:
+    # architect 응답을 토큰 단위로 받아 <DIAGRAM> 블록과 설명을 점진적으로 분리합니다.
+    # 이미 읽은 위치(_scan)부터만 검사하고, 새로 들어온 YAML/설명 조각만 이벤트로 내보냅니다.
+    def __init__(self):
+        self.content = ""
+        self.yaml_content = ""
+        self._scan = 0
+        self._yaml_start = None
+        self._section = "before"
+        self._emitted = set()
+
+    def _delta(self, key: str, end: int) -> List[dict]:
+        # 블록 앞의 공백은 첫 조각을 내보낼 때 잘라냅니다.
+        text = self.content[self._scan : end]
+        self._scan = end
+        if key not in self._emitted:
+            text = text.lstrip()
+        if not text:
+            return []
+        self._emitted.add(key)
+        return [{key: text}]
+
+    def _skip_to(self, tag: str) -> int:
+        # 태그를 찾으면 태그 시작 위치, 없으면 -1. 청크 끝에 걸친 태그 조각은 다음에 다시 검사합니다.
+        found = self.content.find(tag, self._scan)
+        if found == -1:
+            self._scan = max(self._scan, len(self.content) - len(tag) + 1)
+        return found
+
+    def feed(self, text: str) -> List[dict]:
+        self.content += text
+        events = []
+
+        if self._section == "before":
+            start = self._skip_to(DIAGRAM_START)
+            if start == -1:
+                return events
+            self._scan = self._yaml_start = start + len(DIAGRAM_START)
+            self._section = "yaml"
+
+        if self._section == "yaml":
+            end = self.content.find(DIAGRAM_END, self._scan)
+            if end == -1:
+                pending = self.content[self._scan :]
+                safe = self._scan + len(_strip_partial_tag(pending, DIAGRAM_END))
+                events += self._delta("partial_yaml_delta", safe)
+                return events
+            events += self._delta("partial_yaml_delta", end)
+            self.yaml_content = self.content[self._yaml_start : end].strip()
+            self._scan = end + len(DIAGRAM_END)
+            self._section = "between"
+
+        if self._section == "between":
+            marker = self._skip_to(EXPLANATION_MARKER)
+            if marker == -1:
+                return events
+            self._scan = marker + len(EXPLANATION_MARKER)
+            self._section = "explanation"
+
+        events += self._delta("partial_explanation_delta", len(self.content))
+        return events
@@ -0,0 +1,20 @@
+import os
+import shutil
+import tempfile
+
+# 실행(run)마다 독립된 작업 디렉터리를 사용해 동시 세션이 서로의 파일을 덮어쓰지 않도록 합니다.
+WORKSPACE_ROOT = os.environ.get("ARCHITECT_WORKSPACE_ROOT") or None
+
+
+def create_workspace(prefix: str = "architect-") -> str:
+    if WORKSPACE_ROOT:
+        os.makedirs(WORKSPACE_ROOT, exist_ok=True)
+    return tempfile.mkdtemp(prefix=prefix, dir=WORKSPACE_ROOT)
+
+
+def workspace_file(workspace: str, name: str) -> str:
+    return os.path.join(workspace, name)
+
+
+def remove_workspace(workspace: str) -> None:
+    shutil.rmtree(workspace, ignore_errors=True)
@@ -0,0 +1,103 @@
+import re
+
+import yaml
+
+PATCH_FORMAT = """<PATCH>
+Resources:
+  add:            # 새 리소스 (이름: 정의)
+    NewResource:
+      Type: AWS::Lambda::Function
+  modify:         # 기존 리소스의 필드만 변경 (null이면 필드 삭제)
+    ExistingResource:
+      Title: "새 제목"
+  remove:         # 삭제할 리소스 이름 (Children/Links에서도 함께 제거)
+    - OldResource
+Children:
+  add:            # 부모: [추가할 자식]
+    ParentResource: [NewResource]
+  remove:
+    ParentResource: [OldChild]
+Links:
+  add:
+    - Source: A
+      Target: B
+      TargetArrowHead:
+        Type: Open
+  remove:         # Source/Target이 일치하는 링크 삭제
+    - Source: C
+      Target: D
+</PATCH>"""
+
+
+def extract_patch(content: str) -> dict:
+    match = re.search(r"<PATCH>(.*?)</PATCH>", content, re.DOTALL)
+    if not match:
+        raise ValueError("No <PATCH> block in response")
+    patch = yaml.safe_load(match.group(1))
+    if not isinstance(patch, dict):
+        raise ValueError("Patch must be a mapping")
+    return patch
+
+
+def _section(patch: dict, name: str) -> dict:
+    section = patch.get(name) or {}
+    if not isinstance(section, dict):
+        raise ValueError(f"Patch section {name} must be a mapping")
+    return section
+
+
+def _link_matches(link: dict, selector: dict) -> bool:
+    return all(link.get(key) == value for key, value in selector.items())
+
+
+def apply_patch(yaml_content: str, patch: dict) -> str:
+    document = yaml.safe_load(yaml_content)
+    diagram = document["Diagram"]
+    resources = diagram.setdefault("Resources", {})
+    links = diagram.get("Links") or []
+
+    resource_patch = _section(patch, "Resources")
+    for name in resource_patch.get("remove") or []:
+        resources.pop(name, None)
+        for resource in resources.values():
+            if name in (resource.get("Children") or []):
+                resource["Children"].remove(name)
+        links = [
+            link for link in links if name not in (link.get("Source"), link.get("Target"))
+        ]
+
+    for name, definition in (resource_patch.get("add") or {}).items():
+        if not isinstance(definition, dict) or "Type" not in definition:
+            raise ValueError(f"Added resource {name} needs a Type")
+        resources[name] = definition
+
+    for name, fields in (resource_patch.get("modify") or {}).items():
+        if name not in resources:
+            raise ValueError(f"Cannot modify unknown resource {name}")
+        for key, value in fields.items():
+            if value is None:
+                resources[name].pop(key, None)
+            else:
+                resources[name][key] = value
+
+    children_patch = _section(patch, "Children")
+    for parent, children in (children_patch.get("remove") or {}).items():
+        if parent in resources:
+            current = resources[parent].get("Children") or []
+            resources[parent]["Children"] = [c for c in current if c not in children]
+    for parent, children in (children_patch.get("add") or {}).items():
+        if parent not in resources:
+            raise ValueError(f"Cannot add children to unknown resource {parent}")
+        current = resources[parent].setdefault("Children", [])
+        current.extend(c for c in children if c not in current)
+
+    link_patch = _section(patch, "Links")
+    for selector in link_patch.get("remove") or []:
+        links = [link for link in links if not _link_matches(link, selector)]
+    links.extend(link_patch.get("add") or [])
+
+    if links:
+        diagram["Links"] = links
+    else:
+        diagram.pop("Links", None)
+    return yaml.safe_dump(document, sort_keys=False, allow_unicode=True)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# src 모듈은 서로를 최상위 모듈로 import 하므로 (streamlit run src/app.py 기준) 경로를 추가합니다.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
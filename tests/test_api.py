@@ -0,0 +1,74 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from src.api import create_server
+from src.api_client import run_remote_agent
+from src.jobs import JobManager
+
+
+def fake_runner(question, model_id, run_id, **options):
+    yield {"run_id": run_id}
+    yield {"yaml_content": "Diagram: {}", "architecture_explanation": question}
+    yield {"diagram_generated": True, "diagram_image": b"\x89PNG"}
+    yield {"validation_result": "<점수>93</점수>", "architecture_score": 93.0}
+
+
+class TestApi(unittest.TestCase):
+    def setUp(self):
+        self.jobs = JobManager(workers=1, runner=fake_runner, option_names={"stream"})
+        self.server = create_server(self.jobs, "127.0.0.1", 0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.jobs.shutdown()
+
+    def post(self, payload: dict):
+        request = urllib.request.Request(
+            self.url + "/jobs", data=json.dumps(payload).encode(), method="POST"
+        )
+        return urllib.request.urlopen(request, timeout=5)
+
+    def test_client_streams_statuses_with_diagram_bytes(self):
+        statuses = list(
+            run_remote_agent(
+                "웹 서비스", "m", run_id="run-1", api_url=self.url, stream=True
+            )
+        )
+        self.assertEqual(statuses[0], {"run_id": "run-1"})
+        self.assertEqual(statuses[2]["diagram_image"], b"\x89PNG")
+        self.assertEqual(statuses[3]["architecture_score"], 93.0)
+
+        with urllib.request.urlopen(self.url + "/jobs/run-1", timeout=5) as response:
+            job = json.loads(response.read())
+        self.assertEqual(job["status"], "succeeded")
+        url = self.url + "/jobs/run-1/artifacts/architecture.yaml"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            self.assertEqual(response.read(), b"Diagram: {}")
+
+    def test_events_resume_after_last_event_id(self):
+        self.jobs.submit("q", "m", job_id="run-2").future.result(timeout=5)
+        request = urllib.request.Request(
+            self.url + "/jobs/run-2/events", headers={"Last-Event-ID": "2"}
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            body = response.read().decode()
+        self.assertTrue(body.startswith("id: 3\nevent: status\n"))
+        self.assertIn("event: end", body)
+
+    def test_rejects_invalid_requests(self):
+        for payload in ({"question": ""}, {"question": "q", "options": {"typo": 1}}):
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                self.post(payload)
+            self.assertEqual(raised.exception.code, 400)
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(self.url + "/jobs/missing", timeout=5)
+        self.assertEqual(raised.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
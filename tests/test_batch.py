@@ -0,0 +1,160 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import architect
+from src.batch import (
+    artifact_name,
+    completed_ids,
+    read_requirements,
+    requirement_id,
+    run_requirement,
+    summarize_batch,
+)
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_reads_jsonl_and_derives_missing_ids(self):
+        path = self.write(
+            "requirements.jsonl",
+            '{"id": "web", "question": "웹 서비스", "options": {"refine": true}}\n'
+            "\n"
+            '{"question": "데이터 레이크", "model_id": "m"}\n',
+        )
+        requirements = read_requirements(path)
+        self.assertEqual(requirements[0]["id"], "web")
+        self.assertEqual(requirements[0]["options"], {"refine": True})
+        self.assertEqual(requirements[1]["id"], requirement_id("데이터 레이크"))
+        self.assertEqual(requirements[1]["model_id"], "m")
+
+    def test_reads_csv_and_rejects_duplicates(self):
+        path = self.write("requirements.csv", "id,question\na,웹 서비스\nb,데이터\n")
+        self.assertEqual([r["id"] for r in read_requirements(path)], ["a", "b"])
+
+        path = self.write("duplicate.csv", "id,question\na,웹 서비스\na,데이터\n")
+        with self.assertRaises(ValueError):
+            read_requirements(path)
+
+    def test_parses_csv_options_and_rejects_non_objects(self):
+        path = self.write(
+            "options.csv",
+            'id,question,options\na,웹 서비스,"{""refine"": true}"\nb,데이터,\n',
+        )
+        requirements = read_requirements(path)
+        self.assertEqual(requirements[0]["options"], {"refine": True})
+        self.assertEqual(requirements[1]["options"], {})
+
+        for options in ('"[1, 2]"', "refine"):
+            path = self.write("bad.csv", f"id,question,options\na,웹 서비스,{options}\n")
+            with self.assertRaisesRegex(ValueError, "bad.csv:1: options"):
+                read_requirements(path)
+        path = self.write("bad.jsonl", '{"question": "q", "options": ["refine"]}\n')
+        with self.assertRaisesRegex(ValueError, "bad.jsonl:1: options"):
+            read_requirements(path)
+
+    def test_completed_ids_skip_failures_and_truncated_lines(self):
+        path = self.write(
+            "results.jsonl",
+            json.dumps({"id": "a", "status": "succeeded"})
+            + "\n"
+            + json.dumps({"id": "b", "status": "failed"})
+            + '\n{"id": "c", "sta',
+        )
+        self.assertEqual(completed_ids(path), {"a"})
+        self.assertEqual(completed_ids(path + ".missing"), set())
+
+    def test_stop_reason_is_not_accepted_for_failed_runs(self):
+        item = {"id": "a", "question": "q", "model_id": None, "options": {}}
+        runs = [
+            ([{"architecture_score": 95.0}], "accepted"),
+            ([{"architecture_score": 70.0}, {"stop_reason": "converged"}], "converged"),
+            ([{"architecture_score": 70.0}], None),
+            ([{"run_id": "a"}, {"error": "boom"}], "error"),
+        ]
+        for statuses, expected in runs:
+            with mock.patch.object(
+                architect, "run_aws_architect_agent", lambda *a, **k: iter(statuses)
+            ):
+                record = run_requirement(item, "m", {}, self.directory.name)
+            self.assertEqual(record["stop_reason"], expected)
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("langgraph"), "langgraph is not installed"
+    )
+    def test_architect_node_failure_is_recorded_as_failed(self):
+        class FailingLLM:
+            def invoke(self, *args, **kwargs):
+                raise RuntimeError("Bedrock unavailable")
+
+        item = {"id": "a", "question": "웹 서비스", "model_id": None, "options": {}}
+        with mock.patch.object(architect, "create_llm", lambda model_id: FailingLLM()):
+            record = run_requirement(
+                item, "m", {"design_cache": False}, self.directory.name
+            )
+        self.assertEqual(record["status"], "failed")
+        self.assertEqual(record["error"], "Architect: Bedrock unavailable")
+        self.assertIsNone(record["yaml_content"])
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("langgraph"), "langgraph is not installed"
+    )
+    def test_node_failure_returns_best_design(self):
+        best = {
+            "yaml_content": "Diagram: {}",
+            "architecture_explanation": "설명",
+            "validation_result": "<점수>80</점수>",
+            "architecture_score": 80.0,
+            "diagram_result": {"image": b"\x89PNG"},
+        }
+        state = {
+            **dict.fromkeys(best, ""),
+            "architecture_score": 0,
+            "diagram_result": {},
+            "diagram_generated": False,
+            "best_design": best,
+        }
+        architect.fail_node(state, "Architect", RuntimeError("Bedrock unavailable"))
+        self.assertEqual(state["next_node"], "FINISH")
+        self.assertEqual(state["stop_reason"], "error")
+
+        final = {}
+        for status in architect.best_design_statuses(state):
+            final.update(status)
+        self.assertEqual(final["node_error"], "Architect: Bedrock unavailable")
+        self.assertEqual(final["yaml_content"], "Diagram: {}")
+        self.assertEqual(final["diagram_image"], b"\x89PNG")
+        self.assertEqual(final["best_score"], 80.0)
+
+    def test_artifact_name_is_filesystem_safe(self):
+        self.assertEqual(artifact_name("team/web app"), "team_web_app.png")
+
+    def test_summary_reports_throughput_and_unfinished(self):
+        records = [
+            {"status": "succeeded", "seconds": 10, "metrics": {"input_tokens": 5}},
+            {"status": "failed", "seconds": 20, "metrics": {}},
+        ]
+        summary = summarize_batch(records, pending=3, skipped=4, elapsed=60)
+        self.assertEqual(summary["succeeded"], 1)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["unfinished"], 1)
+        self.assertEqual(summary["designs_per_hour"], 120)
+        self.assertEqual(summary["input_tokens"], 5)
+        self.assertEqual(summary["p95_seconds"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import asyncio
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+
+@unittest.skipUnless(importlib.util.find_spec("langgraph"), "langgraph is not installed")
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        from src.checkpoints import open_checkpoint_store, run_config
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = open_checkpoint_store(
+            os.path.join(self.directory.name, "nested", "checkpoints.sqlite")
+        )
+        self.config = run_config("run-1")
+
+    def tearDown(self):
+        self.store.conn.close()
+        self.directory.cleanup()
+
+    def checkpoint(self, checkpoint_id: str) -> dict:
+        from langgraph.checkpoint.base import empty_checkpoint
+
+        checkpoint = empty_checkpoint()
+        checkpoint["id"] = checkpoint_id
+        checkpoint["channel_values"] = {"diagram_result": {"image": b"\x89PNG"}}
+        return checkpoint
+
+    def test_serializes_to_json_and_refuses_unknown_objects(self):
+        from langchain_core.messages import HumanMessage
+
+        from src.checkpoints import CheckpointSerializer
+
+        serde = CheckpointSerializer()
+        state = {"image": b"\x89PNG", "messages": [HumanMessage(content="요구사항")]}
+        data = serde.dumps(state)
+        json.loads(data)
+        restored = serde.loads(data)
+        self.assertEqual(restored["image"], b"\x89PNG")
+        self.assertEqual(restored["messages"][0].content, "요구사항")
+
+        payload = {"lc": 2, "type": "constructor", "id": ["os", "system"]}
+        payload.update({"method": None, "args": ["true"], "kwargs": {}})
+        with self.assertRaises(ValueError):
+            serde.loads(json.dumps(payload).encode())
+
+    def test_prunes_abandoned_runs(self):
+        self.store.put(self.config, self.checkpoint("1"), {"step": 1})
+        self.assertEqual(self.store.prune(max_age_hours=1), 0)
+        with self.store.cursor() as cur:
+            cur.execute("UPDATE runs SET updated_at = ?", (time.time() - 7200,))
+        self.assertEqual(self.store.prune(max_age_hours=1), 1)
+        self.assertIsNone(self.store.get_tuple(self.config))
+
+    def test_round_trips_bytes_and_deletes_run(self):
+        self.store.put(self.config, self.checkpoint("1"), {"step": 1})
+        saved = self.store.get_tuple(self.config)
+        self.assertEqual(
+            saved.checkpoint["channel_values"]["diagram_result"]["image"], b"\x89PNG"
+        )
+
+        self.store.delete_run("run-1")
+        self.assertIsNone(self.store.get_tuple(self.config))
+
+    def test_async_methods_use_the_sync_store(self):
+        async def scenario():
+            await self.store.aput(self.config, self.checkpoint("2"), {"step": 2})
+            saved = await self.store.aget_tuple(self.config)
+            listed = [item async for item in self.store.alist(self.config)]
+            return saved, listed
+
+        saved, listed = asyncio.run(scenario())
+        self.assertEqual(saved.checkpoint["id"], "2")
+        self.assertEqual(len(listed), 1)
+
+
+@unittest.skipUnless(importlib.util.find_spec("langgraph"), "langgraph is not installed")
+class TestResume(unittest.TestCase):
+    def test_saved_node_output_is_applied_instead_of_rerun(self):
+        from src.architect import checkpoint_statuses, resume_update
+
+        initial = {"workspace": "/new", "context": {"run_id": "r1"}}
+        snapshot = SimpleNamespace(next=("Validate",))
+        writes = [
+            ("task", "validation_result", "<점수>70</점수>"),
+            ("task", "architecture_score", 70.0),
+            ("task", "branch:Validate:condition:supervisor", "supervisor"),
+        ]
+        values, node = resume_update(
+            snapshot, SimpleNamespace(pending_writes=writes), initial
+        )
+        self.assertEqual(node, "Validate")
+        self.assertEqual(values["workspace"], "/new")
+        self.assertEqual(values["architecture_score"], 70.0)
+        self.assertNotIn("branch:Validate:condition:supervisor", values)
+
+        values, node = resume_update(snapshot, SimpleNamespace(pending_writes=[]), initial)
+        self.assertIsNone(node)
+        self.assertEqual(set(values), {"workspace", "context"})
+
+        state = {
+            "yaml_content": "Diagram: {}",
+            "architecture_explanation": "설명",
+            "diagram_generated": True,
+            "diagram_result": {"image": b"\x89PNG"},
+            "validation_result": "",
+        }
+        self.assertEqual(
+            [list(status)[0] for status in checkpoint_statuses(state)],
+            ["yaml_content", "diagram_generated"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
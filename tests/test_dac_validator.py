@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src import dac_validator
+from src.dac_validator import validate_diagram_yaml
+
+VALID_YAML = """
+Diagram:
+  DefinitionFiles:
+    - Type: URL
+      Url: "https://example.com/definition.yaml"
+  Resources:
+    Canvas:
+      Type: AWS::Diagram::Canvas
+      Direction: vertical
+      Children: [ALB, EC2]
+    ALB:
+      Type: AWS::ElasticLoadBalancingV2::LoadBalancer
+      Preset: Application Load Balancer
+    EC2:
+      Type: AWS::EC2::Instance
+  Links:
+    - Source: ALB
+      SourcePosition: S
+      Target: EC2
+      TargetPosition: N
+"""
+
+
+class TestDacValidator(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(
+            dac_validator, "known_definitions", return_value=(frozenset(), frozenset())
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_valid_diagram(self):
+        self.assertEqual(validate_diagram_yaml(VALID_YAML)["errors"], [])
+
+    def test_reports_structural_errors(self):
+        broken = (
+            VALID_YAML.replace("Children: [ALB, EC2]", "Children: [ALB, Missing]")
+            .replace("Direction: vertical", "Direction: diagonal")
+            .replace("TargetPosition: N", "TargetPosition: UP")
+        )
+        errors = "\n".join(validate_diagram_yaml(broken)["errors"])
+        self.assertIn("undefined child 'Missing'", errors)
+        self.assertIn("'EC2' is orphaned", errors)
+        self.assertIn("invalid Direction 'diagonal'", errors)
+        self.assertIn("invalid TargetPosition 'UP'", errors)
+
+    def test_detects_cycles_and_bad_links(self):
+        broken = VALID_YAML.replace(
+            "Type: AWS::EC2::Instance", "Type: AWS::EC2::Instance\n      Children: [Canvas]"
+        ).replace("Target: EC2", "Target: Nowhere")
+        errors = "\n".join(validate_diagram_yaml(broken)["errors"])
+        self.assertIn("cycle detected", errors)
+        self.assertIn("Target 'Nowhere' is not a defined resource", errors)
+
+    def test_list_and_dict_values_are_reported_not_raised(self):
+        broken = (
+            VALID_YAML.replace("Children: [ALB, EC2]", "Children: [ALB, EC2, 1, [2]]")
+            .replace("Direction: vertical", "Direction: [vertical]")
+            .replace("SourcePosition: S", "SourcePosition: [1]")
+            .replace("Target: EC2", "Target: {Name: EC2}")
+        )
+        errors = "\n".join(validate_diagram_yaml(broken)["errors"])
+        self.assertIn("invalid child '[2]'", errors)
+        self.assertIn("invalid child '1'", errors)
+        self.assertIn("invalid Direction '['vertical']'", errors)
+        self.assertIn("invalid SourcePosition '[1]'", errors)
+        self.assertIn("Target '{'Name': 'EC2'}' is not a defined resource", errors)
+
+    def test_unknown_type_with_definitions(self):
+        with mock.patch.object(
+            dac_validator,
+            "known_definitions",
+            return_value=(frozenset({"AWS::EC2::Instance"}), frozenset()),
+        ):
+            errors = validate_diagram_yaml(VALID_YAML)["errors"]
+        self.assertEqual(
+            errors,
+            [
+                "ERROR Resource 'ALB' has unknown Type "
+                "'AWS::ElasticLoadBalancingV2::LoadBalancer'"
+            ],
+        )
+
+    def test_malformed_yaml(self):
+        self.assertTrue(validate_diagram_yaml("Diagram: [")["errors"])
+
+
+
+class TestKnownDefinitions(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(dac_validator, "_known_definitions", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_missing_file_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "definition.yaml")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(
+                    "Definitions:\n"
+                    "  AWS::EC2::Instance: {Type: Resource}\n"
+                    "  Application Load Balancer: {Type: Preset}\n"
+                )
+            with mock.patch.object(
+                dac_validator, "local_definition_path", side_effect=[None, path]
+            ) as lookup:
+                self.assertEqual(
+                    dac_validator.known_definitions(), (frozenset(), frozenset())
+                )
+                expected = (
+                    frozenset({"AWS::EC2::Instance"}),
+                    frozenset({"Application Load Balancer"}),
+                )
+                self.assertEqual(dac_validator.known_definitions(), expected)
+                self.assertEqual(dac_validator.known_definitions(), expected)
+            self.assertEqual(lookup.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
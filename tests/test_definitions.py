@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import yaml
+from src import definitions
+from src.definitions import (
+    DEFAULT_DEFINITION_URL,
+    localize_definition_files,
+    refresh_definitions,
+    verify_definitions,
+)
+
+DIAGRAM_YAML = f"""
+Diagram:
+  DefinitionFiles:
+    - Type: URL
+      Url: "{DEFAULT_DEFINITION_URL}"
+  Resources:
+    Canvas:
+      Type: AWS::Diagram::Canvas
+"""
+
+ICONS_ZIP_URL = "https://icons.awsstatic.com/Asset-Package_02062024.zip"
+COMMON_URL = "https://example.com/definitions/definition-for-aws-common.yaml"
+
+# definition-for-aws-icons-light.yaml의 구조를 줄인 것
+DEFINITION_FILE = f"""
+DefinitionFiles:
+  - Type: URL
+    Url: "{COMMON_URL}"
+Definitions:
+  ArchitectureIconsPackage:
+    Type: Zip
+    ZipFile:
+      SourceType: url
+      Url: "{ICONS_ZIP_URL}"
+  ArchitectureIcons:
+    Type: Directory
+    Directory:
+      Source: ArchitectureIconsPackage
+      Path: Architecture-Service-Icons_02062024/
+  AWS::EC2::Instance:
+    Type: Resource
+    Icon:
+      Source: ArchitectureIcons
+      Path: Arch_Compute/48/Arch_Amazon-EC2_48.png
+    Label:
+      Title: Amazon EC2
+"""
+
+DOWNLOADS = {
+    DEFAULT_DEFINITION_URL: DEFINITION_FILE.encode(),
+    COMMON_URL: b"Definitions: {}\n",
+    ICONS_ZIP_URL: b"PK\x03\x04",
+}
+
+
+def fake_download(url, path, timeout):
+    with open(path, "wb") as f:
+        f.write(DOWNLOADS[url])
+
+
+class TestDefinitions(unittest.TestCase):
+    def setUp(self):
+        definitions._verified.clear()
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "definition.yaml")
+        with open(self.path, "w") as f:
+            f.write("Definitions: {}\n")
+        with open(self.path, "rb") as f:
+            self.sha256 = hashlib.sha256(f.read()).hexdigest()
+
+    def tearDown(self):
+        self.dir.cleanup()
+        definitions._verified.clear()
+
+    def write_manifest(self, sha256):
+        entry = {"file": "definition.yaml", "sha256": sha256}
+        with open(os.path.join(self.dir.name, "manifest.json"), "w") as f:
+            json.dump({DEFAULT_DEFINITION_URL: entry}, f)
+
+    def test_rewrites_url_to_local_copy(self):
+        self.write_manifest(self.sha256)
+        document = yaml.safe_load(localize_definition_files(DIAGRAM_YAML, self.dir.name))
+        self.assertEqual(
+            document["Diagram"]["DefinitionFiles"],
+            [{"Type": "LocalFile", "LocalFile": self.path}],
+        )
+
+    def test_keeps_url_on_checksum_mismatch(self):
+        self.write_manifest("0" * 64)
+        self.assertEqual(localize_definition_files(DIAGRAM_YAML, self.dir.name), DIAGRAM_YAML)
+
+    def test_keeps_url_without_cache(self):
+        self.assertEqual(localize_definition_files(DIAGRAM_YAML, self.dir.name), DIAGRAM_YAML)
+
+    def test_cache_miss_is_not_remembered(self):
+        self.assertEqual(localize_definition_files(DIAGRAM_YAML, self.dir.name), DIAGRAM_YAML)
+        self.write_manifest(self.sha256)
+        self.assertIn("LocalFile", localize_definition_files(DIAGRAM_YAML, self.dir.name))
+
+
+class TestRefreshDefinitions(unittest.TestCase):
+    def setUp(self):
+        definitions._verified.clear()
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+        definitions._verified.clear()
+
+    @mock.patch.object(definitions, "_download", fake_download)
+    def test_localizes_nested_definition_files_and_icon_zip(self):
+        manifest = refresh_definitions(directory=self.dir.name)
+        self.assertEqual(set(manifest), set(DOWNLOADS))
+        self.assertTrue(all(verify_definitions(self.dir.name).values()))
+
+        path = os.path.join(self.dir.name, manifest[DEFAULT_DEFINITION_URL]["file"])
+        with open(path) as f:
+            definition = yaml.safe_load(f)
+        self.assertEqual(definition["DefinitionFiles"][0]["Type"], "LocalFile")
+        zip_file = definition["Definitions"]["ArchitectureIconsPackage"]["ZipFile"]
+        self.assertEqual(zip_file["SourceType"], "local")
+        self.assertNotIn("Url", zip_file)
+        with open(zip_file["Path"], "rb") as f:
+            self.assertEqual(f.read(), DOWNLOADS[ICONS_ZIP_URL])
+        self.assertEqual(
+            definition["Definitions"]["AWS::EC2::Instance"]["Icon"]["Source"],
+            "ArchitectureIcons",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from src.design_cache import DesignCache, design_profile
+
+WEB_APP = "고가용성 웹 애플리케이션을 위한 AWS 아키텍처를 설계해주세요. 사용자 트래픽은 변동이 심하며, 데이터베이스와 정적 자산 저장소가 필요합니다."
+DATA_LAKE = "대규모 데이터 분석을 위한 데이터 레이크 아키텍처를 설계해주세요. 다양한 소스에서 데이터를 수집하고 처리할 수 있어야 합니다."
+
+
+class TestDesignCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = DesignCache(reuse_threshold=0.95, seed_threshold=0.8)
+        self.cache.put(WEB_APP, "web: yaml", "web", "<점수>95</점수>", 95, b"png")
+        self.cache.put(DATA_LAKE, "lake: yaml", "lake", "<점수>92</점수>", 92, b"png")
+
+    def test_near_identical_requirement_is_reused(self):
+        similarity, design = self.cache.lookup("  " + WEB_APP.replace(",", "") + "\n")
+        self.assertGreaterEqual(similarity, 0.95)
+        self.assertEqual(design["yaml_content"], "web: yaml")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_similar_requirement_is_a_seed(self):
+        similarity, design = self.cache.lookup(WEB_APP + " 비용도 최소화해주세요.")
+        self.assertGreaterEqual(similarity, 0.8)
+        self.assertLess(similarity, 0.95)
+        self.assertEqual(design["yaml_content"], "web: yaml")
+        self.assertEqual(self.cache.stats()["seeds"], 1)
+
+    def test_unrelated_requirement_misses(self):
+        _, design = self.cache.lookup("서버리스 이미지 처리 파이프라인을 설계해주세요.")
+        self.assertIsNone(design)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_designs_are_reused_only_for_the_same_profile(self):
+        sonnet = design_profile("sonnet", {"candidates": 1, "refine": False})
+        haiku = design_profile("haiku", {"candidates": 1, "refine": False})
+        self.assertNotEqual(
+            sonnet, design_profile("sonnet", {"candidates": 3, "refine": False})
+        )
+        self.cache.put(WEB_APP, "sonnet: yaml", "web", "", 95, b"png", profile=sonnet)
+
+        _, design = self.cache.lookup(WEB_APP, sonnet)
+        self.assertEqual(design["yaml_content"], "sonnet: yaml")
+        self.assertIsNone(self.cache.lookup(WEB_APP, haiku)[1])
+        self.assertEqual(self.cache.lookup(WEB_APP)[1]["yaml_content"], "web: yaml")
+        self.assertEqual(self.cache.stats()["entries"], 3)
+
+    def test_disk_persistence_and_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DesignCache(directory=directory, max_entries=1)
+            cache.put(DATA_LAKE, "lake: yaml", "lake", "", 92, b"lake")
+            cache.put(WEB_APP, "web: yaml", "web", "", 95, b"web")
+
+            reloaded = DesignCache(directory=directory)
+            self.assertEqual(reloaded.stats()["entries"], 1)
+            _, design = reloaded.lookup(WEB_APP)
+            self.assertEqual(design["image"], b"web")
+            self.assertIsNone(reloaded.lookup(DATA_LAKE)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import subprocess
+import sys
+import threading
 import unittest
-from src.diagram_generator import generate_diagram
+from src.diagram_generator import RenderCancelled, generate_diagram, run_awsdac
 
 
 class TestDiagramGenerator(unittest.TestCase):
@@ -21,6 +24,15 @@ Diagram:
         result = generate_diagram(yaml_content)
         self.assertIn("다이어그램이 성공적으로 생성되었습니다", result)
 
+    def test_run_awsdac_kills_on_timeout_and_cancel(self):
+        args = [sys.executable, "-c", "import time; time.sleep(30)"]
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_awsdac(args, cwd=".", timeout=0.2)
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(RenderCancelled):
+            run_awsdac(args, cwd=".", cancel_event=cancel_event)
+
 
 if __name__ == "__main__":
     unittest.main()
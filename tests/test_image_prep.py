@@ -0,0 +1,54 @@
+import base64
+import io
+import struct
+import unittest
+import zlib
+from src import image_prep
+from src.image_prep import ImagePreparer, image_hash
+
+
+def make_png(width: int, height: int) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    row = b"\x00" + b"\xf0\xf0\xf0" * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+class TestImagePrep(unittest.TestCase):
+    def test_payload_is_cached_by_image_hash(self):
+        preparer = ImagePreparer(max_edge=100, max_entries=1)
+        png = make_png(40, 30)
+        first = preparer.prepare(png)
+        self.assertIs(preparer.prepare(png), first)
+        self.assertEqual(first["hash"], image_hash(png))
+        self.assertEqual(preparer.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+        preparer.prepare(make_png(10, 10))
+        self.assertEqual(preparer.stats()["entries"], 1)
+
+    @unittest.skipUnless(image_prep.pillow(), "Pillow is not installed")
+    def test_downscales_to_max_edge(self):
+        prepared = ImagePreparer(max_edge=200).prepare(make_png(1600, 400))
+        self.assertEqual(prepared["size"], (200, 50))
+        self.assertLess(prepared["encoded_bytes"], prepared["original_bytes"])
+        with image_prep.pillow().open(
+            io.BytesIO(base64.b64decode(prepared["data"]))
+        ) as image:
+            self.assertEqual(image.size, (200, 50))
+
+    @unittest.skipIf(image_prep.pillow(), "Pillow is installed")
+    def test_passthrough_without_pillow(self):
+        png = make_png(1600, 400)
+        prepared = ImagePreparer(max_edge=200).prepare(png)
+        self.assertEqual(base64.b64decode(prepared["data"]), png)
+
+
+if __name__ == "__main__":
+    unittest.main()
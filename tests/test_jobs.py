@@ -0,0 +1,114 @@
+import threading
+import unittest
+from src.jobs import JobManager, JobQueueFull
+
+
+def fake_runner(question, model_id, run_id, **options):
+    yield {"run_id": run_id}
+    yield {"yaml_content": "Diagram: {}", "architecture_explanation": question}
+    yield {"diagram_generated": True, "diagram_image": b"\x89PNG"}
+    yield {"validation_result": "<점수>93</점수>", "architecture_score": 93.0}
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = JobManager(workers=1, max_queued=1, runner=fake_runner)
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def test_runs_job_and_collects_artifacts(self):
+        job = self.manager.submit("웹 서비스", "m", job_id="job-1")
+        job.future.result(timeout=5)
+
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.events[0], {"run_id": "job-1"})
+        self.assertEqual(
+            job.events[2],
+            {
+                "diagram_generated": True,
+                "diagram_url": "/jobs/job-1/artifacts/diagram.png",
+            },
+        )
+        self.assertEqual(job.artifacts["diagram.png"], b"\x89PNG")
+        self.assertEqual(job.artifacts["architecture.yaml"], b"Diagram: {}")
+        self.assertEqual(job.result["architecture_score"], 93.0)
+        self.assertIn("result.json", job.artifacts)
+
+    def test_error_event_fails_job(self):
+        def failing_runner(question, model_id, run_id, **options):
+            yield {"run_id": run_id}
+            yield {"error": "boom"}
+
+        self.manager.runner = failing_runner
+        job = self.manager.submit("q", "m")
+        job.future.result(timeout=5)
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "boom")
+
+    def test_queue_is_bounded_and_queued_jobs_can_be_cancelled(self):
+        release = threading.Event()
+
+        def blocking_runner(question, model_id, run_id, **options):
+            release.wait(5)
+            yield {"run_id": run_id}
+
+        self.manager.runner = blocking_runner
+        running = self.manager.submit("q", "m")
+        queued = self.manager.submit("q", "m")
+        with self.assertRaises(JobQueueFull):
+            self.manager.submit("q", "m")
+
+        self.manager.cancel(queued.id)
+        self.assertEqual(queued.status, "cancelled")
+        release.set()
+        running.future.result(timeout=5)
+        self.assertEqual(running.status, "succeeded")
+
+    def test_unknown_options_are_rejected(self):
+        self.manager.option_names = {"stream"}
+        with self.assertRaises(TypeError):
+            self.manager.submit("q", "m", typo=True)
+
+    def test_wait_events_resumes_from_index(self):
+        job = self.manager.submit("q", "m")
+        job.future.result(timeout=5)
+        events, finished = job.wait_events(3, timeout=0)
+        self.assertEqual(len(events), 1)
+        self.assertTrue(finished)
+
+    def test_partial_deltas_are_joined_into_latest(self):
+        streamed, release = threading.Event(), threading.Event()
+
+        def streaming_runner(question, model_id, run_id, **options):
+            yield {"run_id": run_id}
+            for _ in range(1, 50):
+                yield {"partial_yaml_delta": "Diagram:\n"}
+            yield {"partial_explanation_delta": "설명"}
+            streamed.set()
+            release.wait(5)
+            yield {"yaml_content": "Diagram: {}", "architecture_explanation": "설명"}
+
+        self.manager.runner = streaming_runner
+        job = self.manager.submit("q", "m")
+        streamed.wait(5)
+        self.assertEqual(len(job.events), 1)
+        version, partial = job.latest_partial(0)
+        self.assertEqual(version, 50)
+        self.assertEqual(
+            partial,
+            {
+                "partial_yaml_content": "Diagram:\n" * 49,
+                "partial_architecture_explanation": "설명",
+            },
+        )
+        self.assertEqual(job.latest_partial(version), (50, None))
+
+        release.set()
+        job.future.result(timeout=5)
+        self.assertEqual(len(job.events), 2)
+        self.assertEqual(job.latest_partial(0), (50, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
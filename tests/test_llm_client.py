@@ -0,0 +1,93 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from src import llm_client
+from src.llm_client import LLMThrottled, ManagedLLM, TokenBucket, is_retryable
+
+
+class ThrottlingError(Exception):
+    def __init__(self):
+        super().__init__("An error occurred (ThrottlingException)")
+        self.response = {"Error": {"Code": "ThrottlingException"}}
+
+
+class FlakyLLM:
+    def __init__(self, failures: int, error=ThrottlingError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error()
+        return SimpleNamespace(content="ok", response_metadata={})
+
+    def invoke(self, messages):
+        return self._call()
+
+    async def ainvoke(self, messages):
+        return self._call()
+
+    def stream(self, messages):
+        yield self._call()
+        raise ThrottlingError()
+
+
+@mock.patch.object(llm_client, "BEDROCK_BACKOFF_BASE", 0.001)
+class TestManagedLLM(unittest.TestCase):
+    def test_is_retryable_follows_wrapped_errors(self):
+        try:
+            try:
+                raise ThrottlingError()
+            except ThrottlingError as e:
+                raise ValueError("Error raised by bedrock service") from e
+        except ValueError as wrapped:
+            self.assertTrue(is_retryable(wrapped))
+        self.assertFalse(is_retryable(ValueError("ValidationException")))
+
+    def test_retries_throttling_and_reports_queue_time(self):
+        llm = ManagedLLM(FlakyLLM(failures=2), TokenBucket(0, 1), max_retries=3)
+        response = llm.invoke([])
+        self.assertEqual(response.content, "ok")
+        self.assertEqual(response.response_metadata["retries"], 2)
+        self.assertGreaterEqual(response.response_metadata["queue_seconds"], 0)
+
+    def test_async_gives_up_with_llm_throttled(self):
+        llm = ManagedLLM(FlakyLLM(failures=5), TokenBucket(0, 1), max_retries=2)
+        with self.assertRaises(LLMThrottled):
+            asyncio.run(llm.ainvoke([]))
+        self.assertEqual(llm.llm.calls, 3)
+
+    def test_other_errors_are_not_retried(self):
+        llm = ManagedLLM(FlakyLLM(failures=1, error=KeyError), TokenBucket(0, 1))
+        with self.assertRaises(KeyError):
+            llm.invoke([])
+        self.assertEqual(llm.llm.calls, 1)
+
+    def test_stream_is_not_retried_after_first_chunk(self):
+        llm = ManagedLLM(FlakyLLM(failures=0), TokenBucket(0, 1), max_retries=3)
+        with self.assertRaises(ThrottlingError):
+            list(llm.stream([]))
+        self.assertEqual(llm.llm.calls, 1)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_waits_when_burst_is_used(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        started = time.monotonic()
+        waited = bucket.acquire()
+        self.assertGreater(waited, 0.03)
+        self.assertGreaterEqual(time.monotonic() - started, waited * 0.9)
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0, capacity=1)
+        self.assertEqual(sum(bucket.acquire() for _ in range(10)), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import urllib.request
+from types import SimpleNamespace
+from src.metrics import (
+    MeteredLLM,
+    MetricsRegistry,
+    NodeUsage,
+    record_node,
+    start_metrics_server,
+    summarize,
+    token_usage,
+)
+
+
+class FakeLLM:
+    def invoke(self, messages):
+        return SimpleNamespace(
+            content="ok",
+            usage_metadata={"input_tokens": 1000, "output_tokens": 200},
+        )
+
+    def stream(self, messages):
+        yield SimpleNamespace(content="a", usage_metadata=None)
+        yield SimpleNamespace(
+            content="b", usage_metadata={"input_tokens": 10, "output_tokens": 5}
+        )
+
+
+class TestMetrics(unittest.TestCase):
+    def test_token_usage_falls_back_to_bedrock_metadata(self):
+        message = SimpleNamespace(
+            usage_metadata=None,
+            response_metadata={"usage": {"prompt_tokens": 7, "completion_tokens": 3}},
+        )
+        self.assertEqual(token_usage(message), (7, 3))
+
+    def test_input_tokens_per_call(self):
+        usage = NodeUsage("anthropic.claude-3-haiku-20240307-v1:0")
+        llm = MeteredLLM(FakeLLM(), usage)
+        llm.invoke([])
+        llm.invoke([])
+        state = {"metrics": {}}
+        record_node(state, "Architect", usage)
+        self.assertEqual(state["metrics"]["Architect"]["input_tokens_per_call"], 1000)
+
+    def test_metered_llm_records_tokens_cost_and_renders(self):
+        usage = NodeUsage("anthropic.claude-3-haiku-20240307-v1:0")
+        llm = MeteredLLM(FakeLLM(), usage)
+        llm.invoke([])
+        self.assertEqual("".join(c.content for c in llm.stream([])), "ab")
+        usage.add_render({"cached": True, "image": b"1234", "duration": 0.0})
+        usage.add_render({"cached": False, "image": b"12", "duration": 1.5})
+
+        record = usage.as_dict()
+        self.assertEqual(record["llm_calls"], 2)
+        self.assertEqual(record["input_tokens"], 1010)
+        self.assertEqual(record["output_tokens"], 205)
+        self.assertAlmostEqual(record["cost_usd"], (1010 * 0.00025 + 205 * 0.00125) / 1000)
+        self.assertEqual(record["renders"], 2)
+        self.assertEqual(record["cache_hits"], 1)
+        self.assertEqual(record["image_bytes"], 6)
+        self.assertEqual(record["awsdac_seconds"], 1.5)
+
+    def test_record_node_accumulates_in_state(self):
+        state = {"metrics": {}}
+        for _ in range(2):
+            usage = NodeUsage("m")
+            MeteredLLM(FakeLLM(), usage).invoke([])
+            record_node(state, "Validate", usage)
+        self.assertEqual(state["metrics"]["Validate"]["executions"], 2)
+        self.assertEqual(state["metrics"]["Validate"]["input_tokens"], 2000)
+        self.assertEqual(summarize(state["metrics"])["output_tokens"], 400)
+
+    def test_routed_calls_are_priced_and_counted_per_model(self):
+        state = {"metrics": {}}
+        usage = NodeUsage("anthropic.claude-3-haiku-20240307-v1:0")
+        MeteredLLM(FakeLLM(), usage).invoke([])
+        MeteredLLM(FakeLLM(), usage, "anthropic.claude-3-5-sonnet-20240620-v1:0").invoke(
+            []
+        )
+        record_node(state, "Validate", usage)
+
+        totals = state["metrics"]["Validate"]
+        self.assertEqual(
+            totals["models"],
+            {
+                "anthropic.claude-3-haiku-20240307-v1:0": 1,
+                "anthropic.claude-3-5-sonnet-20240620-v1:0": 1,
+            },
+        )
+        haiku = 1000 * 0.00025 + 200 * 0.00125
+        sonnet = 1000 * 0.003 + 200 * 0.015
+        self.assertAlmostEqual(totals["cost_usd"], (haiku + sonnet) / 1000)
+        self.assertEqual(summarize(state["metrics"])["llm_calls"], 2)
+
+    def test_prometheus_text_format(self):
+        registry = MetricsRegistry(buckets=(1, 5))
+        usage = NodeUsage("m")
+        registry.observe("Diagram", "m", usage.as_dict())
+        text = registry.render({"architect_render_queue_depth": 0})
+        self.assertIn('architect_node_seconds_bucket{node="Diagram",model="m",le="1"} 1', text)
+        self.assertIn('architect_node_seconds_count{node="Diagram",model="m"} 1', text)
+        self.assertIn('architect_renders_total{node="Diagram",model="m"} 0', text)
+        self.assertIn("architect_render_queue_depth 0", text)
+
+    def test_metrics_server(self):
+        server = start_metrics_server(port=0, host="127.0.0.1")
+        self.assertIs(start_metrics_server(port=0, host="127.0.0.1"), server)
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+        self.assertIn("# TYPE architect_node_seconds histogram", body)
+        self.assertIn("architect_render_cache_hits", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from src.model_routing import (
+    HAIKU,
+    SONNET,
+    escalation_model,
+    load_routing,
+    route_model,
+)
+
+
+def state(**fields) -> dict:
+    return {
+        "context": {
+            "model_id": "selected",
+            "model_routing": load_routing("tiered"),
+            "min_improvement": 3,
+        },
+        "schema_diagnostics": "",
+        "score_history": [],
+        "model_escalation": "",
+        **fields,
+    }
+
+
+class TestModelRouting(unittest.TestCase):
+    def test_tiered_policy_starts_with_fast_model(self):
+        self.assertEqual(route_model(state(), "Architect"), (HAIKU, ""))
+        self.assertEqual(route_model(state(), "Validate"), (HAIKU, ""))
+
+    def test_unrouted_nodes_and_empty_policy_use_selected_model(self):
+        self.assertEqual(route_model(state(), "Diagram"), ("selected", ""))
+        plain = state()
+        plain["context"]["model_routing"] = {}
+        self.assertEqual(route_model(plain, "Architect"), ("selected", ""))
+
+    def test_architect_escalates_on_parse_failure_or_stall(self):
+        self.assertEqual(
+            route_model(state(schema_diagnostics="ERROR x"), "Architect"),
+            (SONNET, "parse_failure"),
+        )
+        self.assertEqual(
+            route_model(state(score_history=[70, 72]), "Architect"),
+            (SONNET, "stalled"),
+        )
+        self.assertEqual(
+            route_model(state(score_history=[60, 72]), "Architect"), (HAIKU, "")
+        )
+
+    def test_escalation_is_sticky(self):
+        self.assertEqual(
+            route_model(state(model_escalation="stalled"), "Architect"),
+            (SONNET, "stalled"),
+        )
+
+    def test_escalation_model_for_validator_retry(self):
+        context = state()["context"]
+        self.assertEqual(escalation_model(context, HAIKU), SONNET)
+        self.assertIsNone(escalation_model(context, SONNET))
+        self.assertIsNone(escalation_model({"model_routing": {}}, HAIKU))
+
+    def test_load_routing_accepts_json(self):
+        self.assertEqual(load_routing('{"Validate": "m"}'), {"Validate": "m"})
+        self.assertEqual(load_routing(""), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import unittest
+
+import yaml
+from src.prompts import compact_yaml, estimate_tokens, minify_example
+
+TEMPLATE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "src", "diagram_as_code.yaml"
+)
+
+
+class TestPrompts(unittest.TestCase):
+    def setUp(self):
+        with open(TEMPLATE_PATH) as f:
+            self.template = f.read()
+
+    def resources(self, example: str) -> dict:
+        return yaml.safe_load(example)["Diagram"]["Resources"]
+
+    def test_example_drops_repeated_siblings(self):
+        example = minify_example(self.template, "고가용성 웹 애플리케이션")
+        resources = self.resources(example)
+        self.assertIn("VPCPublicSubnet1Instance", resources)
+        self.assertNotIn("VPCPublicSubnet2", resources)
+        self.assertEqual(resources["VPCPublicStack"]["Children"], ["VPCPublicSubnet1"])
+        self.assertLess(len(example), len(self.template))
+
+    def test_example_keeps_only_relevant_services(self):
+        example = minify_example(self.template, "사용자 인증이 있는 서버리스 API")
+        resources = self.resources(example)
+        self.assertNotIn("ALB", resources)
+        self.assertNotIn("VPCPublicSubnet1Instance", resources)
+        self.assertNotIn("Children", resources["VPCPublicSubnet1"])
+        links = yaml.safe_load(example)["Diagram"]["Links"]
+        self.assertEqual([(l["Source"], l["Target"]) for l in links], [("User", "IGW")])
+
+    def test_example_keeps_services_when_no_link_would_remain(self):
+        example = minify_example(self.template, "실시간 데이터 파이프라인")
+        self.assertIn("ALB", self.resources(example))
+
+    def test_compact_yaml_drops_definitions_and_keeps_content(self):
+        compact = compact_yaml(self.template)
+        self.assertNotIn("DefinitionFiles", compact)
+        self.assertEqual(
+            yaml.safe_load(compact)["Diagram"]["Resources"],
+            yaml.safe_load(self.template)["Diagram"]["Resources"],
+        )
+        self.assertLess(estimate_tokens(compact), estimate_tokens(self.template))
+        self.assertEqual(compact_yaml("not: [valid"), "not: [valid")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+from src.render_cache import RenderCache, cache_key
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_cache_key_ignores_whitespace_and_comments(self):
+        a = "Diagram:\n  Resources:\n    Canvas:\n      Type: AWS::Diagram::Canvas\n"
+        b = "Diagram:\n    Resources:   # comment\n\n        Canvas: {Type: AWS::Diagram::Canvas}\n"
+        self.assertEqual(cache_key(a), cache_key(b))
+        self.assertNotEqual(cache_key(a), cache_key(a.replace("Canvas", "Cloud")))
+
+    def test_cache_key_handles_dates_and_mixed_keys(self):
+        a = "Diagram:\n  Title: 2024-01-01\n  Created: 2024-01-01 10:00:00\n"
+        self.assertEqual(cache_key(a), cache_key(a.replace("  Title", "  # c\n  Title")))
+        self.assertNotEqual(cache_key(a), cache_key(a.replace("2024-01-01", "2024-01-02")))
+        cache_key("Diagram:\n  1: a\n  b: c\n")
+
+    def test_lru_eviction_by_size(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", b"12345", {})
+        cache.put("b", b"12345", {})
+        cache.get("a")
+        cache.put("c", b"12345", {})
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as disk_dir:
+            RenderCache(disk_dir=disk_dir).put("k", b"png", {"warnings": ["w"]}, "ok")
+            cache = RenderCache(disk_dir=disk_dir)
+            entry = cache.get("k")
+            self.assertEqual(entry["image"], b"png")
+            self.assertEqual(entry["feedback"], {"warnings": ["w"]})
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
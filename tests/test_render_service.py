@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from src.render_service import RenderQueueFull, RenderService
+
+
+class TestRenderService(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+        def fake_generate_diagram(yaml_content, workspace, timeout, cancel_event):
+            self.started.set()
+            self.release.wait(5)
+            return {"success": True, "yaml": yaml_content}
+
+        patcher = mock.patch(
+            "src.render_service.generate_diagram", side_effect=fake_generate_diagram
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = RenderService(max_workers=1, max_queue=1, queue_timeout=0.05)
+        self.addCleanup(self.service.shutdown)
+
+    def test_render_returns_result(self):
+        self.release.set()
+        self.assertEqual(self.service.render("a")["yaml"], "a")
+        self.assertEqual(self.service.stats()["completed"], 1)
+
+    def test_rejects_when_queue_is_full(self):
+        self.service.submit("a")
+        self.service.submit("b")
+        with self.assertRaises(RenderQueueFull):
+            self.service.submit("c")
+        self.assertEqual(self.service.stats()["rejected"], 1)
+        self.release.set()
+
+    def test_cancel_owner_drops_queued_jobs(self):
+        running = self.service.submit("a", owner="session")
+        self.started.wait(5)
+        queued = self.service.submit("b", owner="session")
+        self.assertEqual(self.service.stats()["queue_depth"], 1)
+        self.assertEqual(self.service.cancel("session"), 2)
+        self.release.set()
+        running.result(5)
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(self.service.stats()["cancelled"], 1)
+
+    def test_arender_shares_limits_and_cancels(self):
+        async def fake_agenerate_diagram(yaml_content, workspace, timeout):
+            await asyncio.sleep(10)
+
+        async def scenario():
+            with mock.patch(
+                "src.render_service.agenerate_diagram",
+                side_effect=fake_agenerate_diagram,
+            ):
+                task = asyncio.create_task(self.service.arender("a", owner="s"))
+                await asyncio.sleep(0.05)
+                self.assertEqual(self.service.stats()["running"], 1)
+                self.service.cancel("s")
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(scenario())
+        stats = self.service.stats()
+        self.assertEqual((stats["running"], stats["cancelled"]), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+PROBE = """
+import json, sys
+import architect
+print(json.dumps({
+    "modules": sorted({name.split(".")[0] for name in sys.modules}),
+    "template": architect.example_template()[:200],
+}))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_is_lazy_and_works_outside_repo_root(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            result = subprocess.run(
+                [sys.executable, "-c", PROBE],
+                cwd=cwd,
+                env={**os.environ, "PYTHONPATH": os.path.abspath(SRC_DIR)},
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+        for heavy in ("langchain", "langchain_core", "langgraph", "boto3", "PIL"):
+            self.assertNotIn(heavy, probe["modules"])
+        self.assertIn("Diagram", probe["template"])
+
+
+if __name__ == "__main__":
+    unittest.main()
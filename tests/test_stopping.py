@@ -0,0 +1,59 @@
+import unittest
+from src.stopping import (
+    budget_exhausted,
+    has_converged,
+    restore_best_design,
+    update_best_design,
+)
+
+
+def design(score: float, name: str) -> dict:
+    return {
+        "yaml_content": name,
+        "architecture_explanation": f"{name} 설명",
+        "validation_result": f"점수: {score}",
+        "architecture_score": score,
+        "diagram_result": {"image": name.encode()},
+    }
+
+
+class TestConvergence(unittest.TestCase):
+    def test_plateau_converges(self):
+        self.assertFalse(has_converged([70, 72, 71], window=3, min_improvement=3))
+        self.assertTrue(has_converged([70, 72, 71, 72], window=3, min_improvement=3))
+
+    def test_steady_improvement_does_not_converge(self):
+        self.assertFalse(has_converged([60, 65, 70, 75], window=3, min_improvement=3))
+
+    def test_zero_window_disables_convergence(self):
+        self.assertFalse(has_converged([70, 70, 70, 70], window=0, min_improvement=3))
+
+
+class TestBudgets(unittest.TestCase):
+    def test_time_budget(self):
+        context = {"max_seconds": 60, "max_tokens": 0}
+        self.assertIsNone(budget_exhausted(context, 100.0, {}, now=150.0))
+        self.assertEqual(budget_exhausted(context, 100.0, {}, now=160.0), "time_budget")
+
+    def test_token_budget_counts_input_and_output(self):
+        context = {"max_seconds": 0, "max_tokens": 1000}
+        totals = {"input_tokens": 700, "output_tokens": 300}
+        self.assertEqual(budget_exhausted(context, 0.0, totals), "token_budget")
+        self.assertIsNone(budget_exhausted({}, 0.0, totals))
+
+
+class TestBestDesign(unittest.TestCase):
+    def test_keeps_highest_score_and_restores_it(self):
+        best = update_best_design({}, design(72, "first"))
+        best = update_best_design(best, design(65, "second"))
+        self.assertEqual(best["yaml_content"], "first")
+
+        state = {**design(65, "second"), "best_design": best}
+        restore_best_design(state)
+        self.assertEqual(state["yaml_content"], "first")
+        self.assertEqual(state["architecture_score"], 72)
+        self.assertTrue(state["diagram_generated"])
+
+
+if __name__ == "__main__":
+    unittest.main()
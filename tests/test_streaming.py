@@ -0,0 +1,41 @@
+import unittest
+from src.streaming import DiagramStreamParser
+
+
+class TestDiagramStreamParser(unittest.TestCase):
+    def test_emits_yaml_and_explanation_deltas(self):
+        response = "<DIAGRAM>\nDiagram:\n  Resources: {}\n</DIAGRAM>\n\n설명:\n웹 티어"
+        for size in (1, 4, len(response)):
+            parser = DiagramStreamParser()
+            events = []
+            for i in range(0, len(response), size):
+                events.extend(parser.feed(response[i : i + size]))
+
+            yaml_deltas = [e["partial_yaml_delta"] for e in events if "partial_yaml_delta" in e]
+            self.assertTrue(all("<" not in delta for delta in yaml_deltas))
+            self.assertEqual("".join(yaml_deltas).strip(), "Diagram:\n  Resources: {}")
+            explanation = "".join(
+                e["partial_explanation_delta"]
+                for e in events
+                if "partial_explanation_delta" in e
+            )
+            self.assertEqual(explanation, "웹 티어")
+            self.assertEqual(parser.yaml_content, "Diagram:\n  Resources: {}")
+            self.assertEqual(parser.content, response)
+
+    def test_only_new_text_is_scanned(self):
+        parser = DiagramStreamParser()
+        parser.feed("앞말 <DIA")
+        self.assertEqual(parser.feed("GRAM>Diagram:"), [{"partial_yaml_delta": "Diagram:"}])
+        self.assertEqual(parser.feed(" {}</DIAG"), [{"partial_yaml_delta": " {}"}])
+        self.assertEqual(parser.feed("RAM>"), [])
+        self.assertEqual(parser.yaml_content, "Diagram: {}")
+
+    def test_yaml_is_ready_before_explanation_finishes(self):
+        parser = DiagramStreamParser()
+        parser.feed("<DIAGRAM>Diagram: {}</DIAGRAM>")
+        self.assertEqual(parser.yaml_content, "Diagram: {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
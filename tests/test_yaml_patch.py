@@ -0,0 +1,65 @@
+import unittest
+import yaml
+from src.yaml_patch import apply_patch, extract_patch
+
+BASE_YAML = """
+Diagram:
+  Resources:
+    Canvas:
+      Type: AWS::Diagram::Canvas
+      Children: [ALB, EC2, Legacy]
+    ALB:
+      Type: AWS::ElasticLoadBalancingV2::LoadBalancer
+    EC2:
+      Type: AWS::EC2::Instance
+    Legacy:
+      Type: AWS::EC2::Instance
+  Links:
+    - Source: ALB
+      Target: EC2
+    - Source: ALB
+      Target: Legacy
+"""
+
+
+class TestYamlPatch(unittest.TestCase):
+    def test_apply_patch(self):
+        patch = extract_patch(
+            """개선안입니다.
+<PATCH>
+Resources:
+  add:
+    RDS:
+      Type: AWS::RDS::DBInstance
+  modify:
+    EC2:
+      Title: "Web"
+  remove: [Legacy]
+Children:
+  add:
+    Canvas: [RDS]
+Links:
+  add:
+    - Source: EC2
+      Target: RDS
+</PATCH>
+설명: RDS 추가"""
+        )
+        diagram = yaml.safe_load(apply_patch(BASE_YAML, patch))["Diagram"]
+        self.assertNotIn("Legacy", diagram["Resources"])
+        self.assertEqual(diagram["Resources"]["Canvas"]["Children"], ["ALB", "EC2", "RDS"])
+        self.assertEqual(diagram["Resources"]["EC2"]["Title"], "Web")
+        self.assertEqual(
+            diagram["Links"],
+            [{"Source": "ALB", "Target": "EC2"}, {"Source": "EC2", "Target": "RDS"}],
+        )
+
+    def test_rejects_unknown_resource(self):
+        with self.assertRaises(ValueError):
+            apply_patch(BASE_YAML, {"Resources": {"modify": {"Missing": {"Title": "x"}}}})
+        with self.assertRaises(ValueError):
+            extract_patch("no patch here")
+
+
+if __name__ == "__main__":
+    unittest.main()